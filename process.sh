@@ -9,6 +9,8 @@
 #   --summarize          Enable AI summarization
 #   --provider local|openai  AI provider to use (default: from config)
 #   --no-refine          Skip text refinement
+#   --batch-size N       Use batched Whisper inference with batch size N
+#   --resume             Run the resumable pipeline (reuses cached stages)
 #   --help               Show this help message
 
 AUDIO_FILE=""
@@ -18,6 +20,8 @@ SUMMARIZE=false
 PROVIDER=""
 REFINE=true
 OUTPUT_BASE=""
+BATCH_SIZE=""
+RESUME=false
 
 # Parse arguments
 while [[ $# -gt 0 ]]; do
@@ -42,6 +46,14 @@ while [[ $# -gt 0 ]]; do
             REFINE=false
             shift
             ;;
+        --batch-size)
+            BATCH_SIZE="$2"
+            shift 2
+            ;;
+        --resume)
+            RESUME=true
+            shift
+            ;;
         --help)
             echo "Usage: ./process.sh <audio_file> [options]"
             echo ""
@@ -51,6 +63,8 @@ while [[ $# -gt 0 ]]; do
             echo "  --summarize          Enable AI summarization"
             echo "  --provider local|openai  AI provider for summarization"
             echo "  --no-refine          Skip text refinement"
+            echo "  --batch-size N       Use batched Whisper inference with batch size N"
+            echo "  --resume             Run the resumable pipeline (reuses cached stages)"
             echo "  --help               Show this help message"
             echo ""
             echo "Examples:"
@@ -58,6 +72,7 @@ while [[ $# -gt 0 ]]; do
             echo "  ./process.sh meeting.m4a --num-speakers 5"
             echo "  ./process.sh meeting.m4a --identify --summarize"
             echo "  ./process.sh meeting.m4a --summarize --provider local"
+            echo "  ./process.sh meeting.m4a --summarize --resume"
             exit 0
             ;;
         *)
@@ -126,15 +141,51 @@ fi
 echo "🪄 Text Refinement: ${REFINE:-Yes}"
 echo ""
 
+# Resumable pipeline: every stage is checkpointed, so a rerun after a
+# failure (or a config change) only recomputes what changed
+if [ "$RESUME" = true ]; then
+    PIPELINE_ARGS=(--output-base "${OUTPUT_BASE}")
+    if [ -n "$NUM_SPEAKERS" ]; then
+        PIPELINE_ARGS+=(--num-speakers "$NUM_SPEAKERS")
+    fi
+    if [ "$SUMMARIZE" = true ]; then
+        PIPELINE_ARGS+=(--summarize)
+        if [ -n "$PROVIDER" ]; then
+            PIPELINE_ARGS+=(--provider "$PROVIDER")
+        fi
+    fi
+    if [ "$REFINE" = false ]; then
+        PIPELINE_ARGS+=(--no-refine)
+    fi
+    exec $VENV_PYTHON "scripts/cli.py" process-full "$AUDIO_FILE" "${PIPELINE_ARGS[@]}"
+fi
+
 # Step 1: Transcription
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 echo "🚀 [1/5] Transcribing Audio..."
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 
-if [ -n "$NUM_SPEAKERS" ]; then
-    $VENV_PYTHON "transcribe.py" "$AUDIO_FILE" "$NUM_SPEAKERS" "${OUTPUT_BASE}"
+BATCH_ARG=""
+if [ -n "$BATCH_SIZE" ]; then
+    BATCH_ARG="--batch-size $BATCH_SIZE"
+fi
+
+# Use the transcription service (scripts/cli.py serve) when it is running,
+# so models are already loaded
+SERVICE_URL="${TRANSCRIBE_SERVICE_URL:-http://127.0.0.1:8765}"
+
+if [ -z "$BATCH_SIZE" ] && command -v curl &> /dev/null && curl -sf "$SERVICE_URL/health" > /dev/null 2>&1; then
+    echo "⚡ Using transcription service at $SERVICE_URL"
+    SPEAKERS_ARG=""
+    if [ -n "$NUM_SPEAKERS" ]; then
+        SPEAKERS_ARG="--num-speakers $NUM_SPEAKERS"
+    fi
+    # Refinement and summary run as the steps below
+    $VENV_PYTHON "scripts/cli.py" submit "$AUDIO_FILE" --output-base "${OUTPUT_BASE}" --url "$SERVICE_URL" $SPEAKERS_ARG --no-refine
+elif [ -n "$NUM_SPEAKERS" ]; then
+    $VENV_PYTHON "transcribe.py" "$AUDIO_FILE" "$NUM_SPEAKERS" "${OUTPUT_BASE}" $BATCH_ARG
 else
-    $VENV_PYTHON "transcribe.py" "$AUDIO_FILE" "${OUTPUT_BASE}"
+    $VENV_PYTHON "transcribe.py" "$AUDIO_FILE" "${OUTPUT_BASE}" $BATCH_ARG
 fi
 
 if [ $? -ne 0 ]; then
@@ -23,6 +23,8 @@ except ImportError:
     MODULAR_AVAILABLE = False
     print("Note: Using legacy mode (modular components not found)")
 
+from src.alignment import vote_labels
+
 def format_time(seconds):
     h = int(seconds // 3600)
     m = int((seconds % 3600) // 60)
@@ -99,17 +101,19 @@ def main():
 
     # 1.5s windows with 0.75s hop for high precision
     embeddings = []
-    time_points = []
+    window_bounds = []
     total_duration = len(wav) / 16000
 
-    for start_t in np.arange(0, total_duration - 1.5, 0.75):
-        s = int(start_t * 16000)
-        e = int((start_t + 1.5) * 16000)
-        chunk = wav[s:e]
-        if np.abs(chunk).mean() < 0.005: continue # Skip silence
+    # Window bounds as arrays; one cumulative envelope gives every window's mean amplitude
+    starts = (np.arange(0, total_duration - 1.5, 0.75) * 16000).astype(np.int64)
+    ends = starts + int(1.5 * 16000)
+    envelope = np.concatenate([[0.0], np.cumsum(np.abs(wav), dtype=np.float64)])
+    voiced = (envelope[ends] - envelope[starts]) / (ends - starts) >= 0.005 # Skip silence
+
+    for s, e in zip(starts[voiced], ends[voiced]):
         try:
-            embeddings.append(encoder.embed_utterance(chunk))
-            time_points.append(start_t + 0.75)
+            embeddings.append(encoder.embed_utterance(wav[s:e]))
+            window_bounds.append((s / 16000, e / 16000))
         except: pass
 
     embeddings = np.array(embeddings)
@@ -132,13 +136,17 @@ def main():
 
     print(f"\n✨ Optimal speaker count detected: {best_n}")
 
-    # Map labels back to segments
+    # Map labels back to segments by overlap-weighted vote
+    window_bounds = np.array(window_bounds)
+    segment_labels = vote_labels(
+        window_bounds[:, 0], window_bounds[:, 1], best_labels,
+        [seg["start"] for seg in segments], [seg["end"] for seg in segments]
+    )
+
     output_lines = []
     prev_speaker = None
-    for seg in segments:
-        mid = (seg["start"] + seg["end"]) / 2
-        idx = np.abs(np.array(time_points) - mid).argmin()
-        speaker_name = f"Speaker {best_labels[idx] + 1}"
+    for seg, label in zip(segments, segment_labels):
+        speaker_name = f"Speaker {label + 1}"
         ts = f"[{format_time(seg['start'])} - {format_time(seg['end'])}]"
         if speaker_name != prev_speaker:
             output_lines.append(f"\n--- {speaker_name} ---")
@@ -1,60 +1,59 @@
 """
 Re-diarrize transcript with more aggressive speaker separation.
 Uses K-means clustering for better separation.
+
+Re-clusters the speaker embeddings saved next to the transcript
+({output_base}_embeddings.npz), so no audio or models are needed.
 """
+import os
 import sys
-import json
-import numpy as np
-from sklearn.cluster import KMeans, AgglomerativeClustering
-from collections import defaultdict
-
-def load_transcript(filepath):
-    """Load transcript and extract speaker info."""
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-
-    segments = []
-    current_speaker = None
-    current_timestamp = None
+import time
 
-    for line in lines:
-        line = line.strip()
-        if line.startswith('--- Speaker'):
-            current_speaker = line.replace('---', '').replace('Speaker', '').strip()
-        elif line and line[0] == '[':
-            # Parse timestamp
-            timestamp_part = line.split(']')[0] + ']'
-            text_part = line.split(']', 1)[1].strip()
-            segments.append({
-                'speaker': current_speaker,
-                'timestamp': timestamp_part,
-                'text': text_part
-            })
+from src.diarization import EnhancedDiarization
+from src.utils.transcript import parse_transcript, write_transcript_with_speakers
 
-    return segments
 
-def recluster_speakers(num_speakers):
+def recluster_speakers(num_speakers, output_base="transcript", algorithm="kmeans"):
     """
-    Re-cluster speakers using K-means for more separation.
-    This requires that the original transcription saved the embeddings.
+    Re-cluster speakers from saved embeddings.
+
+    Rewrites {output_base}_speakers.txt with the new speaker labels.
     """
-    print(f"Re-clustering into {num_speakers} speakers using K-means...")
+    transcript_file = f"{output_base}_speakers.txt"
+    embeddings_file = f"{output_base}_embeddings.npz"
+
+    if not os.path.exists(transcript_file):
+        print(f"ERROR: {transcript_file} not found")
+        return 1
 
-    # Since we don't have the original embeddings, we need to re-transcribe
-    # This is a limitation - for true re-diarrization, we need the embeddings
+    if not os.path.exists(embeddings_file):
+        print(f"⚠️  {embeddings_file} not found.")
+        print("Embeddings are saved by transcribe.py and `scripts/cli.py transcribe`.")
+        print("Re-transcribe once to create them:")
+        print(f"""
+    python transcribe.py audio.mp3 {num_speakers} {output_base}
+    """)
+        return 1
 
-    print("⚠️  Note: For re-diarrization, the original embeddings are needed.")
-    print("The current system doesn't save embeddings separately.")
-    print("")
-    print("Recommended: Re-transcribe with different clustering parameters:")
+    print(f"Re-clustering into {num_speakers} speakers using {algorithm}...")
+    start_time = time.time()
 
-    print(f"""
-    python transcribe.py audio.mp3 {num_speakers}
+    segments = parse_transcript(transcript_file)
+    diarization = EnhancedDiarization()
+    diarized_segments = diarization.recluster(
+        embeddings_file,
+        num_speakers=num_speakers,
+        segments=segments,
+        algorithm=algorithm
+    )
+
+    write_transcript_with_speakers(diarized_segments, transcript_file)
+
+    n_speakers = len(set(s['speaker'] for s in diarized_segments))
+    print(f"✨ {n_speakers} speakers in {time.time() - start_time:.2f}s")
+    print(f"📄 Saved to: {transcript_file}")
+    return 0
 
-    Or adjust config.yaml clustering settings:
-    - distance_threshold: 0.35  (lower = more separation)
-    - metric: "euclidean"       (can work better than cosine)
-    """)
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
@@ -62,4 +61,7 @@ if __name__ == "__main__":
     else:
         num_speakers = 8
 
-    recluster_speakers(num_speakers)
+    output_base = sys.argv[2] if len(sys.argv) > 2 else "transcript"
+    algorithm = sys.argv[3] if len(sys.argv) > 3 else "kmeans"
+
+    sys.exit(recluster_speakers(num_speakers, output_base, algorithm))
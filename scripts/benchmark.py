@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the transcription pipeline.
+
+Commands:
+  embed      Speaker embedding throughput (per-window vs batched)
+  silence    Silence detection (per-sample loop vs run-length)
+  cluster    Speaker clustering (repeated agglomerative vs one linkage tree)
+  align      Speaker-to-segment mapping (nearest midpoint vs overlap vote)
+  ann        Speaker index recall@1 and queries/s (brute force vs IVF/HNSW)
+  llm        LLM calls against a fake server (one connection per call vs pooled client)
+  startup    CLI startup time and imports per subcommand (python -X importtime)
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _load_or_synthesize(audio_path, seconds, sample_rate=16000):
+    """Load audio from file, or synthesize noise if no file is given."""
+    if audio_path:
+        from src.utils.audio import decode_audio
+        return np.asarray(decode_audio(audio_path, sample_rate=sample_rate).samples)
+
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * sample_rate)) * 0.1).astype(np.float32)
+
+
+def bench_embed(args):
+    """Compare per-window and batched resemblyzer embedding."""
+    from resemblyzer import VoiceEncoder
+    from src.diarization import embed_utterances
+
+    sample_rate = 16000
+    wav = _load_or_synthesize(args.audio, args.seconds, sample_rate)
+
+    window_size = int(args.window * sample_rate)
+    hop_size = int(args.hop * sample_rate)
+    windows = [wav[s:s + window_size] for s in range(0, len(wav) - window_size + 1, hop_size)]
+    windows = windows[:args.max_windows]
+
+    encoder = VoiceEncoder(device=args.device)
+    print(f"Windows: {len(windows)} ({args.window}s window, {args.hop}s hop, device={args.device})")
+    print("")
+
+    # Warm up
+    embed_utterances(encoder, windows[:8], batch_size=8)
+
+    results = {}
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        embeds = embed_utterances(encoder, windows, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        results[batch_size] = embeds
+        print(f"  batch_size={batch_size:<4d} {len(windows) / elapsed:10.1f} windows/s  ({elapsed:.2f}s)")
+
+    baseline = results[args.batch_sizes[0]]
+    print("")
+    for batch_size, embeds in results.items():
+        max_diff = np.abs(embeds - baseline).max() if len(embeds) else 0.0
+        print(f"  batch_size={batch_size:<4d} max |diff| vs batch_size={args.batch_sizes[0]}: {max_diff:.2e}")
+
+    return 0
+
+
+def _detect_silence_per_sample(audio, sample_rate=16000, threshold=0.01, min_duration=0.5):
+    """Original per-sample implementation, kept as the benchmark baseline."""
+    is_silent = np.abs(audio) < threshold
+
+    silent_segments = []
+    start = None
+
+    for i, silent in enumerate(is_silent):
+        if silent and start is None:
+            start = i / sample_rate
+        elif not silent and start is not None:
+            end = i / sample_rate
+            if end - start >= min_duration:
+                silent_segments.append((start, end))
+            start = None
+
+    return silent_segments
+
+
+def bench_silence(args):
+    """Compare per-sample and run-length silence detection."""
+    from src.utils.audio import detect_silence
+
+    sample_rate = 16000
+    wav = _load_or_synthesize(args.audio, args.seconds, sample_rate)
+    if not args.audio:
+        # Insert pauses so there is silence to find
+        rng = np.random.default_rng(1)
+        for start in rng.integers(0, len(wav) - 3 * sample_rate, size=int(args.seconds // 20)):
+            wav[start:start + int(rng.uniform(0.2, 3.0) * sample_rate)] *= 0.01
+
+    duration = len(wav) / sample_rate
+    print(f"Audio: {duration:.0f}s ({len(wav)} samples)")
+    print("")
+
+    # The per-sample loop is far too slow for long audio; time an excerpt
+    excerpt = wav[:int(min(duration, args.baseline_seconds) * sample_rate)]
+    start = time.perf_counter()
+    _detect_silence_per_sample(excerpt, sample_rate)
+    baseline = (time.perf_counter() - start) / (len(excerpt) / sample_rate)
+    print(f"  per-sample loop  {baseline * 3600:10.2f}s per audio hour  (timed on {len(excerpt) / sample_rate:.0f}s)")
+
+    for metric in ['rms', 'mean']:
+        start = time.perf_counter()
+        segments = detect_silence(wav, sample_rate, metric=metric)
+        elapsed = (time.perf_counter() - start) / duration
+        print(f"  run-length {metric:<5s} {elapsed * 3600:10.2f}s per audio hour  "
+              f"({len(segments)} segments, {baseline / elapsed:.0f}x)")
+
+    return 0
+
+
+def _synthetic_embeddings(n, n_speakers, noise=0.6, seed=0):
+    """Unit-norm embeddings drawn around n_speakers random centers."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_speakers, 256))
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    truth = rng.integers(0, n_speakers, size=n)
+    x = centers[truth] + noise * rng.standard_normal((n, 256)) / np.sqrt(256)
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32), truth
+
+
+def _cluster_repeated(embeddings, thresholds, metric='cosine', linkage='average'):
+    """Original approach: full AgglomerativeClustering + silhouette per threshold."""
+    from sklearn.cluster import AgglomerativeClustering
+    from sklearn.metrics import silhouette_score
+
+    best_labels, best_score = None, -1
+    for threshold in thresholds:
+        labels = AgglomerativeClustering(
+            n_clusters=None, distance_threshold=threshold, metric=metric, linkage=linkage
+        ).fit_predict(embeddings)
+        if 2 <= len(set(labels)) < len(labels):
+            score = silhouette_score(embeddings, labels, metric=metric)
+            if score > best_score:
+                best_labels, best_score = labels, score
+    return best_labels
+
+
+def _cluster_tree(embeddings, thresholds, metric='cosine', linkage='average', max_direct_samples=5000):
+    """New approach: one linkage tree, cut per threshold, sampled silhouette."""
+    from src.clustering import LinkageTree, sampled_silhouette
+
+    tree = LinkageTree(embeddings, metric=metric, linkage=linkage, max_direct_samples=max_direct_samples)
+    best_labels, best_score = None, -1
+    for threshold in thresholds:
+        labels = tree.cut_distance(threshold)
+        score = sampled_silhouette(embeddings, labels, metric=metric)
+        if score > best_score:
+            best_labels, best_score = labels, score
+    return best_labels
+
+
+def bench_cluster(args):
+    """Compare repeated agglomerative clustering with the linkage-tree backend."""
+    from sklearn.metrics import adjusted_rand_score
+
+    thresholds = [0.55, 0.45, 0.35, 0.25]
+
+    for n in args.sizes:
+        embeddings, truth = _synthetic_embeddings(n, args.speakers)
+        print(f"n={n} ({args.speakers} speakers)")
+
+        if n <= args.baseline_max:
+            start = time.perf_counter()
+            baseline = _cluster_repeated(embeddings, thresholds)
+            elapsed = time.perf_counter() - start
+            print(f"  repeated agglomerative {elapsed:8.2f}s  ARI vs truth {adjusted_rand_score(truth, baseline):.3f}")
+        else:
+            print("  repeated agglomerative  skipped (n > --baseline-max)")
+
+        start = time.perf_counter()
+        labels = _cluster_tree(embeddings, thresholds, max_direct_samples=args.max_direct_samples)
+        elapsed = time.perf_counter() - start
+        print(f"  linkage tree           {elapsed:8.2f}s  ARI vs truth {adjusted_rand_score(truth, labels):.3f}")
+        print("")
+
+    return 0
+
+
+def _map_nearest_midpoint(segments, time_points, labels):
+    """Previous mapping: argmin over every window for each segment."""
+    return [
+        labels[np.abs(np.array(time_points) - (seg['start'] + seg['end']) / 2).argmin()]
+        for seg in segments
+    ]
+
+
+def bench_align(args):
+    """Compare nearest-midpoint and overlap-vote segment mapping."""
+    from src.alignment import vote_labels
+
+    rng = np.random.default_rng(0)
+    duration = args.hours * 3600
+    starts = np.arange(0, duration - args.window, args.hop)
+    ends = starts + args.window
+    labels = ((starts // 20) % 4).astype(np.int64)
+
+    seg_starts = np.sort(rng.uniform(0, duration, args.segments))
+    seg_ends = seg_starts + rng.uniform(0.5, 10.0, args.segments)
+    segments = [{'start': s, 'end': e} for s, e in zip(seg_starts, seg_ends)]
+    print(f"{args.hours:g}h audio: {len(starts)} windows, {len(segments)} segments")
+    print("")
+
+    excerpt = segments[:args.baseline_segments]
+    start = time.perf_counter()
+    _map_nearest_midpoint(excerpt, (starts + ends) / 2, labels)
+    baseline = (time.perf_counter() - start) / len(excerpt) * len(segments)
+    print(f"  nearest midpoint  {baseline:8.3f}s  (extrapolated from {len(excerpt)} segments)")
+
+    start = time.perf_counter()
+    vote_labels(starts, ends, labels, seg_starts, seg_ends)
+    elapsed = time.perf_counter() - start
+    print(f"  overlap vote      {elapsed:8.3f}s  ({baseline / elapsed:.0f}x)")
+
+    return 0
+
+
+def bench_ann(args):
+    """Compare speaker index recall@1 and throughput against brute force."""
+    from src.speaker_id import BruteForceIndex, _normalize_rows, create_index
+
+    rng = np.random.default_rng(0)
+
+    for n in args.sizes:
+        # Profiles share group directions (e.g. one microphone type) so the
+        # roster is not uniformly spread over the sphere
+        groups = rng.normal(size=(max(1, n // 50), args.dim))
+        profiles = _normalize_rows(groups[rng.integers(0, len(groups), n)] + rng.normal(size=(n, args.dim)))
+        targets = rng.integers(0, n, args.queries)
+        queries = _normalize_rows(profiles[targets] + args.noise * rng.normal(size=(args.queries, args.dim)))
+
+        exact = BruteForceIndex()
+        exact.build(profiles)
+        start = time.perf_counter()
+        truth, _ = exact.search(queries, 1)
+        brute_qps = args.queries / (time.perf_counter() - start)
+
+        print(f"n={n} profiles, {args.queries} queries")
+        print(f"  brute   build      0.00s  {brute_qps:10.0f} q/s  recall@1 1.000")
+
+        for kind in ['ivf', 'hnsw']:
+            index = create_index(kind)
+            if index.kind != kind:
+                print(f"  {kind:<7s} skipped (hnswlib not installed)")
+                continue
+
+            start = time.perf_counter()
+            index.build(profiles)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            rows, _ = index.search(queries, 1)
+            qps = args.queries / (time.perf_counter() - start)
+            recall = np.mean(rows[:, 0] == truth[:, 0])
+            print(f"  {kind:<7s} build {build:8.2f}s  {qps:10.0f} q/s  recall@1 {recall:.3f}")
+
+        print("")
+
+    return 0
+
+
+def bench_llm(args):
+    """Compare sequential per-call connections with the pooled LLM client."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    from fake_llm_server import start_server
+    from src.llm_client import LLMClient, OllamaProvider
+
+    server = start_server(latency=args.latency, fail_rate=args.fail_rate, stall_rate=args.stall_rate)
+    prompt = "Rangkum: " + "kata " * 500
+    print(f"{args.calls} calls, {args.latency:.2f}s latency, fail rate {args.fail_rate}, stall rate {args.stall_rate}\n")
+
+    # Baseline: requests.post per call, one after another, fixed 1/2/4 s retries
+    start = time.perf_counter()
+    failed = 0
+    for _ in range(args.baseline_calls):
+        for attempt in range(3):
+            try:
+                response = requests.post(
+                    f"{server.url}/api/generate",
+                    json={"model": "fake", "prompt": prompt, "stream": False},
+                    timeout=60
+                )
+                response.raise_for_status()
+                break
+            except requests.exceptions.RequestException:
+                if attempt == 2:
+                    failed += 1
+                else:
+                    time.sleep(2 ** attempt)
+    baseline = (time.perf_counter() - start) / args.baseline_calls * args.calls
+    baseline_stats = server.stats()
+    print(f"  sequential   {baseline:7.2f}s (extrapolated from {args.baseline_calls} calls)  "
+          f"{baseline_stats['connections']} connections  {failed} failed")
+
+    for concurrency in args.concurrency:
+        before = server.stats()
+        client = LLMClient(
+            OllamaProvider(server.url, "fake", stream=True),
+            concurrency=concurrency,
+            backoff_base_sec=0.2
+        )
+
+        def call(_):
+            try:
+                return client.generate(prompt)[1]
+            except Exception:
+                return None
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(call, range(args.calls)))
+        elapsed = time.perf_counter() - start
+        client.close()
+
+        after = server.stats()
+        tokens = sum(usage['completion_tokens'] for usage in results if usage)
+        print(f"  pooled x{concurrency:<3d}  {elapsed:7.2f}s  "
+              f"{after['connections'] - before['connections']} connections  "
+              f"{after['requests'] - before['requests']} requests  "
+              f"{sum(usage is None for usage in results)} failed  {tokens} tokens")
+
+    server.shutdown()
+    return 0
+
+
+# Modules that must only be imported by commands that run models
+HEAVY_MODULES = ['torch', 'faster_whisper', 'ctranslate2', 'sklearn', 'scipy', 'resemblyzer', 'pyannote', 'tqdm', 'pydub']
+
+# Subcommands that should start without any heavy module
+LIGHT_COMMANDS = [
+    ['--help'],
+    ['list-speakers'],
+    ['summarize', '--help'],
+    ['submit', '--check'],
+]
+
+
+def _parse_importtime(stderr):
+    """Parse -X importtime output into {module: (self_us, cumulative_us)}."""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports[name.strip()] = (int(self_us), int(cumulative_us))
+    return imports
+
+
+def bench_startup(args):
+    """Time CLI subcommands and report which heavy modules they import."""
+    cli = str(Path(__file__).parent / 'cli.py')
+    commands = [command.split() for command in args.commands] if args.commands else LIGHT_COMMANDS
+
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    failed = False
+
+    for command in commands:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', cli] + command,
+                capture_output=True, text=True, env=env
+            )
+            times.append(time.perf_counter() - start)
+
+        imports = _parse_importtime(result.stderr)
+        heavy = [name for name in HEAVY_MODULES if name in imports]
+        wall_ms = min(times) * 1000
+
+        print(f"cli.py {' '.join(command)}")
+        print(f"  wall time     {wall_ms:8.1f} ms (best of {args.repeat})")
+        print(f"  imports       {len(imports):8d} modules")
+        print(f"  heavy modules {', '.join(heavy) or 'none'}")
+
+        slowest = sorted(imports.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+        for name, (_, cumulative_us) in slowest:
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+        print("")
+
+        if args.max_ms and wall_ms > args.max_ms:
+            print(f"  ⚠️  over budget ({wall_ms:.0f} ms > {args.max_ms:.0f} ms)")
+            failed = True
+        if heavy and not args.commands:
+            print("  ⚠️  light command imports heavy modules")
+            failed = True
+
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Performance benchmarks',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    subparsers = parser.add_subparsers(dest='command', help='Available benchmarks')
+
+    # embed benchmark
+    embed_parser = subparsers.add_parser('embed', help='Speaker embedding throughput')
+    embed_parser.add_argument('audio', nargs='?', help='Audio file (default: synthetic noise)')
+    embed_parser.add_argument('--seconds', type=float, default=600.0, help='Synthetic audio length')
+    embed_parser.add_argument('--window', type=float, default=1.5, help='Window duration in seconds')
+    embed_parser.add_argument('--hop', type=float, default=0.75, help='Hop duration in seconds')
+    embed_parser.add_argument('--max-windows', type=int, default=2000, help='Cap on windows embedded')
+    embed_parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 64], help='Batch sizes to compare')
+    embed_parser.add_argument('--device', default='cpu', help='Encoder device')
+
+    # silence benchmark
+    silence_parser = subparsers.add_parser('silence', help='Silence detection speed')
+    silence_parser.add_argument('audio', nargs='?', help='Audio file (default: synthetic noise)')
+    silence_parser.add_argument('--seconds', type=float, default=7200.0, help='Synthetic audio length')
+    silence_parser.add_argument('--baseline-seconds', type=float, default=60.0, help='Excerpt length for the per-sample baseline')
+
+    # cluster benchmark
+    cluster_parser = subparsers.add_parser('cluster', help='Speaker clustering speed')
+    cluster_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 4000, 20000], help='Numbers of embeddings')
+    cluster_parser.add_argument('--speakers', type=int, default=6, help='Synthetic speaker count')
+    cluster_parser.add_argument('--baseline-max', type=int, default=4000, help='Largest n to run the O(n^2) baseline on')
+    cluster_parser.add_argument('--max-direct-samples', type=int, default=5000, help='Two-stage fallback above this n')
+
+    # align benchmark
+    align_parser = subparsers.add_parser('align', help='Speaker-to-segment mapping speed')
+    align_parser.add_argument('--hours', type=float, default=4.0, help='Synthetic audio length in hours')
+    align_parser.add_argument('--segments', type=int, default=20000, help='Transcript segments')
+    align_parser.add_argument('--window', type=float, default=1.5, help='Window duration in seconds')
+    align_parser.add_argument('--hop', type=float, default=0.75, help='Hop duration in seconds')
+    align_parser.add_argument('--baseline-segments', type=int, default=500, help='Segments to time the baseline on')
+
+    # ann benchmark
+    ann_parser = subparsers.add_parser('ann', help='Speaker index recall and throughput')
+    ann_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000], help='Numbers of enrolled profiles')
+    ann_parser.add_argument('--queries', type=int, default=2000, help='Query embeddings')
+    ann_parser.add_argument('--dim', type=int, default=256, help='Embedding dimension')
+    ann_parser.add_argument('--noise', type=float, default=0.5, help='Query noise relative to the profile')
+
+    # startup benchmark
+    llm_parser = subparsers.add_parser('llm', help='LLM client concurrency against a fake server')
+    llm_parser.add_argument('--calls', type=int, default=32, help='Calls per configuration')
+    llm_parser.add_argument('--baseline-calls', type=int, default=8, help='Calls to time the sequential baseline on')
+    llm_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8], help='Client concurrency limits')
+    llm_parser.add_argument('--latency', type=float, default=0.5, help='Fake server seconds per generation')
+    llm_parser.add_argument('--fail-rate', type=float, default=0.1, help='Fraction of calls answered with 503')
+    llm_parser.add_argument('--stall-rate', type=float, default=0.0, help='Fraction of streams cut off halfway')
+
+    startup_parser = subparsers.add_parser('startup', help='CLI startup time and imports')
+    startup_parser.add_argument('commands', nargs='*', help='Subcommands to time, quoted (default: light commands)')
+    startup_parser.add_argument('--repeat', type=int, default=3, help='Runs per command')
+    startup_parser.add_argument('--top', type=int, default=5, help='Slowest top-level imports to show')
+    startup_parser.add_argument('--max-ms', type=float, help='Fail if a command takes longer than this')
+
+    args = parser.parse_args()
+
+    commands = {
+        'embed': bench_embed,
+        'silence': bench_silence,
+        'cluster': bench_cluster,
+        'align': bench_align,
+        'ann': bench_ann,
+        'llm': bench_llm,
+        'startup': bench_startup,
+    }
+
+    command_func = commands.get(args.command)
+    if command_func:
+        return command_func(args)
+    else:
+        parser.print_help()
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,9 +6,13 @@ Commands:
   transcribe       Transcribe audio with speaker diarization
   enroll-speaker   Enroll a new speaker for identification
   list-speakers    List all enrolled speakers
+  migrate-speakers Move enrolled speakers from database.json to the SQLite store
   rediarize        Re-run diarization on existing transcript
   summarize        Generate AI summary from transcript
+  summarize-batch  Summarize many transcripts with one shared LLM client
   process-full     Run complete pipeline (transcribe + refine + format + summarize)
+  serve            Run the transcription service with models kept loaded
+  submit           Submit a job to a running service
 """
 import argparse
 import sys
@@ -19,15 +23,18 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.transcriber import EnhancedTranscriber
-from src.diarization import EnhancedDiarization
-from src.speaker_id import SpeakerDatabase
-from src.summarizer import MeetingSummarizer
+# Heavy modules (torch, faster-whisper, sklearn, resemblyzer) are imported
+# inside the commands that need them so light commands start quickly
 from src.utils.config import get_config
 
 
 def cmd_transcribe(args):
     """Transcribe audio with speaker diarization."""
+    from src.diarization import EnhancedDiarization, embeddings_path
+    from src.transcriber import EnhancedTranscriber
+    from src.utils.audio import decode_audio
+    from src.utils.transcript import write_transcript_with_speakers
+
     print(f"🚀 Transcribing: {args.audio}")
     print(f"   Model: {args.model}")
     print(f"   Device: {args.device}")
@@ -40,26 +47,34 @@ def cmd_transcribe(args):
         config.set('transcription', 'model', value=args.model)
     if args.device:
         config.set('transcription', 'device', value=args.device)
+    if getattr(args, 'mode', None):
+        config.set('transcription', 'mode', value=args.mode)
+    if getattr(args, 'batch_size', None):
+        config.set('transcription', 'batch_size', value=args.batch_size)
 
     transcriber = EnhancedTranscriber(args.config)
 
+    # Decode once and share the samples between transcription and diarization
+    audio = decode_audio(args.audio, cache_dir=config.get_pcm_cache_dir())
+
     # Transcribe with diarization
     num_speakers = int(args.num_speakers) if args.num_speakers else None
     segments, info = transcriber.transcribe_with_speakers(
-        args.audio,
+        audio,
         num_speakers=num_speakers
     )
 
     # Format output
     diarization = EnhancedDiarization(args.config)
+    output_file = args.output or "transcript_speakers.txt"
     diarized_segments = diarization.diarize(
-        args.audio,
+        audio,
         num_speakers=num_speakers,
-        segments=segments
+        segments=segments,
+        embeddings_file=embeddings_path(output_file)
     )
 
     # Write output
-    output_file = args.output or "transcript_speakers.txt"
     write_transcript_with_speakers(diarized_segments, output_file)
 
     print("")
@@ -71,6 +86,8 @@ def cmd_transcribe(args):
 
 def cmd_enroll_speaker(args):
     """Enroll a new speaker."""
+    from src.speaker_id import SpeakerDatabase
+
     print(f"🎤 Enrolling speaker: {args.name}")
     print(f"   Samples: {len(args.samples)}")
     print("")
@@ -99,6 +116,8 @@ def cmd_enroll_speaker(args):
 
 def cmd_list_speakers(args):
     """List all enrolled speakers."""
+    from src.speaker_id import SpeakerDatabase
+
     db = SpeakerDatabase(args.config)
     speakers = db.list_speakers()
 
@@ -123,11 +142,47 @@ def cmd_list_speakers(args):
     return 0
 
 
+def cmd_migrate_speakers(args):
+    """Copy speakers from database.json into the SQLite store."""
+    from src.speaker_store import SqliteSpeakerStore, migrate_json_store
+
+    config = get_config(args.config)
+    json_path = args.json or config.get('speaker_identification', 'database_path')
+    store_path = args.store or config.get('speaker_identification', 'store_path', default='speakers/speakers.db')
+
+    if not Path(json_path).exists():
+        print(f"❌ JSON database not found: {json_path}")
+        return 1
+
+    print(f"🔄 Migrating speakers: {json_path} -> {store_path}")
+    copied = migrate_json_store(json_path, store_path, overwrite=args.overwrite)
+
+    if args.compact:
+        SqliteSpeakerStore(store_path).compact()
+
+    print(f"✅ Migrated {copied} speakers ({len(SqliteSpeakerStore(store_path))} in store)")
+    if config.get('speaker_identification', 'backend', default='sqlite') != 'sqlite':
+        print("   Set speaker_identification.backend: sqlite in config.yaml to use it")
+    return 0
+
+
 def cmd_rediarize(args):
     """Re-run diarization on existing transcript."""
+    from src.diarization import EnhancedDiarization, embeddings_path
+    from src.utils.transcript import parse_transcript, write_transcript_with_speakers
+
+    # Without audio, re-cluster the embeddings saved next to the transcript
+    embeddings_file = args.embeddings
+    if not embeddings_file and not args.audio:
+        embeddings_file = embeddings_path(args.transcript)
+
     print(f"🔄 Re-diarizing: {args.transcript}")
-    print(f"   Audio: {args.audio}")
-    print(f"   Method: {args.method}")
+    if embeddings_file:
+        print(f"   Embeddings: {embeddings_file}")
+        print(f"   Algorithm: {args.algorithm or 'from config'}")
+    else:
+        print(f"   Audio: {args.audio}")
+        print(f"   Method: {args.method}")
     print("")
 
     # Load existing transcript
@@ -135,6 +190,11 @@ def cmd_rediarize(args):
         print(f"❌ Transcript not found: {args.transcript}")
         return 1
 
+    if embeddings_file and not Path(embeddings_file).exists():
+        print(f"❌ Embeddings not found: {embeddings_file}")
+        print("   Pass the audio file to re-diarize from scratch")
+        return 1
+
     # Initialize diarization
     config = get_config(args.config)
     config.set('diarization', 'method', value=args.method)
@@ -143,11 +203,20 @@ def cmd_rediarize(args):
 
     # Run diarization
     segments = parse_transcript(args.transcript)
-    diarized_segments = diarization.diarize(
-        args.audio,
-        num_speakers=int(args.num_speakers) if args.num_speakers else None,
-        segments=segments
-    )
+    num_speakers = int(args.num_speakers) if args.num_speakers else None
+    if embeddings_file:
+        diarized_segments = diarization.recluster(
+            embeddings_file,
+            num_speakers=num_speakers,
+            segments=segments,
+            algorithm=args.algorithm
+        )
+    else:
+        diarized_segments = diarization.diarize(
+            args.audio,
+            num_speakers=num_speakers,
+            segments=segments
+        )
 
     # Write output
     output_file = args.output or "transcript_speakers_rediarized.txt"
@@ -161,6 +230,8 @@ def cmd_rediarize(args):
 
 def cmd_summarize(args):
     """Generate AI summary from transcript."""
+    from src.summarizer import MeetingSummarizer
+
     print(f"🤖 Generating summary...")
     print(f"   Input: {args.transcript}")
     print(f"   Provider: {args.provider}")
@@ -180,8 +251,14 @@ def cmd_summarize(args):
 
     summarizer = MeetingSummarizer(args.config)
 
-    # Generate summary
-    summary = summarizer.summarize(transcript)
+    # Generate summary, reporting each section as soon as it has streamed in
+    def on_field(key, value):
+        print(f"   ✓ {key}")
+
+    try:
+        summary = summarizer.summarize(transcript, on_field=on_field)
+    finally:
+        summarizer.close()
 
     # Write output
     output_file = args.output or "summary.json"
@@ -190,6 +267,8 @@ def cmd_summarize(args):
 
     print(f"✅ Summary generated!")
     print(f"📄 Output: {output_file}")
+    if summary.get('cache'):
+        print(f"💾 Response cache: {summary['cache']['hits']} hits, {summary['cache']['misses']} misses")
 
     # Print preview
     if summary.get('executive_summary'):
@@ -199,11 +278,138 @@ def cmd_summarize(args):
     return 0
 
 
+def _summary_up_to_date(transcript_file: str, summary_file: str) -> bool:
+    """True if summary_file is newer than the transcript and not a failed summary."""
+    if not os.path.exists(summary_file) or os.path.getmtime(summary_file) < os.path.getmtime(transcript_file):
+        return False
+    try:
+        with open(summary_file, 'r', encoding='utf-8') as f:
+            return not json.load(f).get('error')
+    except (OSError, ValueError):
+        return False
+
+
+def cmd_summarize_batch(args):
+    """Summarize many transcripts with one shared summarizer."""
+    import glob
+    import time
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from datetime import datetime
+
+    from src.summarizer import MeetingSummarizer
+    from src.utils.transcript import output_base
+
+    transcripts = sorted({path for pattern in args.patterns for path in glob.glob(pattern, recursive=True)})
+    if not transcripts:
+        print(f"❌ No transcripts match: {' '.join(args.patterns)}")
+        return 1
+
+    config = get_config(args.config)
+    if args.provider:
+        config.set('summarization', 'provider', value=args.provider)
+    concurrency = args.concurrency or config.get('summarization', 'client', 'concurrency', default=4)
+    config.set('summarization', 'client', 'concurrency', value=concurrency)
+
+    print(f"🤖 Summarizing {len(transcripts)} transcripts")
+    print(f"   Provider: {config.get('summarization', 'provider')}")
+    print(f"   Requests in flight: {concurrency}")
+    print("")
+
+    # One summarizer: config, provider probe and connection pool are shared
+    summarizer = MeetingSummarizer(args.config)
+    started_at = datetime.now()
+
+    def summarize_file(transcript_file):
+        summary_file = f"{output_base(transcript_file)}_summary.json"
+        entry = {"transcript": transcript_file, "summary": summary_file}
+
+        if not args.force and _summary_up_to_date(transcript_file, summary_file):
+            entry["status"] = "skipped"
+            return entry
+
+        start = time.time()
+        with open(transcript_file, 'r', encoding='utf-8') as f:
+            summary = summarizer.summarize(f.read())
+        entry["latency_sec"] = round(time.time() - start, 2)
+
+        # Keep an earlier good summary rather than replacing it with a failure
+        if not summary.get('error') or not os.path.exists(summary_file):
+            with open(summary_file, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        entry["status"] = "failed" if summary.get('error') else "done"
+        entry.update(summary.get('usage', {}))
+        if summary.get('cache'):
+            entry["cache_hits"] = summary['cache']['hits']
+            entry["cache_misses"] = summary['cache']['misses']
+        if summary.get('map_reduce'):
+            entry["chunks"] = summary['map_reduce']['chunks']
+        if summary.get('error'):
+            entry["error"] = summary['error']
+        return entry
+
+    # Files in flight match the request limit so the client is kept busy;
+    # the client itself caps the requests actually sent
+    entries = {}
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(summarize_file, path): path for path in transcripts}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    entry = {"transcript": path, "status": "failed", "error": str(e)}
+                entries[path] = entry
+
+                if entry["status"] == "skipped":
+                    print(f"   ⏭️  {path} (up to date)")
+                elif entry["status"] == "done":
+                    tokens = entry.get('prompt_tokens', 0) + entry.get('completion_tokens', 0)
+                    cached = f", {entry['cache_hits']} cached" if entry.get('cache_hits') else ""
+                    print(f"   ✅ {path} ({entry['latency_sec']:.1f}s, {tokens} tokens{cached})")
+                else:
+                    print(f"   ❌ {path}: {entry.get('error')}")
+    finally:
+        summarizer.close()
+
+    files = [entries[path] for path in transcripts]
+    totals = {
+        "files": len(files),
+        **{status: sum(entry["status"] == status for entry in files) for status in ["done", "skipped", "failed"]},
+        **{
+            key: sum(entry.get(key, 0) for entry in files)
+            for key in ["calls", "prompt_tokens", "completion_tokens", "cache_hits", "cache_misses"]
+        },
+    }
+    report = {
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.now().isoformat(),
+        "elapsed_sec": round((datetime.now() - started_at).total_seconds(), 2),
+        "provider": summarizer.provider,
+        "model": summarizer.model,
+        "concurrency": concurrency,
+        "totals": totals,
+        "files": files,
+    }
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("")
+    print(f"{'✅' if not totals['failed'] else '⚠️ '} {totals['done']} summarized, "
+          f"{totals['skipped']} up to date, {totals['failed']} failed in {report['elapsed_sec']:.1f}s")
+    print(f"   Tokens: {totals['prompt_tokens']} prompt + {totals['completion_tokens']} completion")
+    print(f"📄 Report: {args.report}")
+    return 1 if totals['failed'] else 0
+
+
 def cmd_process_full(args):
-    """Run complete pipeline."""
+    """Run complete pipeline, resuming from cached stage artifacts."""
+    from src.pipeline import Pipeline
+
     print("╔════════════════════════════════════════════════════════════╗")
     print("║     Enhanced Indonesian Meeting Transcription System      ║")
-    print "╚════════════════════════════════════════════════════════════╝"
+    print("╚════════════════════════════════════════════════════════════╝")
     print("")
 
     # Check if audio exists
@@ -211,111 +417,106 @@ def cmd_process_full(args):
         print(f"❌ Audio file not found: {args.audio}")
         return 1
 
-    # Create args object for each step
-    transcribe_args = argparse.Namespace(
-        audio=args.audio,
-        model=args.model,
-        device=args.device,
-        num_speakers=args.num_speakers,
-        output="transcript_speakers.txt",
-        config=args.config
-    )
-
-    # Step 1: Transcribe
-    if cmd_transcribe(transcribe_args) != 0:
-        return 1
-
-    # Step 2: Refine (if not skipped)
-    if not args.no_refine:
-        print("\n🪄 Refining transcript...")
-        os.system(f"python3 refine_transcript.py")
-
-    # Step 3: Summarize (if requested)
-    if args.summarize:
-        print("\n🤖 Generating summary...")
-        transcript_file = "transcript_speakers_refined.txt"
-        if not Path(transcript_file).exists():
-            transcript_file = "transcript_speakers.txt"
-
-        summarize_args = argparse.Namespace(
-            transcript=transcript_file,
-            provider=args.provider,
-            output="summary.json",
-            config=args.config
+    config = get_config(args.config)
+    if args.model:
+        config.set('transcription', 'model', value=args.model)
+    if args.device:
+        config.set('transcription', 'device', value=args.device)
+    if args.provider:
+        config.set('summarization', 'provider', value=args.provider)
+
+    pipeline = Pipeline(args.config)
+
+    try:
+        result = pipeline.run(
+            args.audio,
+            output_base=args.output_base,
+            num_speakers=int(args.num_speakers) if args.num_speakers else None,
+            refine=not args.no_refine,
+            summarize=args.summarize,
+            force=args.force or ()
         )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
 
-        if cmd_summarize(summarize_args) != 0:
-            print("⚠️  Summarization failed, continuing...")
+    icons = {'ran': '✅', 'cached': '♻️ ', 'skipped': '⏭️ ', 'failed': '⚠️ '}
+    print("")
+    for stage, status in result['stages'].items():
+        print(f"  {icons[status]} {stage:<10s} {status}")
 
-    # Step 4: Format
-    print("\n🎨 Formatting output...")
-    os.system(f"python3 format_md.py")
+    print("\n📄 Output Files:")
+    for output in result['outputs']:
+        print(f"   - {output}")
 
     print("\n╔════════════════════════════════════════════════════════════╗")
-    print("║                    ✅ ALL COMPLETE! ✅                     ║"
+    print("║                    ✅ ALL COMPLETE! ✅                     ║")
     print("╚════════════════════════════════════════════════════════════╝")
 
     return 0
 
 
-def parse_transcript(filepath):
-    """Parse transcript file into segments."""
-    import re
-    from src.utils.audio import parse_time
+def cmd_serve(args):
+    """Run the transcription service."""
+    import logging
+    from src.service import serve
 
-    segments = []
-    current_speaker = None
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    serve(args.config, host=args.host, port=args.port, workers=args.workers)
 
-            speaker_match = re.match(r'^--- (.+?) ---$', line)
-            if speaker_match:
-                current_speaker = speaker_match.group(1)
-                continue
+    return 0
 
-            seg_match = re.match(r'\s*\[(\d+:\d+(?::\d+)?) - (\d+:\d+(?::\d+)?)\]\s*(.*)', line)
-            if seg_match and current_speaker:
-                start_str, end_str, text = seg_match.groups()
-                segments.append({
-                    'start': parse_time(start_str),
-                    'end': parse_time(end_str),
-                    'text': text.strip(),
-                    'speaker': current_speaker
-                })
 
-    return segments
+def cmd_submit(args):
+    """Submit a job to a running transcription service."""
+    from src.service import is_running, service_url, submit_job, wait_for_job
 
+    url = args.url or service_url(args.config)
 
-def write_transcript_with_speakers(segments, output_file):
-    """Write transcript with speaker labels to file."""
-    def format_time(seconds):
-        h = int(seconds // 3600)
-        m = int((seconds % 3600) // 60)
-        s = int(seconds % 60)
-        if h > 0:
-            return f"{h:02d}:{m:02d}:{s:02d}"
-        return f"{m:02d}:{s:02d}"
+    if args.check:
+        return 0 if is_running(url) else 1
 
-    lines = []
-    prev_speaker = None
+    if not is_running(url):
+        print(f"❌ Service not running at {url}")
+        print("   Start it with: python scripts/cli.py serve")
+        return 1
 
-    for seg in segments:
-        speaker = seg['speaker']
-        timestamp = f"[{format_time(seg['start'])} - {format_time(seg['end'])}]"
+    if not args.audio or not Path(args.audio).exists():
+        print(f"❌ Audio file not found: {args.audio}")
+        return 1
 
-        if speaker != prev_speaker:
-            lines.append("")
-            lines.append(f"--- {speaker} ---")
-            prev_speaker = speaker
+    # The service may run in another directory; send absolute paths
+    output_base = args.output_base or str(Path(args.audio).with_suffix(''))
+    params = {
+        'audio': os.path.abspath(args.audio),
+        'output_base': os.path.abspath(output_base),
+        'num_speakers': int(args.num_speakers) if args.num_speakers else None,
+        'refine': not args.no_refine,
+        'summarize': args.summarize,
+    }
 
-        lines.append(f"  {timestamp} {seg['text']}")
+    try:
+        job = submit_job(url, params)
+    except ValueError as e:
+        print(f"❌ Submit failed: {e}")
+        return 1
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines).strip())
+    print(f"📨 Submitted job {job['id']}: {args.audio}")
+
+    if args.no_wait:
+        return 0
+
+    job = wait_for_job(url, job['id'])
+    if job['status'] != 'done':
+        print(f"❌ Job failed: {job['error']}")
+        return 1
+
+    print(f"✅ Job complete in {job['finished_at'] - job['started_at']:.2f}s")
+    for output in job['outputs']:
+        print(f"📄 Output: {output}")
+
+    return 0
 
 
 def main():
@@ -336,6 +537,8 @@ def main():
     transcribe_parser.add_argument('--device', '-d', choices=['auto', 'cpu', 'cuda', 'mps'], default='auto', help='Device')
     transcribe_parser.add_argument('--num-speakers', '-n', help='Number of speakers')
     transcribe_parser.add_argument('--output', '-o', help='Output file path')
+    transcribe_parser.add_argument('--mode', choices=['sequential', 'batched', 'parallel'], help='Decoding mode (default from config)')
+    transcribe_parser.add_argument('--batch-size', type=int, help='Batch size for batched mode')
 
     # enroll-speaker command
     enroll_parser = subparsers.add_parser('enroll-speaker', help='Enroll a new speaker')
@@ -345,13 +548,22 @@ def main():
     # list-speakers command
     subparsers.add_parser('list-speakers', help='List enrolled speakers')
 
+    # migrate-speakers command
+    migrate_parser = subparsers.add_parser('migrate-speakers', help='Move speakers from database.json to the SQLite store')
+    migrate_parser.add_argument('--json', help='Source database.json (default from config)')
+    migrate_parser.add_argument('--store', help='Destination SQLite store (default from config)')
+    migrate_parser.add_argument('--overwrite', action='store_true', help='Replace speakers already in the store')
+    migrate_parser.add_argument('--compact', action='store_true', help='Reclaim unused embedding rows afterwards')
+
     # rediarize command
     rediarize_parser = subparsers.add_parser('rediarize', help='Re-run diarization')
-    rediarize_parser.add_argument('audio', help='Audio file path')
+    rediarize_parser.add_argument('audio', nargs='?', help='Audio file path (omit to re-cluster saved embeddings)')
     rediarize_parser.add_argument('--transcript', '-t', default='transcript_speakers.txt', help='Transcript file')
     rediarize_parser.add_argument('--method', '-m', choices=['pyannote', 'resemblyzer', 'hybrid'], default='hybrid', help='Diarization method')
     rediarize_parser.add_argument('--num-speakers', '-n', help='Number of speakers')
     rediarize_parser.add_argument('--output', '-o', help='Output file path')
+    rediarize_parser.add_argument('--embeddings', '-e', help='Saved embeddings (.npz) to re-cluster instead of audio')
+    rediarize_parser.add_argument('--algorithm', '-a', choices=['agglomerative', 'kmeans'], help='Clustering algorithm for saved embeddings')
 
     # summarize command
     summarize_parser = subparsers.add_parser('summarize', help='Generate AI summary')
@@ -359,6 +571,16 @@ def main():
     summarize_parser.add_argument('--provider', '-p', choices=['openai', 'local'], default='openai', help='AI provider')
     summarize_parser.add_argument('--output', '-o', help='Output file path')
 
+    # summarize-batch command
+    batch_parser = subparsers.add_parser('summarize-batch', help='Summarize many transcripts')
+    batch_parser.add_argument('patterns', nargs='+',
+                              help='Transcript files or glob patterns (quote globs, e.g. "output/*_speakers_refined.txt")')
+    batch_parser.add_argument('--provider', '-p', choices=['openai', 'local'], help='AI provider (default from config)')
+    batch_parser.add_argument('--concurrency', '-j', type=int,
+                              help='LLM requests in flight (default: summarization.client.concurrency)')
+    batch_parser.add_argument('--force', '-f', action='store_true', help='Summarize even if the summary is up to date')
+    batch_parser.add_argument('--report', default='summarize_batch_report.json', help='Run report path')
+
     # process-full command
     process_parser = subparsers.add_parser('process-full', help='Run complete pipeline')
     process_parser.add_argument('audio', help='Audio file path')
@@ -366,8 +588,29 @@ def main():
     process_parser.add_argument('--device', '-d', choices=['auto', 'cpu', 'cuda', 'mps'], default='auto', help='Device')
     process_parser.add_argument('--num-speakers', '-n', help='Number of speakers')
     process_parser.add_argument('--summarize', '-s', action='store_true', help='Generate AI summary')
-    process_parser.add_argument('--provider', '-p', choices=['openai', 'local'], default='openai', help='AI provider')
+    process_parser.add_argument('--provider', '-p', choices=['openai', 'local'], help='AI provider (default from config)')
     process_parser.add_argument('--no-refine', action='store_true', help='Skip text refinement')
+    process_parser.add_argument('--output-base', '-o', default='transcript', help='Output path prefix')
+    process_parser.add_argument('--force', '-f', action='append', metavar='STAGE',
+                                help='Recompute a stage even if cached (repeatable: decode, vad, transcribe, embed, cluster, refine, summarize, format; '
+                                     'vad needs parallel mode, embed the resemblyzer method)')
+
+    # serve command
+    serve_parser = subparsers.add_parser('serve', help='Run transcription service')
+    serve_parser.add_argument('--host', help='Bind address (default from config)')
+    serve_parser.add_argument('--port', type=int, help='Bind port (default from config)')
+    serve_parser.add_argument('--workers', '-w', type=int, help='Concurrent jobs (default from config)')
+
+    # submit command
+    submit_parser = subparsers.add_parser('submit', help='Submit a job to a running service')
+    submit_parser.add_argument('audio', nargs='?', help='Audio file path')
+    submit_parser.add_argument('--num-speakers', '-n', help='Number of speakers')
+    submit_parser.add_argument('--summarize', '-s', action='store_true', help='Generate AI summary')
+    submit_parser.add_argument('--no-refine', action='store_true', help='Skip text refinement')
+    submit_parser.add_argument('--output-base', '-o', help='Output path prefix (default: audio path without extension)')
+    submit_parser.add_argument('--url', help='Service URL (default from config)')
+    submit_parser.add_argument('--no-wait', action='store_true', help='Return after queueing the job')
+    submit_parser.add_argument('--check', action='store_true', help='Only check whether the service is running')
 
     args = parser.parse_args()
 
@@ -380,9 +623,13 @@ def main():
         'transcribe': cmd_transcribe,
         'enroll-speaker': cmd_enroll_speaker,
         'list-speakers': cmd_list_speakers,
+        'migrate-speakers': cmd_migrate_speakers,
         'rediarize': cmd_rediarize,
         'summarize': cmd_summarize,
-        'process-full': cmd_process_full
+        'summarize-batch': cmd_summarize_batch,
+        'process-full': cmd_process_full,
+        'serve': cmd_serve,
+        'submit': cmd_submit
     }
 
     command_func = commands.get(args.command)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Fake Ollama / OpenAI server for exercising the summarizer offline.
+
+Serves the endpoints the LLM client uses:
+  GET  /api/tags              Ollama model list
+  POST /api/generate          Ollama generation (NDJSON stream or JSON)
+  GET  /v1/models             OpenAI model list
+  POST /v1/chat/completions   OpenAI chat completion
+  GET  /stats                 Requests, TCP connections and peak concurrency
+
+Every generation returns a small valid summary JSON. Latency, transient
+failures (503), rate limiting (429) and stalled streams can be injected.
+
+Usage:
+  python scripts/fake_llm_server.py --port 11435 --latency 0.5 --fail-rate 0.2
+
+then point summarization.local.base_url (or summarization.openai.base_url,
+with .../v1) at it. start_server() runs it in-process instead.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+SUMMARY = {
+    "executive_summary": "Rapat membahas rencana kerja dan pembagian tugas.",
+    "key_topics": ["Rencana kerja", "Pembagian tugas"],
+    "discussion_points": [],
+    "decisions": [{"topic": "Rencana kerja", "decision": "Disetujui", "by": "Peserta rapat"}],
+    "action_items": [{"task": "Menyusun laporan", "pic": "Speaker 1", "deadline": "", "priority": "sedang"}],
+    "next_meeting": None,
+}
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """HTTP server holding the fault-injection options and counters."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        stall_rate: float = 0.0,
+        seed: int = 0
+    ):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rate_limit = rate_limit
+        self.stall_rate = stall_rate
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.status_counts = {}
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "peak_in_flight": self.peak_in_flight,
+                "status_counts": dict(self.status_counts),
+            }
+
+    def fault(self):
+        """Injected error status for the next generation, or None."""
+        with self.lock:
+            if self.rate_limit:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                if self._window_count > self.rate_limit:
+                    return 429
+            if self.random.random() < self.fail_rate:
+                return 503
+            return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.status_counts[status] = self.server.status_counts.get(status, 0) + 1
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "fake"}]})
+        elif self.path == "/v1/models":
+            self._send_json(200, {"data": [{"id": "fake"}]})
+        elif self.path == "/stats":
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+
+        try:
+            status = server.fault()
+            if status == 429:
+                self._send_json(429, {"error": "rate limited"}, {"Retry-After": "1"})
+            elif status is not None:
+                self._send_json(status, {"error": "unavailable"})
+            elif self.path == "/api/generate":
+                self._generate(request)
+            elif self.path == "/v1/chat/completions":
+                self._chat(request)
+            else:
+                self._send_json(404, {"error": "not found"})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _generate(self, request):
+        text = json.dumps(SUMMARY, ensure_ascii=False)
+        prompt_tokens = len(request.get("prompt", "")) // 4
+        done = {"done": True, "response": "", "prompt_eval_count": prompt_tokens,
+                "eval_count": len(text) // 4, "eval_duration": int(self.server.latency * 1e9)}
+
+        if not request.get("stream", True):
+            time.sleep(self.server.latency)
+            self._send_json(200, {**done, "response": text})
+            return
+
+        pieces = [text[i:i + 8] for i in range(0, len(text), 8)]
+        stall = self.server.random.random() < self.server.stall_rate
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for i, piece in enumerate(pieces):
+            if stall and i == len(pieces) // 2:
+                # Drop the connection mid-stream
+                self.close_connection = True
+                return
+            self._write_chunk((json.dumps({"response": piece, "done": False}) + "\n").encode('utf-8'))
+            time.sleep(self.server.latency / len(pieces))
+        self._write_chunk((json.dumps(done) + "\n").encode('utf-8'))
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+        with self.server.lock:
+            self.server.status_counts[200] = self.server.status_counts.get(200, 0) + 1
+
+    def _chat(self, request):
+        time.sleep(self.server.latency)
+        text = json.dumps(SUMMARY, ensure_ascii=False)
+        prompt = "".join(message.get("content", "") for message in request.get("messages", []))
+        self._send_json(200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(text) // 4,
+                "total_tokens": len(prompt) // 4 + len(text) // 4,
+            },
+        })
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **options) -> FakeLLMServer:
+    """
+    Start a fake server on a background thread.
+
+    Args:
+        host: Bind address
+        port: Port (0 = any free port; see server.url)
+        **options: latency, fail_rate, rate_limit, stall_rate, seed
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    server = FakeLLMServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Ollama / OpenAI server for offline testing')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=11435, help='Port')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds per generation')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of generations answered with 503')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Generations per second before 429 (0 = off)')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='Fraction of streams cut off halfway')
+    parser.add_argument('--seed', type=int, default=0, help='Fault injection seed')
+    args = parser.parse_args()
+
+    server = FakeLLMServer(
+        (args.host, args.port),
+        latency=args.latency,
+        fail_rate=args.fail_rate,
+        rate_limit=args.rate_limit,
+        stall_rate=args.stall_rate,
+        seed=args.seed
+    )
+    print(f"Fake LLM server on {server.url} (Ollama) and {server.url}/v1 (OpenAI)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Aligning speaker labels with transcript segments and words.
+
+Speaker evidence comes as time intervals: resemblyzer embedding windows or
+pyannote speaker turns. Both are held in an IntervalIndex (sorted starts
+plus a running maximum of ends), so the intervals overlapping any query are
+found with np.searchsorted, and every segment or word is labelled by
+overlap-weighted majority vote in a single np.bincount - instead of a scan
+over all intervals per segment.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+
+class IntervalIndex:
+    """
+    Static index answering "which intervals overlap [start, end)?".
+
+    Intervals are sorted by start, and a running maximum of their ends is
+    kept alongside (the augmented-maximum of an interval tree, flattened
+    into an array). Every interval that starts before a query's end and
+    lies after the last position whose running end is <= the query's start
+    is a candidate, so both bounds are one np.searchsorted each. For
+    sliding windows and diarization turns, which rarely nest, the
+    candidates are almost exactly the overlaps, and a batch of queries
+    costs O((queries + intervals) log n) plus the size of the output.
+    """
+
+    def __init__(self, starts, ends):
+        """
+        Build the index.
+
+        Args:
+            starts: Interval start times
+            ends: Interval end times
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+
+        self.order = np.argsort(starts, kind='stable')
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        self._max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlaps(self, query_starts, query_ends):
+        """
+        Find all overlapping (query, interval) pairs.
+
+        Args:
+            query_starts: Query start times
+            query_ends: Query end times
+
+        Returns:
+            Tuple of (query indices, interval indices in sorted order,
+            overlap durations); pairs that only touch have overlap 0
+        """
+        query_starts = np.asarray(query_starts, dtype=np.float64)
+        query_ends = np.maximum(np.asarray(query_ends, dtype=np.float64), query_starts)
+
+        lo = np.searchsorted(self._max_ends, query_starts, side='right')
+        hi = np.searchsorted(self.starts, query_ends, side='left')
+        counts = np.maximum(hi - lo, 0)
+
+        # Flatten the candidate runs into pairs
+        query_idx = np.repeat(np.arange(len(query_starts)), counts)
+        run_offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        interval_idx = np.repeat(lo, counts) + run_offsets
+
+        overlap = (
+            np.minimum(self.ends[interval_idx], query_ends[query_idx])
+            - np.maximum(self.starts[interval_idx], query_starts[query_idx])
+        )
+        return query_idx, interval_idx, np.maximum(overlap, 0.0)
+
+    def nearest(self, times) -> np.ndarray:
+        """Sorted-order index of the interval with the nearest centre to each time."""
+        return _nearest((self.starts + self.ends) / 2, np.asarray(times, dtype=np.float64))
+
+
+def vote_labels(
+    win_starts: np.ndarray,
+    win_ends: np.ndarray,
+    labels: np.ndarray,
+    query_starts: np.ndarray,
+    query_ends: np.ndarray
+) -> np.ndarray:
+    """
+    Label each query interval by overlap-weighted majority vote.
+
+    Every window overlapping a query votes for its label with the duration
+    of the overlap. Queries no window overlaps (e.g. inside a long silence
+    that produced no embeddings, or zero-length words) take the label of
+    the window with the nearest centre.
+
+    Args:
+        win_starts: Window start times
+        win_ends: Window end times
+        labels: Window labels (non-negative ints)
+        query_starts: Query start times
+        query_ends: Query end times
+
+    Returns:
+        Array of labels, one per query
+    """
+    index = IntervalIndex(win_starts, win_ends)
+    labels = np.asarray(labels, dtype=np.int64)[index.order]
+    query_starts = np.asarray(query_starts, dtype=np.float64)
+    query_ends = np.asarray(query_ends, dtype=np.float64)
+
+    n_queries = len(query_starts)
+    if n_queries == 0 or len(labels) == 0:
+        return np.zeros(n_queries, dtype=np.int64)
+
+    query_idx, win_idx, overlap = index.overlaps(query_starts, query_ends)
+
+    n_labels = int(labels.max()) + 1
+    votes = np.bincount(
+        query_idx * n_labels + labels[win_idx],
+        weights=overlap,
+        minlength=n_queries * n_labels
+    ).reshape(n_queries, n_labels)
+
+    result = votes.argmax(axis=1)
+
+    uncovered = votes.sum(axis=1) <= 0
+    if np.any(uncovered):
+        result[uncovered] = labels[index.nearest((query_starts[uncovered] + query_ends[uncovered]) / 2)]
+
+    return result
+
+
+def _nearest(points: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Index of the nearest point for each value (points nearly sorted)."""
+    if len(points) == 1:
+        return np.zeros(len(values), dtype=np.int64)
+    order = np.argsort(points, kind='stable')
+    sorted_points = points[order]
+    idx = np.clip(np.searchsorted(sorted_points, values), 1, len(sorted_points) - 1)
+    left = sorted_points[idx - 1]
+    right = sorted_points[idx]
+    return order[np.where(values - left <= right - values, idx - 1, idx)]
+
+
+def assign_speakers_to_segments(
+    segments: List[Dict],
+    win_starts: np.ndarray,
+    win_ends: np.ndarray,
+    labels: np.ndarray
+) -> List[Dict]:
+    """
+    Set 'speaker' on transcript segments and on their words.
+
+    Segments are labelled by overlap vote over their whole span. When a
+    segment carries a 'words' list (EnhancedTranscriber with word
+    timestamps), every word is labelled by its own vote as well, which
+    marks speaker changes inside a segment.
+
+    Args:
+        segments: Transcript segments with start and end (modified in place)
+        win_starts: Window start times
+        win_ends: Window end times
+        labels: Window cluster labels 0..k-1
+
+    Returns:
+        The labelled segments
+    """
+    if not segments:
+        return segments
+
+    seg_labels = vote_labels(
+        win_starts, win_ends, labels,
+        [seg['start'] for seg in segments],
+        [seg['end'] for seg in segments]
+    )
+    for seg, label in zip(segments, seg_labels):
+        seg['speaker'] = f"Speaker {label + 1}"
+
+    words = [word for seg in segments for word in (seg.get('words') or [])]
+    if words:
+        word_labels = vote_labels(
+            win_starts, win_ends, labels,
+            [word['start'] for word in words],
+            [word['end'] for word in words]
+        )
+        for word, label in zip(words, word_labels):
+            word['speaker'] = f"Speaker {label + 1}"
+
+    return segments
+
+
+def _segment_text(words: List[Dict]) -> str:
+    """Join faster-whisper words, which carry their own leading spaces."""
+    return ''.join(word['word'] for word in words).strip()
+
+
+def align_segments_to_turns(segments: List[Dict], turns: List[Dict]) -> List[Dict]:
+    """
+    Label transcript segments from diarization turns, splitting on speaker changes.
+
+    Every word is assigned the turn speaker it overlaps most. A segment whose
+    words change speaker is split at each change, so each output segment
+    carries one speaker and only the text spoken in it. Segments without
+    word timestamps are labelled as a whole.
+
+    Args:
+        segments: Transcript segments with start, end, text and optional
+                  'words' (from EnhancedTranscriber.transcribe)
+        turns: Diarization turns with start, end and speaker (e.g. from
+               diarize_pyannote)
+
+    Returns:
+        New list of segments with start, end, text, speaker and words
+    """
+    if not segments or not turns:
+        return segments
+
+    speakers = sorted(set(turn['speaker'] for turn in turns))
+    speaker_ids = {speaker: i for i, speaker in enumerate(speakers)}
+    turn_labels = [speaker_ids[turn['speaker']] for turn in turns]
+    turn_starts = [turn['start'] for turn in turns]
+    turn_ends = [turn['end'] for turn in turns]
+
+    words = [word for seg in segments for word in (seg.get('words') or [])]
+    word_labels = iter(vote_labels(
+        turn_starts, turn_ends, turn_labels,
+        [word['start'] for word in words],
+        [word['end'] for word in words]
+    )) if words else iter(())
+
+    plain = [seg for seg in segments if not seg.get('words')]
+    plain_labels = iter(vote_labels(
+        turn_starts, turn_ends, turn_labels,
+        [seg['start'] for seg in plain],
+        [seg['end'] for seg in plain]
+    )) if plain else iter(())
+
+    result = []
+    for seg in segments:
+        if not seg.get('words'):
+            result.append({**seg, 'speaker': speakers[next(plain_labels)]})
+            continue
+
+        # Group consecutive words with the same speaker
+        runs = []
+        for word in seg['words']:
+            speaker = speakers[next(word_labels)]
+            word = {**word, 'speaker': speaker}
+            if runs and runs[-1][0] == speaker:
+                runs[-1][1].append(word)
+            else:
+                runs.append((speaker, [word]))
+
+        for i, (speaker, run_words) in enumerate(runs):
+            piece = {
+                **seg,
+                'start': seg['start'] if i == 0 else run_words[0]['start'],
+                'end': seg['end'] if i == len(runs) - 1 else run_words[-1]['end'],
+                'speaker': speaker,
+                'words': run_words,
+            }
+            if len(runs) > 1:
+                piece['text'] = _segment_text(run_words)
+            result.append(piece)
+
+    return result
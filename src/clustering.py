@@ -0,0 +1,227 @@
+"""
+Scalable hierarchical clustering of speaker embeddings.
+
+The linkage tree is built once and then cut at any distance threshold or
+speaker count without re-clustering. Up to max_direct_samples embeddings
+are clustered directly from a float32 condensed distance matrix; longer
+inputs are first over-clustered with mini-batch KMeans and the centroids
+are merged agglomeratively, so memory stays bounded on all-day sessions.
+"""
+import logging
+from typing import Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalise rows as float32."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+def condensed_distances(embeddings: np.ndarray, metric: str = 'cosine', block_size: int = 1024) -> np.ndarray:
+    """
+    Compute the condensed pairwise distance matrix in float32.
+
+    Same layout as scipy.spatial.distance.pdist, at half the memory.
+
+    Args:
+        embeddings: Array of shape (n, dim)
+        metric: 'cosine' or 'euclidean'
+        block_size: Rows per matrix product
+
+    Returns:
+        Condensed distances of length n * (n - 1) / 2
+    """
+    if metric == 'cosine':
+        x = _normalize(embeddings)
+    elif metric == 'euclidean':
+        x = np.asarray(embeddings, dtype=np.float32)
+        sq_norms = np.einsum('ij,ij->i', x, x)
+    else:
+        raise ValueError(f"Unsupported metric: {metric}")
+
+    n = len(x)
+    out = np.empty(n * (n - 1) // 2, dtype=np.float32)
+    offset = 0
+
+    for block_start in range(0, n, block_size):
+        block_end = min(block_start + block_size, n)
+        gram = x[block_start:block_end] @ x[block_start:].T
+
+        if metric == 'cosine':
+            dist = 1.0 - gram
+        else:
+            dist = sq_norms[block_start:block_end, None] + sq_norms[None, block_start:] - 2.0 * gram
+            np.sqrt(np.maximum(dist, 0.0), out=dist)
+
+        # Row i of the block holds distances to columns i+1.. of the upper triangle
+        for i in range(block_end - block_start):
+            row = dist[i, i + 1:]
+            out[offset:offset + len(row)] = row
+            offset += len(row)
+
+    np.maximum(out, 0.0, out=out)
+    return out
+
+
+def relabel_by_first_appearance(labels: np.ndarray) -> np.ndarray:
+    """
+    Renumber cluster labels 0..k-1 in order of first appearance.
+
+    With time-ordered embeddings, Speaker 1 is then the first to speak.
+    """
+    _, first_index, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    order = np.argsort(np.argsort(first_index))
+    return order[inverse]
+
+
+def sampled_silhouette(
+    embeddings: np.ndarray,
+    labels: np.ndarray,
+    metric: str = 'cosine',
+    sample_size: Optional[int] = 2000,
+    random_state: int = 0
+) -> float:
+    """
+    Silhouette score on a random sample of points.
+
+    The exact score is O(n^2); a few thousand points estimate it closely.
+
+    Args:
+        embeddings: Array of shape (n, dim)
+        labels: Cluster labels
+        metric: Distance metric
+        sample_size: Points to sample (None = all)
+        random_state: Sampling seed
+
+    Returns:
+        Silhouette score, or -1 if undefined (fewer than 2 clusters)
+    """
+    from sklearn.metrics import silhouette_score
+
+    n_labels = len(np.unique(labels))
+    if n_labels < 2 or n_labels >= len(labels):
+        return -1.0
+
+    if sample_size is not None and sample_size >= len(labels):
+        sample_size = None
+
+    return float(silhouette_score(
+        embeddings, labels, metric=metric, sample_size=sample_size, random_state=random_state
+    ))
+
+
+class LinkageTree:
+    """
+    Agglomerative linkage tree over speaker embeddings, built once.
+
+    Cutting at a threshold follows sklearn's AgglomerativeClustering
+    convention: clusters closer than the threshold are merged.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        metric: str = 'cosine',
+        linkage: str = 'average',
+        max_direct_samples: int = 5000,
+        n_centroids: int = 500,
+        random_state: int = 0
+    ):
+        """
+        Build the linkage tree.
+
+        Args:
+            embeddings: Array of shape (n, dim)
+            metric: 'cosine' or 'euclidean'
+            linkage: 'average', 'complete' or 'single'
+            max_direct_samples: Above this, over-cluster with KMeans first
+            n_centroids: KMeans clusters for the two-stage fallback
+            random_state: KMeans seed
+        """
+        from scipy.cluster.hierarchy import linkage as build_linkage
+
+        self.metric = metric
+        self.n_samples = len(embeddings)
+
+        if self.n_samples < 2:
+            self.assignments = np.zeros(self.n_samples, dtype=np.int64)
+            self.tree = None
+            return
+
+        if self.n_samples <= max_direct_samples:
+            points = embeddings
+            self.assignments = np.arange(self.n_samples)
+        else:
+            points, self.assignments = self._overcluster(embeddings, n_centroids, random_state)
+            logger.info(f"Over-clustered {self.n_samples} embeddings into {len(points)} centroids")
+
+        self.tree = build_linkage(condensed_distances(points, metric), method=linkage)
+
+    def _overcluster(self, embeddings: np.ndarray, n_centroids: int, random_state: int):
+        """Mini-batch KMeans over-clustering; returns (centroids, assignments)."""
+        from sklearn.cluster import MiniBatchKMeans
+
+        # Cosine distance on unit vectors is monotonic in Euclidean distance
+        points = _normalize(embeddings) if self.metric == 'cosine' else np.asarray(embeddings, dtype=np.float32)
+
+        # Random init: k-means++ seeding dominates the runtime at hundreds of
+        # centroids, and over-clustering does not need a careful start
+        kmeans = MiniBatchKMeans(
+            n_clusters=min(n_centroids, len(points)),
+            init='random',
+            batch_size=4096,
+            n_init=3,
+            random_state=random_state
+        )
+        assignments = kmeans.fit_predict(points)
+
+        # Drop empty centroids so every tree leaf has members
+        used, assignments = np.unique(assignments, return_inverse=True)
+        return kmeans.cluster_centers_[used], assignments
+
+    def _labels(self, leaf_labels: np.ndarray) -> np.ndarray:
+        """Map tree-leaf labels to input points."""
+        return relabel_by_first_appearance(leaf_labels[self.assignments])
+
+    def cut_distance(self, threshold: float) -> np.ndarray:
+        """
+        Labels after merging every pair of clusters closer than threshold.
+
+        Args:
+            threshold: Linkage distance threshold
+
+        Returns:
+            Array of labels 0..k-1
+        """
+        from scipy.cluster.hierarchy import fcluster
+
+        if self.tree is None:
+            return self.assignments.copy()
+
+        # fcluster keeps merges <= t; sklearn merges only < t
+        leaf_labels = fcluster(self.tree, np.nextafter(threshold, 0.0), criterion='distance')
+        return self._labels(leaf_labels)
+
+    def cut_count(self, n_clusters: int) -> np.ndarray:
+        """
+        Labels for (at most) n_clusters clusters.
+
+        Args:
+            n_clusters: Number of clusters
+
+        Returns:
+            Array of labels 0..k-1
+        """
+        from scipy.cluster.hierarchy import fcluster
+
+        if self.tree is None:
+            return self.assignments.copy()
+
+        leaf_labels = fcluster(self.tree, n_clusters, criterion='maxclust')
+        return self._labels(leaf_labels)
@@ -2,21 +2,139 @@
 Enhanced speaker diarization module with pyannote.audio and resemblyzer.
 """
 import logging
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+import os
+from typing import Dict, List, Optional, Tuple, Any, Union
 import time
 
 import numpy as np
-from sklearn.cluster import AgglomerativeClustering
-from sklearn.metrics import silhouette_score
 
+from .alignment import align_segments_to_turns, assign_speakers_to_segments
+from .clustering import LinkageTree, relabel_by_first_appearance, sampled_silhouette
+from .models import acquire_voice_encoder, get_registry
 from .utils.config import get_config
-from .utils.audio import load_audio_as_wav
+from .utils.audio import (
+    DecodedAudio,
+    amplitude_envelope,
+    iter_audio_blocks,
+    sliding_windows,
+    window_mean_amplitude,
+)
+from .utils.transcript import output_base
 
 
 logger = logging.getLogger(__name__)
 
 
+def embed_utterances(encoder, wavs: List[np.ndarray], batch_size: int = 64) -> np.ndarray:
+    """
+    Embed many utterances with batched forward passes.
+
+    Equivalent to calling encoder.embed_utterance() on each wav, but the
+    mel partials of up to batch_size utterances are stacked into a single
+    tensor, so the model runs once per batch instead of once per window.
+
+    Args:
+        encoder: resemblyzer VoiceEncoder
+        wavs: List of preprocessed 16 kHz audio arrays
+        batch_size: Number of utterances per forward pass
+
+    Returns:
+        Array of L2-normalised embeddings with shape (len(wavs), 256)
+    """
+    import torch
+    from resemblyzer import VoiceEncoder
+    from resemblyzer import audio as rz_audio
+
+    if batch_size <= 1:
+        return np.array([encoder.embed_utterance(wav) for wav in wavs])
+
+    embeddings = []
+    for batch_start in range(0, len(wavs), batch_size):
+        mels = []
+        counts = []
+
+        for wav in wavs[batch_start:batch_start + batch_size]:
+            # Same slicing and padding as VoiceEncoder.embed_utterance
+            wav_slices, mel_slices = VoiceEncoder.compute_partial_slices(len(wav), 1.3, 0.75)
+            max_wave_length = wav_slices[-1].stop
+            if max_wave_length >= len(wav):
+                wav = np.pad(wav, (0, max_wave_length - len(wav)), "constant")
+            mel = rz_audio.wav_to_mel_spectrogram(wav)
+            mels.extend(mel[s] for s in mel_slices)
+            counts.append(len(mel_slices))
+
+        with torch.no_grad():
+            partial_embeds = encoder(torch.from_numpy(np.array(mels)).to(encoder.device)).cpu().numpy()
+
+        # Average each utterance's partials and renormalise
+        bounds = np.cumsum([0] + counts)
+        for s, e in zip(bounds[:-1], bounds[1:]):
+            raw_embed = partial_embeds[s:e].mean(axis=0)
+            embeddings.append(raw_embed / np.linalg.norm(raw_embed, 2))
+
+    return np.array(embeddings)
+
+
+# Bump when the saved embeddings layout changes
+EMBEDDINGS_FORMAT_VERSION = 1
+
+
+def embeddings_path(transcript_path: str) -> str:
+    """
+    Get the embeddings file that belongs to a transcript.
+
+    Args:
+        transcript_path: Transcript file path
+
+    Returns:
+        {output_base}_embeddings.npz for the transcript's output base
+    """
+    return f"{output_base(transcript_path)}_embeddings.npz"
+
+
+def save_embeddings(path: str, embeddings: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """
+    Save speaker embeddings and their time spans.
+
+    Embeddings are stored as float16 (512 bytes per window), which is
+    well within clustering tolerance for unit-norm vectors.
+
+    Args:
+        path: Output .npz path
+        embeddings: Embedding array (n, dim)
+        starts: Span start times in seconds (n,)
+        ends: Span end times in seconds (n,)
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            version=np.int32(EMBEDDINGS_FORMAT_VERSION),
+            embeddings=np.asarray(embeddings, dtype=np.float16),
+            starts=np.asarray(starts, dtype=np.float64),
+            ends=np.asarray(ends, dtype=np.float64),
+        )
+    os.replace(tmp_path, path)
+    logger.info(f"Saved {len(embeddings)} embeddings to {path}")
+
+
+def load_embeddings(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Load embeddings saved by save_embeddings().
+
+    Args:
+        path: .npz path
+
+    Returns:
+        Tuple of (float32 embeddings, starts, ends)
+    """
+    with np.load(path) as data:
+        version = int(data['version'])
+        if version != EMBEDDINGS_FORMAT_VERSION:
+            raise ValueError(f"Unsupported embeddings file version {version}: {path}")
+        return data['embeddings'].astype(np.float32), data['starts'], data['ends']
+
+
 class EnhancedDiarization:
     """
     Speaker diarization with multiple backends.
@@ -38,9 +156,19 @@ class EnhancedDiarization:
         self.method = self.config.get('diarization', 'method')
         self.pyannote_model = None
         self.resemblyzer_encoder = None
+        self.model_keys = []
 
         logger.info(f"Diarization method: {self.method}")
 
+    def close(self):
+        """Release the model references held by this diarizer."""
+        registry = get_registry()
+        for key in self.model_keys:
+            registry.release(key)
+        self.model_keys = []
+        self.pyannote_model = None
+        self.resemblyzer_encoder = None
+
     def _load_pyannote_model(self):
         """Load pyannote.audio model."""
         try:
@@ -56,24 +184,35 @@ class EnhancedDiarization:
                 )
                 raise ValueError("HuggingFace token required for pyannote.audio")
 
-            model_name = self.config.get('diarization', 'pyannote', 'model')
-            logger.info(f"Loading pyannote.audio model: {model_name}")
-
-            self.pyannote_model = Pipeline.from_pretrained(
-                model_name,
-                use_auth_token=hf_token
-            )
-
-            # Move to GPU if available
             import torch
+
+            model_name = self.config.get('diarization', 'pyannote', 'model')
             if torch.cuda.is_available():
-                self.pyannote_model = self.pyannote_model.to(torch.device("cuda"))
-                logger.info("pyannote.audio: Using CUDA")
+                device = "cuda"
             elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
-                self.pyannote_model = self.pyannote_model.to(torch.device("mps"))
-                logger.info("pyannote.audio: Using MPS")
+                device = "mps"
+            else:
+                device = "cpu"
+
+            def load():
+                logger.info(f"Loading pyannote.audio model: {model_name}")
+
+                pipeline = Pipeline.from_pretrained(
+                    model_name,
+                    use_auth_token=hf_token
+                )
+
+                # Move to GPU if available
+                if device != "cpu":
+                    pipeline = pipeline.to(torch.device(device))
+                    logger.info(f"pyannote.audio: Using {device.upper()}")
 
-            logger.info("pyannote.audio model loaded successfully")
+                logger.info("pyannote.audio model loaded successfully")
+                return pipeline
+
+            key = ('pyannote', model_name, device, None)
+            self.pyannote_model = get_registry().acquire(key, load)
+            self.model_keys.append(key)
 
         except ImportError:
             logger.error("pyannote.audio not installed. Install with: pip install pyannote.audio")
@@ -85,16 +224,8 @@ class EnhancedDiarization:
     def _load_resemblyzer_encoder(self):
         """Load resemblyzer encoder."""
         try:
-            from resemblyzer import VoiceEncoder
-
-            device = self.config.get('transcription', 'device')
-            if device in ['cuda', 'mps']:
-                encoder_device = device
-            else:
-                encoder_device = 'cpu'
-
-            logger.info(f"Loading resemblyzer encoder on {encoder_device}")
-            self.resemblyzer_encoder = VoiceEncoder(device=encoder_device)
+            key, self.resemblyzer_encoder = acquire_voice_encoder(self.config.get('transcription', 'device'))
+            self.model_keys.append(key)
 
         except ImportError:
             logger.error("resemblyzer not installed. Install with: pip install resemblyzer")
@@ -105,14 +236,14 @@ class EnhancedDiarization:
 
     def diarize_pyannote(
         self,
-        audio_path: str,
+        audio: Union[str, DecodedAudio],
         num_speakers: Optional[int] = None
     ) -> List[Dict]:
         """
         Diarize using pyannote.audio.
 
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file or already decoded audio
             num_speakers: Expected number of speakers (optional)
 
         Returns:
@@ -121,7 +252,18 @@ class EnhancedDiarization:
         if not self.pyannote_model:
             self._load_pyannote_model()
 
-        logger.info(f"Running pyannote.audio diarization on: {audio_path}")
+        if isinstance(audio, DecodedAudio):
+            import torch
+
+            logger.info(f"Running pyannote.audio diarization on: {audio.path or 'in-memory audio'}")
+            # Hand the shared samples to pyannote instead of letting it decode the file again
+            pipeline_input = {
+                "waveform": torch.from_numpy(np.asarray(audio.samples)).unsqueeze(0),
+                "sample_rate": audio.sample_rate,
+            }
+        else:
+            logger.info(f"Running pyannote.audio diarization on: {audio}")
+            pipeline_input = audio
 
         # Prepare parameters
         kwargs = {}
@@ -129,7 +271,7 @@ class EnhancedDiarization:
             kwargs["num_speakers"] = num_speakers
 
         # Run diarization
-        diarization = self.pyannote_model(audio_path, **kwargs)
+        diarization = self.pyannote_model(pipeline_input, **kwargs)
 
         # Convert to list of segments
         segments = []
@@ -143,70 +285,144 @@ class EnhancedDiarization:
         logger.info(f"pyannote.audio detected {len(set(s['speaker'] for s in segments))} speakers")
         return segments
 
-    def diarize_resemblyzer(
+    def _diarize_pyannote_segments(
         self,
-        audio_path: str,
+        audio: Union[str, DecodedAudio],
         num_speakers: Optional[int] = None,
         segments: Optional[List[Dict]] = None
+    ) -> List[Dict]:
+        """
+        Diarize with pyannote.audio and align the turns to transcript segments.
+
+        Without segments the raw turns are returned.
+        """
+        turns = self.diarize_pyannote(audio, num_speakers)
+        if not segments:
+            return turns
+
+        aligned = align_segments_to_turns(segments, turns)
+        logger.info(f"Aligned {len(segments)} segments to {len(turns)} turns ({len(aligned)} segments after splitting)")
+        return aligned
+
+    def diarize_resemblyzer(
+        self,
+        audio: Union[str, DecodedAudio],
+        num_speakers: Optional[int] = None,
+        segments: Optional[List[Dict]] = None,
+        embeddings_file: Optional[str] = None
     ) -> List[Dict]:
         """
         Diarize using resemblyzer embeddings and clustering.
 
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file or already decoded audio
             num_speakers: Expected number of speakers
             segments: Optional pre-segmented audio (e.g., from transcript)
+            embeddings_file: Optional .npz path to save the window embeddings
+                             to, for re-clustering with recluster()
 
         Returns:
             List of diarization segments with speaker labels
         """
-        if not self.resemblyzer_encoder:
-            self._load_resemblyzer_encoder()
+        if isinstance(audio, DecodedAudio):
+            logger.info(f"Running resemblyzer diarization on: {audio.path or 'in-memory audio'}")
+        else:
+            logger.info(f"Running resemblyzer diarization on: {audio}")
 
-        logger.info(f"Running resemblyzer diarization on: {audio_path}")
+        embeddings, time_points = self.extract_embeddings(audio)
 
-        # Load audio
-        wav = load_audio_as_wav(audio_path)
-        sample_rate = 16000
-        total_duration = len(wav) / sample_rate
+        if embeddings_file and len(embeddings):
+            half_window = self.config.get('diarization', 'resemblyzer', 'window_duration_sec') / 2
+            save_embeddings(embeddings_file, embeddings, time_points - half_window, time_points + half_window)
 
-        # Extract embeddings using sliding window
-        chunk_duration = self.config.get('diarization', 'resemblyzer', 'chunk_duration_sec')
-        hop_duration = self.config.get('diarization', 'resemblyzer', 'hop_duration_sec')
-        window_duration = self.config.get('diarization', 'resemblyzer', 'window_duration_sec')
-        amplitude_threshold = self.config.get('diarization', 'resemblyzer', 'amplitude_threshold')
+        return self.assign_speakers(embeddings, time_points, num_speakers, segments)
 
-        embeddings = []
-        time_points = []
+    def recluster(
+        self,
+        embeddings_file: str,
+        num_speakers: Optional[int] = None,
+        segments: Optional[List[Dict]] = None,
+        algorithm: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Re-run clustering from saved embeddings, without audio or models.
 
-        for start_t in np.arange(0, total_duration - window_duration, hop_duration):
-            s = int(start_t * sample_rate)
-            e = int((start_t + window_duration) * sample_rate)
-            chunk = wav[s:e]
+        Args:
+            embeddings_file: .npz written by diarize_resemblyzer() or transcribe.py
+            num_speakers: Expected number of speakers
+            segments: Optional transcript segments to label
+            algorithm: 'agglomerative' or 'kmeans' (default from config)
 
-            # Skip silence
-            if np.abs(chunk).mean() < amplitude_threshold:
-                continue
+        Returns:
+            Labelled transcript segments, or one segment per window
+        """
+        embeddings, starts, ends = load_embeddings(embeddings_file)
+        logger.info(f"Loaded {len(embeddings)} embeddings from {embeddings_file}")
+
+        return self.assign_speakers(
+            embeddings,
+            (starts + ends) / 2,
+            num_speakers,
+            segments,
+            algorithm=algorithm,
+            window_bounds=(starts, ends)
+        )
 
-            try:
-                embedding = self.resemblyzer_encoder.embed_utterance(chunk)
-                embeddings.append(embedding)
-                time_points.append(start_t + window_duration / 2)
-            except Exception as e:
-                logger.warning(f"Failed to embed chunk at {start_t:.2f}s: {e}")
-                continue
+    def extract_embeddings(self, audio: Union[str, DecodedAudio]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract sliding-window speaker embeddings.
+
+        Args:
+            audio: Path to audio file or already decoded audio
+
+        Returns:
+            Tuple of (embeddings (n, dim), window center times (n,))
+        """
+        if not self.resemblyzer_encoder:
+            self._load_resemblyzer_encoder()
+
+        embeddings, time_points = self._extract_window_embeddings(audio)
+        logger.info(f"Extracted {len(embeddings)} speaker embeddings")
 
         if not embeddings:
+            return np.zeros((0, 256), dtype=np.float32), np.zeros(0)
+        return np.array(embeddings, dtype=np.float32), np.array(time_points)
+
+    def assign_speakers(
+        self,
+        embeddings: np.ndarray,
+        time_points: np.ndarray,
+        num_speakers: Optional[int] = None,
+        segments: Optional[List[Dict]] = None,
+        algorithm: Optional[str] = None,
+        window_bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> List[Dict]:
+        """
+        Cluster window embeddings and label segments with speakers.
+
+        Args:
+            embeddings: Window embeddings from extract_embeddings()
+            time_points: Window center times
+            num_speakers: Expected number of speakers
+            segments: Optional transcript segments to label
+            algorithm: 'agglomerative' or 'kmeans' (default from config)
+            window_bounds: Optional (starts, ends) of the windows; defaults
+                           to time_points -/+ half the configured window
+
+        Returns:
+            Labelled transcript segments, or one segment per window
+        """
+        window_duration = self.config.get('diarization', 'resemblyzer', 'window_duration_sec')
+
+        if len(embeddings) == 0:
             logger.error("No valid embeddings extracted")
             return []
 
-        embeddings_array = np.array(embeddings)
-        logger.info(f"Extracted {len(embeddings)} speaker embeddings")
-
         # Cluster embeddings
         labels = self._cluster_embeddings(
-            embeddings_array,
-            num_speakers=num_speakers
+            embeddings,
+            num_speakers=num_speakers,
+            algorithm=algorithm
         )
 
         n_speakers = len(set(labels))
@@ -215,15 +431,123 @@ class EnhancedDiarization:
         # Map speakers to segments
         if segments:
             # Map labels to existing transcript segments
-            return self._map_speakers_to_segments(segments, time_points, labels)
+            if window_bounds is None:
+                time_points = np.asarray(time_points)
+                window_bounds = (time_points - window_duration / 2, time_points + window_duration / 2)
+            return self._map_speakers_to_segments(segments, window_bounds, labels)
         else:
             # Create segments from clustering
             return self._create_segments_from_labels(time_points, labels, window_duration)
 
+    def _extract_window_embeddings(
+        self,
+        audio: Union[str, DecodedAudio]
+    ) -> Tuple[List[np.ndarray], List[float]]:
+        """
+        Extract speaker embeddings over a sliding window.
+
+        Audio is consumed block by block, so peak memory stays constant
+        however long the recording is. Blocks overlap by one window so every
+        window is seen whole in exactly one block.
+
+        Args:
+            audio: Path to audio file or already decoded audio
+
+        Returns:
+            Tuple of (embeddings, time_points) where time_points are window
+            centres in seconds
+        """
+        sample_rate = self.config.get('audio', 'sample_rate', default=16000)
+        block_duration = self.config.get('audio', 'stream', 'block_duration_sec', default=60.0)
+        hop_duration = self.config.get('diarization', 'resemblyzer', 'hop_duration_sec')
+        window_duration = self.config.get('diarization', 'resemblyzer', 'window_duration_sec')
+        amplitude_threshold = self.config.get('diarization', 'resemblyzer', 'amplitude_threshold')
+
+        window_size = int(window_duration * sample_rate)
+        hop_size = int(hop_duration * sample_rate)
+        block_duration = max(block_duration, 2 * window_duration)
+
+        batch_size = self.config.get('diarization', 'resemblyzer', 'batch_size', default=64)
+
+        embeddings = []
+        time_points = []
+        pending_chunks = []
+        pending_times = []
+        window_start = 0  # global sample index of the next window
+
+        def flush():
+            batch = self._embed_windows(pending_chunks, pending_times)
+            for embedding, start_t in zip(batch, pending_times):
+                if embedding is not None:
+                    embeddings.append(embedding)
+                    time_points.append(start_t + window_duration / 2)
+            pending_chunks.clear()
+            pending_times.clear()
+
+        blocks = iter_audio_blocks(
+            audio,
+            sample_rate=sample_rate,
+            block_duration=block_duration,
+            overlap=window_duration,
+            cache_dir=self.config.get_pcm_cache_dir()
+        )
+
+        for offset, block in blocks:
+            # All windows that fit in this block, as local index arrays
+            starts, ends = sliding_windows(len(block), window_size, hop_size, first_start=window_start - offset)
+            if len(starts) == 0:
+                continue
+            window_start = offset + int(starts[-1]) + hop_size
+
+            # Skip silence: one envelope gives the mean amplitude of every window
+            envelope = amplitude_envelope(block)
+            voiced = window_mean_amplitude(envelope, starts, ends) >= amplitude_threshold
+
+            for s in starts[voiced]:
+                pending_chunks.append(block[s:s + window_size])
+                pending_times.append((offset + s) / sample_rate)
+                if len(pending_chunks) >= batch_size:
+                    flush()
+
+        if pending_chunks:
+            flush()
+
+        return embeddings, time_points
+
+    def _embed_windows(
+        self,
+        chunks: List[np.ndarray],
+        start_times: List[float]
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Embed a batch of windows, falling back to one-by-one on failure.
+
+        Args:
+            chunks: Audio windows
+            start_times: Window start times in seconds (for logging)
+
+        Returns:
+            List of embeddings aligned with chunks (None where embedding failed)
+        """
+        try:
+            return list(embed_utterances(self.resemblyzer_encoder, chunks, batch_size=len(chunks)))
+        except Exception as e:
+            logger.debug(f"Batched embedding failed, retrying per window: {e}")
+
+        results = []
+        for chunk, start_t in zip(chunks, start_times):
+            try:
+                results.append(self.resemblyzer_encoder.embed_utterance(chunk))
+            except Exception as e:
+                logger.warning(f"Failed to embed chunk at {start_t:.2f}s: {e}")
+                results.append(None)
+        return results
+
     def _cluster_embeddings(
         self,
         embeddings: np.ndarray,
-        num_speakers: Optional[int] = None
+        num_speakers: Optional[int] = None,
+        algorithm: Optional[str] = None
     ) -> np.ndarray:
         """
         Cluster speaker embeddings.
@@ -231,25 +555,46 @@ class EnhancedDiarization:
         Args:
             embeddings: Speaker embedding array
             num_speakers: Expected number of speakers
+            algorithm: 'agglomerative' or 'kmeans' (default from config)
 
         Returns:
             Array of cluster labels
         """
         metric = self.config.get('diarization', 'clustering', 'metric')
         linkage = self.config.get('diarization', 'clustering', 'linkage')
+        algorithm = algorithm or self.config.get('diarization', 'clustering', 'algorithm', default='agglomerative')
+
+        if algorithm == 'kmeans':
+            from sklearn.cluster import KMeans
+
+            if not num_speakers:
+                # KMeans needs a count; take it from the agglomerative estimate
+                num_speakers = len(set(self._cluster_embeddings(embeddings, algorithm='agglomerative')))
+
+            # Embeddings are unit-norm, so Euclidean KMeans tracks cosine distance
+            clustering = KMeans(n_clusters=min(num_speakers, len(embeddings)), n_init=10, random_state=0)
+            return relabel_by_first_appearance(clustering.fit_predict(embeddings))
+
+        if algorithm != 'agglomerative':
+            raise ValueError(f"Unknown clustering algorithm: {algorithm}")
+
+        # Build the linkage tree once; every threshold below is just a cut
+        tree = LinkageTree(
+            embeddings,
+            metric=metric,
+            linkage=linkage,
+            max_direct_samples=self.config.get('diarization', 'clustering', 'max_direct_samples', default=5000),
+            n_centroids=self.config.get('diarization', 'clustering', 'n_centroids', default=500)
+        )
 
         if num_speakers and num_speakers > 1:
-            clustering = AgglomerativeClustering(
-                n_clusters=num_speakers,
-                metric=metric,
-                linkage=linkage
-            )
-            return clustering.fit_predict(embeddings)
+            return tree.cut_count(num_speakers)
 
         # Auto-detect optimal number of speakers
         min_speakers = self.config.get('diarization', 'clustering', 'min_speakers')
         max_speakers = self.config.get('diarization', 'clustering', 'max_speakers')
         distance_threshold = self.config.get('diarization', 'clustering', 'distance_threshold')
+        sample_size = self.config.get('diarization', 'clustering', 'silhouette_sample_size', default=2000)
 
         best_labels = None
         best_score = -1
@@ -257,19 +602,13 @@ class EnhancedDiarization:
 
         # Try progressive thresholds
         for threshold in [0.55, 0.45, 0.35, 0.25]:
-            clustering = AgglomerativeClustering(
-                n_clusters=None,
-                distance_threshold=threshold,
-                metric=metric,
-                linkage=linkage
-            )
-            labels = clustering.fit_predict(embeddings)
+            labels = tree.cut_distance(threshold)
             n = len(set(labels))
 
             if min_speakers <= n <= max_speakers:
                 # Calculate silhouette score
                 if n >= 2:
-                    score = silhouette_score(embeddings, labels, metric=metric)
+                    score = sampled_silhouette(embeddings, labels, metric=metric, sample_size=sample_size)
                     logger.debug(f"Threshold {threshold}: {n} speakers, score {score:.4f}")
 
                     if score > best_score:
@@ -281,13 +620,7 @@ class EnhancedDiarization:
 
         if best_labels is None:
             # Fallback to default threshold
-            clustering = AgglomerativeClustering(
-                n_clusters=None,
-                distance_threshold=distance_threshold,
-                metric=metric,
-                linkage=linkage
-            )
-            best_labels = clustering.fit_predict(embeddings)
+            best_labels = tree.cut_distance(distance_threshold)
 
         logger.info(f"Selected {best_n} speakers (silhouette score: {best_score:.4f})")
         return best_labels
@@ -295,20 +628,17 @@ class EnhancedDiarization:
     def _map_speakers_to_segments(
         self,
         segments: List[Dict],
-        time_points: List[float],
+        window_bounds: Tuple[np.ndarray, np.ndarray],
         labels: np.ndarray
     ) -> List[Dict]:
-        """Map speaker labels to transcript segments."""
-        result = []
-
-        for seg in segments:
-            mid = (seg["start"] + seg["end"]) / 2
-            idx = np.abs(np.array(time_points) - mid).argmin()
-            speaker_id = labels[idx]
-            seg["speaker"] = f"Speaker {speaker_id + 1}"
-            result.append(seg)
+        """
+        Map speaker labels to transcript segments (and their words).
 
-        return result
+        Each segment takes the label with the most overlap among the
+        windows it covers; see src.alignment.
+        """
+        starts, ends = window_bounds
+        return assign_speakers_to_segments(segments, starts, ends, labels)
 
     def _create_segments_from_labels(
         self,
@@ -330,17 +660,20 @@ class EnhancedDiarization:
 
     def diarize(
         self,
-        audio_path: str,
+        audio: Union[str, DecodedAudio],
         num_speakers: Optional[int] = None,
-        segments: Optional[List[Dict]] = None
+        segments: Optional[List[Dict]] = None,
+        embeddings_file: Optional[str] = None
     ) -> List[Dict]:
         """
         Run diarization using configured method.
 
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file or already decoded audio
             num_speakers: Expected number of speakers (optional)
             segments: Optional transcript segments for mapping
+            embeddings_file: Optional .npz path for the resemblyzer window
+                             embeddings (not written when pyannote is used)
 
         Returns:
             List of diarization segments with speaker labels
@@ -349,24 +682,24 @@ class EnhancedDiarization:
 
         if self.method == "pyannote":
             try:
-                result = self.diarize_pyannote(audio_path, num_speakers)
+                result = self._diarize_pyannote_segments(audio, num_speakers, segments)
             except Exception as e:
                 logger.error(f"pyannote.audio failed: {e}")
                 logger.info("Falling back to resemblyzer")
                 self.method = "resemblyzer"
-                result = self.diarize_resemblyzer(audio_path, num_speakers, segments)
+                result = self.diarize_resemblyzer(audio, num_speakers, segments, embeddings_file)
 
         elif self.method == "resemblyzer":
-            result = self.diarize_resemblyzer(audio_path, num_speakers, segments)
+            result = self.diarize_resemblyzer(audio, num_speakers, segments, embeddings_file)
 
         elif self.method == "hybrid":
             # Try pyannote first, fallback to resemblyzer
             try:
-                result = self.diarize_pyannote(audio_path, num_speakers)
+                result = self._diarize_pyannote_segments(audio, num_speakers, segments)
             except Exception as e:
                 logger.warning(f"pyannote.audio unavailable: {e}")
                 logger.info("Using resemblyzer fallback")
-                result = self.diarize_resemblyzer(audio_path, num_speakers, segments)
+                result = self.diarize_resemblyzer(audio, num_speakers, segments, embeddings_file)
 
         else:
             raise ValueError(f"Unknown diarization method: {self.method}")
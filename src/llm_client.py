@@ -0,0 +1,687 @@
+"""
+Asynchronous provider layer for LLM calls.
+
+MeetingSummarizer sends every model call through one LLMClient. The client
+runs an asyncio event loop on a background thread with a pooled keep-alive
+HTTP client: httpx when installed, otherwise a requests session driven
+from worker threads. Blocking callers, such as the map-reduce thread pool
+or several service jobs, submit coroutines to that loop. All of their
+calls therefore share connections, a concurrency limit, OpenAI rate
+limits, and retries with jittered exponential backoff bounded by a
+per-call deadline.
+
+Providers speak the plain HTTP APIs (Ollama /api/generate, OpenAI
+/v1/chat/completions), so scripts/fake_llm_server.py can stand in for
+either one offline.
+"""
+import asyncio
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class LLMRequestError(RuntimeError):
+    """A failed LLM call; retryable errors are retried until the deadline."""
+
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = False,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        connect_failed: bool = False
+    ):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status = status
+        self.retry_after = retry_after
+        self.connect_failed = connect_failed
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """
+    Exponential backoff with jitter: uniform in [d/2, d], d = base * 2^attempt.
+
+    Jitter keeps concurrent callers that failed together (e.g. on a 429)
+    from retrying in lockstep.
+    """
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _check_status(status: int, text: str, headers) -> None:
+    """Raise LLMRequestError for HTTP error statuses."""
+    if status < 400:
+        return
+
+    retry_after = None
+    try:
+        retry_after = float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        pass
+
+    raise LLMRequestError(
+        f"HTTP {status}: {text[:200]}",
+        retryable=status == 429 or status >= 500,
+        status=status,
+        retry_after=retry_after
+    )
+
+
+def _parse_json(data) -> Any:
+    """Decode a JSON body or NDJSON line; malformed data is retryable."""
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        raise LLMRequestError(f"Invalid JSON in response: {data[:200]!r}", retryable=True) from e
+
+
+def _read_timeout(timeout: float, deadline: Optional[float]) -> float:
+    """Per-read timeout, capped by the time left before the call's deadline."""
+    if deadline is None:
+        return timeout
+    return max(min(timeout, deadline - asyncio.get_running_loop().time()), 0.001)
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket: capacity tokens, refilled at rate per second.
+
+    acquire() waits until enough tokens are available. Requests larger than
+    the capacity wait for a full bucket instead of forever.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class HttpxTransport:
+    """Pooled keep-alive HTTP on httpx.AsyncClient."""
+
+    def __init__(self, max_connections: int):
+        import httpx
+
+        self._httpx = httpx
+        self.client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        ))
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        payload: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: float = 60.0,
+        on_line: Optional[Callable[[Dict], None]] = None,
+        deadline: Optional[float] = None
+    ) -> Any:
+        """
+        Send a JSON request.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            payload: JSON body
+            headers: Extra headers
+            timeout: Seconds to wait for each read (connect: 10 s)
+            on_line: If given, the response is read as NDJSON and each
+                     message is passed to on_line as it arrives
+            deadline: Optional event loop time the call must finish by;
+                      no read waits past it
+
+        Returns:
+            Decoded response, or the last NDJSON message
+        """
+        httpx = self._httpx
+        timeout = httpx.Timeout(_read_timeout(timeout, deadline), connect=10.0)
+
+        try:
+            if on_line is None:
+                response = await self.client.request(method, url, json=payload, headers=headers, timeout=timeout)
+                _check_status(response.status_code, response.text, response.headers)
+                return _parse_json(response.content)
+
+            async with self.client.stream(method, url, json=payload, headers=headers, timeout=timeout) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    _check_status(response.status_code, response.text, response.headers)
+                message = None
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        message = _parse_json(line)
+                        on_line(message)
+                return message
+
+        except httpx.ConnectError as e:
+            raise LLMRequestError(f"Connection failed: {e!r}", retryable=True, connect_failed=True) from e
+        except httpx.TimeoutException as e:
+            raise LLMRequestError(f"Request timed out: {e!r}", retryable=True) from e
+        except httpx.TransportError as e:
+            raise LLMRequestError(f"Response interrupted: {e!r}", retryable=True) from e
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class RequestsTransport:
+    """Pooled keep-alive HTTP on a requests.Session, run on worker threads."""
+
+    def __init__(self, max_connections: int):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._requests = requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="llm-http")
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        payload: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: float = 60.0,
+        on_line: Optional[Callable[[Dict], None]] = None,
+        deadline: Optional[float] = None
+    ) -> Any:
+        """
+        Send a JSON request; see HttpxTransport.request.
+
+        A worker thread cannot be interrupted, so when the awaiting task is
+        cancelled (e.g. by the client deadline) the worker is flagged and
+        closes its response at the next line; the read timeout is capped by
+        the deadline so a stalled read cannot outlive it either.
+        """
+        loop = asyncio.get_running_loop()
+        cancelled = threading.Event()
+        try:
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(
+                    self._request, method, url, payload, headers,
+                    _read_timeout(timeout, deadline), on_line, cancelled
+                )
+            )
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    def _request(self, method, url, payload, headers, timeout, on_line, cancelled):
+        requests = self._requests
+
+        if cancelled.is_set():
+            raise LLMRequestError("Request cancelled")
+
+        try:
+            response = self.session.request(
+                method, url, json=payload, headers=headers, stream=on_line is not None, timeout=(10, timeout)
+            )
+        except requests.exceptions.Timeout as e:
+            raise LLMRequestError(f"Request timed out: {e}", retryable=True) from e
+        except requests.exceptions.ConnectionError as e:
+            raise LLMRequestError(f"Connection failed: {e}", retryable=True, connect_failed=True) from e
+
+        try:
+            with response:
+                if on_line is None:
+                    _check_status(response.status_code, response.text, response.headers)
+                    return _parse_json(response.content)
+
+                _check_status(response.status_code, response.text if response.status_code >= 400 else "",
+                              response.headers)
+                message = None
+                for line in response.iter_lines(chunk_size=None):
+                    if cancelled.is_set():
+                        # Leaving the with block closes the connection
+                        raise LLMRequestError("Request cancelled")
+                    if line.strip():
+                        message = _parse_json(line)
+                        on_line(message)
+                return message
+
+        # requests reports a read timeout mid-body as a ConnectionError
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+            raise LLMRequestError(f"Response interrupted: {e}", retryable=True) from e
+
+    async def aclose(self):
+        self.session.close()
+        self._executor.shutdown(wait=False)
+
+
+def create_transport(max_connections: int):
+    """httpx transport, or the requests one if httpx is not installed."""
+    try:
+        return HttpxTransport(max_connections)
+    except ImportError:
+        logger.warning("httpx not installed, using a pooled requests session for LLM calls. "
+                       "Install with: pip install httpx")
+        return RequestsTransport(max_connections)
+
+
+class OllamaProvider:
+    """Ollama /api/generate, streamed by default."""
+
+    name = "local"
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        temperature: float = 0.3,
+        stream: bool = True,
+        timeout: float = 300,
+        progress_interval: float = 10,
+        continuation_prompt: Optional[Callable[[str, str], str]] = None
+    ):
+        """
+        Initialize provider.
+
+        Args:
+            base_url: Ollama URL (e.g. http://localhost:11434)
+            model: Model name
+            temperature: Sampling temperature
+            stream: Stream tokens; the timeout then applies between tokens
+                    and a cut-off stream is retried as a continuation
+            timeout: Seconds to wait for the response (or the next token)
+            progress_interval: Seconds between progress logs while streaming
+            continuation_prompt: Optional fn(prompt, partial) building the
+                                 prompt that continues a cut-off response
+        """
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.temperature = temperature
+        self.stream = stream
+        self.timeout = timeout
+        self.progress_interval = progress_interval
+        self.continuation_prompt = continuation_prompt
+        self.max_tokens = None
+
+    async def check(self, transport) -> bool:
+        """True if the server answers /api/tags."""
+        try:
+            await transport.request('GET', f"{self.base_url}/api/tags", timeout=5)
+            return True
+        except LLMRequestError:
+            return False
+
+    async def generate(
+        self,
+        transport,
+        prompt: str,
+        state: Dict[str, Any],
+        on_piece: Optional[Callable[[str, bool], None]] = None,
+        deadline: Optional[float] = None
+    ) -> Tuple[str, Dict[str, int]]:
+        """
+        Make one attempt.
+
+        Args:
+            transport: HTTP transport
+            prompt: The prompt
+            state: Per-call dict kept across attempts; holds the partial
+                   output of a stream that was cut off
+            on_piece: Optional callback(piece, reset) per streamed piece;
+                      reset=True means the model restarted its answer and
+                      piece replaces everything before it
+            deadline: Optional event loop time the call must finish by
+
+        Returns:
+            Tuple of (response text, usage dict)
+        """
+        partial = state.get('partial', "")
+        if partial and self.continuation_prompt is not None:
+            logger.info(f"Continuing from {len(partial)} characters of partial output")
+            request_prompt = self.continuation_prompt(prompt, partial)
+        else:
+            partial = ""
+            request_prompt = prompt
+
+        payload = {
+            "model": self.model,
+            "prompt": request_prompt,
+            "stream": self.stream,
+            "options": {
+                "temperature": self.temperature
+            }
+        }
+        url = f"{self.base_url}/api/generate"
+
+        try:
+            if not self.stream:
+                data = await transport.request('POST', url, payload, timeout=self.timeout, deadline=deadline)
+                result = data.get("response", "")
+            else:
+                data, continuation = await self._stream(
+                    transport, url, payload, state, partial, on_piece, deadline
+                )
+
+                # A model that restarts its answer instead of continuing replaces the partial output
+                if partial and continuation.lstrip().startswith(("{", "```")):
+                    partial = ""
+                    if on_piece is not None:
+                        on_piece(continuation, True)
+                result = partial + continuation
+
+        except LLMRequestError as e:
+            if e.status == 404:
+                logger.error(f"Model '{self.model}' not found. Download it with: ollama pull {self.model}")
+            elif e.connect_failed:
+                logger.error(f"Failed to connect to Ollama at {self.base_url}. "
+                             f"Make sure Ollama is running: ollama serve")
+            raise
+
+        if not result:
+            raise LLMRequestError("Empty response from local LLM", retryable=True)
+
+        usage = {
+            "prompt_tokens": data.get("prompt_eval_count", 0),
+            "completion_tokens": data.get("eval_count", 0),
+        }
+        return result, usage
+
+    async def _stream(self, transport, url, payload, state, partial, on_piece, deadline):
+        """Stream one response; returns (final message, text received)."""
+        received = []
+        start = time.time()
+        progress = {"last_report": start}
+
+        def on_line(message):
+            if message.get("error"):
+                raise LLMRequestError(f"Ollama error: {message['error']}", retryable=True)
+
+            piece = message.get("response", "")
+            if piece:
+                received.append(piece)
+                if on_piece is not None:
+                    on_piece(piece, False)
+
+            now = time.time()
+            if now - progress["last_report"] >= self.progress_interval:
+                logger.info(f"Local LLM: {len(received)} tokens, {len(received) / (now - start):.1f} tokens/s")
+                progress["last_report"] = now
+
+        try:
+            final = await transport.request(
+                'POST', url, payload, timeout=self.timeout, on_line=on_line, deadline=deadline
+            )
+            if not final or not final.get("done"):
+                raise LLMRequestError("Stream ended before completion", retryable=True)
+        except LLMRequestError:
+            # Keep what arrived; the retry continues from it
+            state['partial'] = partial + "".join(received)
+            raise
+
+        elapsed = time.time() - start
+        eval_count = final.get("eval_count", len(received))
+        eval_seconds = final.get("eval_duration", 0) / 1e9 or elapsed
+        logger.info(f"Local LLM done: {eval_count} tokens in {elapsed:.1f}s "
+                    f"({eval_count / max(eval_seconds, 1e-9):.1f} tokens/s)")
+        return final, "".join(received)
+
+
+class OpenAIProvider:
+    """OpenAI-compatible /chat/completions."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        temperature: float = 0.3,
+        max_tokens: int = 2000,
+        base_url: str = "https://api.openai.com/v1",
+        timeout: float = 120,
+        system_prompt: Optional[str] = None
+    ):
+        """
+        Initialize provider.
+
+        Args:
+            api_key: API key
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Maximum completion tokens
+            base_url: API base URL
+            timeout: Seconds to wait for the response
+            system_prompt: Optional system message
+        """
+        self.api_key = api_key
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.system_prompt = system_prompt
+
+    async def check(self, transport) -> bool:
+        """True if the API answers /models with this key."""
+        try:
+            await transport.request(
+                'GET', f"{self.base_url}/models",
+                headers={"Authorization": f"Bearer {self.api_key}"}, timeout=10
+            )
+            return True
+        except LLMRequestError:
+            return False
+
+    async def generate(
+        self,
+        transport,
+        prompt: str,
+        state: Dict[str, Any],
+        on_piece: Optional[Callable[[str, bool], None]] = None,
+        deadline: Optional[float] = None
+    ) -> Tuple[str, Dict[str, int]]:
+        """Make one attempt; see OllamaProvider.generate."""
+        messages = [{"role": "user", "content": prompt}]
+        if self.system_prompt:
+            messages.insert(0, {"role": "system", "content": self.system_prompt})
+
+        data = await transport.request(
+            'POST',
+            f"{self.base_url}/chat/completions",
+            {
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+            },
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=self.timeout,
+            deadline=deadline
+        )
+
+        try:
+            result = data["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError) as e:
+            raise LLMRequestError(f"Unexpected OpenAI response: {str(data)[:200]}", retryable=True) from e
+        if not result:
+            raise LLMRequestError("Empty response from OpenAI", retryable=True)
+        if on_piece is not None:
+            on_piece(result, False)
+
+        usage = data.get("usage") or {}
+        return result, {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+        }
+
+
+class LLMClient:
+    """
+    Shared, thread-safe front end to one provider.
+
+    generate() may be called from any number of threads; at most
+    `concurrency` calls are in flight at once.
+    """
+
+    def __init__(
+        self,
+        provider,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        deadline_sec: float = 900,
+        backoff_base_sec: float = 1.0,
+        backoff_max_sec: float = 30.0,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None
+    ):
+        """
+        Start the client's event loop.
+
+        Args:
+            provider: OllamaProvider or OpenAIProvider
+            concurrency: Maximum calls in flight (also the connection pool size)
+            max_retries: Maximum attempts per call
+            deadline_sec: Give up on a call (including retries) after this long
+            backoff_base_sec: First retry delay (doubled per attempt, jittered)
+            backoff_max_sec: Cap on the retry delay
+            requests_per_minute: Request rate limit (None = unlimited)
+            tokens_per_minute: Token rate limit, charged with the estimated
+                               prompt tokens plus max_tokens (None = unlimited)
+        """
+        self.provider = provider
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(1, max_retries)
+        self.deadline_sec = deadline_sec
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+        self._closed = False
+
+        # Loop-bound objects are created on the loop
+        self._run(self._setup())
+
+    async def _setup(self):
+        self.transport = create_transport(self.concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._request_bucket = None
+        self._token_bucket = None
+        if self.requests_per_minute:
+            self._request_bucket = TokenBucket(self.requests_per_minute / 60, self.requests_per_minute)
+        if self.tokens_per_minute:
+            self._token_bucket = TokenBucket(self.tokens_per_minute / 60, self.tokens_per_minute)
+
+    def _run(self, coro):
+        """Run a coroutine on the client loop and wait for its result."""
+        if self._closed:
+            raise RuntimeError("LLMClient is closed")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def check(self) -> bool:
+        """True if the provider is reachable."""
+        return self._run(self.provider.check(self.transport))
+
+    def generate(
+        self,
+        prompt: str,
+        on_piece: Optional[Callable[[str, bool], None]] = None,
+        prompt_tokens: int = 0
+    ) -> Tuple[str, Dict[str, int]]:
+        """Blocking generate(); see agenerate."""
+        return self._run(self.agenerate(prompt, on_piece, prompt_tokens))
+
+    async def agenerate(
+        self,
+        prompt: str,
+        on_piece: Optional[Callable[[str, bool], None]] = None,
+        prompt_tokens: int = 0
+    ) -> Tuple[str, Dict[str, int]]:
+        """
+        Generate a response, retrying transient failures until the deadline.
+
+        Must run on the client loop (generate() takes care of that).
+
+        Args:
+            prompt: The prompt
+            on_piece: Optional callback(piece, reset) for streamed output
+            prompt_tokens: Estimated prompt tokens, for the token rate limit
+
+        Returns:
+            Tuple of (response text, usage dict with prompt_tokens and
+            completion_tokens)
+
+        Raises:
+            LLMRequestError: If the call fails permanently, runs out of
+                             attempts, or reaches the deadline
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_sec
+        state = {}
+        attempt = 0
+
+        while True:
+            try:
+                async with self._semaphore:
+                    if self._request_bucket is not None:
+                        await self._request_bucket.acquire(1)
+                    if self._token_bucket is not None:
+                        await self._token_bucket.acquire(prompt_tokens + (self.provider.max_tokens or 0))
+
+                    remaining = max(deadline - loop.time(), 0.001)
+                    return await asyncio.wait_for(
+                        self.provider.generate(self.transport, prompt, state, on_piece, deadline),
+                        timeout=remaining
+                    )
+
+            except asyncio.TimeoutError as e:
+                raise LLMRequestError(f"No response within the {self.deadline_sec}s deadline") from e
+
+            except LLMRequestError as e:
+                attempt += 1
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+
+                delay = backoff_delay(attempt - 1, self.backoff_base_sec, self.backoff_max_sec)
+                if e.retry_after:
+                    delay = max(delay, e.retry_after)
+                if loop.time() + delay >= deadline:
+                    raise LLMRequestError(f"{e} (deadline of {self.deadline_sec}s reached)") from e
+
+                logger.warning(f"LLM call failed ({e}); retry {attempt}/{self.max_retries - 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def close(self):
+        """Close the connection pool and stop the loop."""
+        if self._closed:
+            return
+        self._run(self.transport.aclose())
+        self._closed = True
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
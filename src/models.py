@@ -0,0 +1,226 @@
+"""
+Process-wide registry of loaded models.
+
+Whisper, resemblyzer and pyannote models are expensive to load (5-20 s)
+and large in memory. The registry loads each model once per process,
+shares it between every transcriber, diarizer and speaker database, and
+optionally unloads models that have been unused for a while.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .utils.config import get_config
+
+
+logger = logging.getLogger(__name__)
+
+
+ModelKey = Tuple[Hashable, ...]
+
+
+class _Entry:
+    """A loaded model and its bookkeeping."""
+
+    def __init__(self, model: Any):
+        self.model = model
+        self.refcount = 0
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """
+    Thread-safe, reference-counted cache of loaded models.
+
+    Models are keyed by a tuple such as (kind, model name, device, compute
+    type) and loaded lazily on first acquire(). Concurrent acquires of the
+    same key wait for a single load; loads of different keys run in
+    parallel. With an idle timeout, models whose reference count has dropped
+    to zero are evicted once they have been idle that long.
+    """
+
+    def __init__(self, idle_timeout: Optional[float] = None):
+        """
+        Initialize model registry.
+
+        Args:
+            idle_timeout: Seconds an unreferenced model is kept before
+                          eviction (None = keep until clear())
+        """
+        self.idle_timeout = idle_timeout
+        self._lock = threading.RLock()
+        self._entries: Dict[ModelKey, _Entry] = {}
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    def acquire(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """
+        Get a model, loading it if needed, and take a reference to it.
+
+        Args:
+            key: Model key, e.g. ('whisper', 'large-v3-turbo', 'cpu', 'int8')
+            loader: Zero-argument callable that loads the model
+
+        Returns:
+            The shared model instance
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refcount += 1
+                entry.last_used = time.monotonic()
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refcount += 1
+                    entry.last_used = time.monotonic()
+                    return entry.model
+
+            start_time = time.time()
+            model = loader()
+            logger.debug(f"Loaded model {key} in {time.time() - start_time:.2f}s")
+
+            with self._lock:
+                entry = _Entry(model)
+                entry.refcount = 1
+                self._entries[key] = entry
+                return model
+
+    def release(self, key: ModelKey):
+        """
+        Drop a reference taken by acquire().
+
+        Args:
+            key: Model key
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refcount = max(0, entry.refcount - 1)
+            entry.last_used = time.monotonic()
+
+            if entry.refcount == 0 and self.idle_timeout is not None:
+                self._schedule_eviction(self.idle_timeout)
+
+    def evict_idle(self) -> int:
+        """
+        Evict unreferenced models idle for at least the idle timeout.
+
+        Returns:
+            Number of models evicted
+        """
+        if self.idle_timeout is None:
+            return 0
+
+        now = time.monotonic()
+        evicted = 0
+        next_check = None
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.refcount > 0:
+                    continue
+                idle = now - entry.last_used
+                if idle >= self.idle_timeout:
+                    del self._entries[key]
+                    evicted += 1
+                    logger.info(f"Evicted idle model: {key}")
+                else:
+                    remaining = self.idle_timeout - idle
+                    next_check = remaining if next_check is None else min(next_check, remaining)
+
+            self._timer = None
+            if next_check is not None:
+                self._schedule_eviction(next_check)
+
+        return evicted
+
+    def _schedule_eviction(self, delay: float):
+        """Start the background eviction timer if it is not running."""
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(delay, self.evict_idle)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def clear(self):
+        """Drop every model regardless of references."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._entries.clear()
+
+    def stats(self) -> Dict[ModelKey, int]:
+        """
+        Get loaded models and their reference counts.
+
+        Returns:
+            Dict mapping model key to reference count
+        """
+        with self._lock:
+            return {key: entry.refcount for key, entry in self._entries.items()}
+
+    def __contains__(self, key: ModelKey) -> bool:
+        with self._lock:
+            return key in self._entries
+
+
+def acquire_voice_encoder(device: str) -> Tuple[ModelKey, Any]:
+    """
+    Get the shared resemblyzer VoiceEncoder for a device.
+
+    Args:
+        device: Configured transcription device ('cuda', 'mps', 'cpu', ...)
+
+    Returns:
+        Tuple of (registry key, encoder); release the key when done
+    """
+    encoder_device = device if device in ['cuda', 'mps'] else 'cpu'
+    key = ('resemblyzer', 'VoiceEncoder', encoder_device, None)
+
+    def load():
+        from resemblyzer import VoiceEncoder
+
+        logger.info(f"Loading resemblyzer encoder on {encoder_device}")
+        return VoiceEncoder(device=encoder_device)
+
+    return key, get_registry().acquire(key, load)
+
+
+# Global registry instance
+_global_registry: Optional[ModelRegistry] = None
+_global_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """
+    Get or create the process-wide model registry.
+
+    The idle timeout is read from models.idle_timeout_sec on first call.
+
+    Returns:
+        ModelRegistry instance
+    """
+    global _global_registry
+    with _global_registry_lock:
+        if _global_registry is None:
+            idle_timeout = get_config().get('models', 'idle_timeout_sec')
+            _global_registry = ModelRegistry(idle_timeout=idle_timeout)
+        return _global_registry
+
+
+def reset_registry():
+    """Drop the global registry and its models (mainly for testing)."""
+    global _global_registry
+    with _global_registry_lock:
+        if _global_registry is not None:
+            _global_registry.clear()
+        _global_registry = None
@@ -0,0 +1,498 @@
+"""
+Incremental, resumable processing pipeline.
+
+Each stage (decode, vad, transcribe, embed, cluster, refine, summarize,
+format) writes a versioned artifact to an ArtifactStore. An artifact is
+keyed by a hash of its upstream artifact keys and the config subtree the
+stage reads, so a rerun reuses every stage whose inputs are unchanged and
+resumes from the first one that changed.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .utils.audio import audio_cache_key, decode_audio
+from .utils.config import get_config
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bump to invalidate every artifact after a format change
+ARTIFACT_VERSION = 1
+
+STAGES = ['decode', 'vad', 'transcribe', 'embed', 'cluster', 'refine', 'summarize', 'format']
+
+# Config subtrees that affect each stage's output
+STAGE_CONFIG = {
+    'decode': [('audio', 'sample_rate')],
+    'vad': [('transcription', 'mode'), ('transcription', 'vad')],
+    'transcribe': [
+        ('transcription', 'model'),
+        ('transcription', 'compute_type'),
+        ('transcription', 'language'),
+        ('transcription', 'beam_size'),
+        ('transcription', 'mode'),
+        ('transcription', 'batch_size'),
+        ('transcription', 'parallel', 'chunk_duration_sec'),
+        ('transcription', 'parallel', 'search_window_sec'),
+        ('transcription', 'parallel', 'overlap_sec'),
+        ('transcription', 'vad'),
+    ],
+    'embed': [('diarization', 'resemblyzer')],
+    'cluster': [('diarization',)],
+    'refine': [],
+    'summarize': [('summarization',)],
+    'format': [('output',)],
+}
+
+# Never mix credentials into artifact keys
+_SECRET_KEYS = {'api_key', 'hf_token'}
+
+
+def _strip_secrets(value: Any) -> Any:
+    """Drop credential entries from a config subtree."""
+    if isinstance(value, dict):
+        return {k: _strip_secrets(v) for k, v in value.items() if k not in _SECRET_KEYS}
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize numpy scalars and arrays in artifacts."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def stage_key(stage: str, inputs: Iterable[str], config: Dict[str, Any]) -> str:
+    """
+    Compute the artifact key of a stage.
+
+    Args:
+        stage: Stage name
+        inputs: Keys of upstream artifacts (or content hashes)
+        config: Config values the stage depends on
+
+    Returns:
+        Hex digest identifying the stage output
+    """
+    payload = json.dumps(
+        {'stage': stage, 'version': ARTIFACT_VERSION, 'inputs': list(inputs), 'config': config},
+        sort_keys=True,
+        default=_json_default
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ArtifactStore:
+    """
+    Directory of stage artifacts: {root}/{stage}/{key}.json, or .npz for
+    speaker embeddings (see diarization.save_embeddings).
+
+    Writes are atomic (temp file + rename), so an interrupted run never
+    leaves a truncated artifact behind.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize artifact store.
+
+        Args:
+            root: Store directory (created on first write)
+        """
+        self.root = Path(root)
+
+    def path(self, stage: str, key: str, suffix: str = '.json') -> Path:
+        """Path of an artifact."""
+        return self.root / stage / f"{key}{suffix}"
+
+    def _write_atomic(self, path: Path, write: Callable[[Any], None]):
+        """Write through a temp file and rename it into place."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def load_json(self, stage: str, key: str) -> Optional[Any]:
+        """
+        Load a JSON artifact.
+
+        Returns:
+            Artifact data, or None if missing or from another version
+        """
+        path = self.path(stage, key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                artifact = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable artifact {path}: {e}")
+            return None
+        if artifact.get('version') != ARTIFACT_VERSION:
+            return None
+        return artifact['data']
+
+    def save_json(self, stage: str, key: str, data: Any):
+        """Save a JSON artifact."""
+        artifact = {
+            'version': ARTIFACT_VERSION,
+            'stage': stage,
+            'key': key,
+            'created_at': time.time(),
+            'data': data,
+        }
+        self._write_atomic(
+            self.path(stage, key),
+            lambda f: json.dump(artifact, f, ensure_ascii=False, default=_json_default)
+        )
+
+
+
+class Pipeline:
+    """
+    Resumable transcribe -> diarize -> refine -> summarize -> format pipeline.
+
+    Besides the artifacts, each run writes the usual output files:
+    {output_base}_speakers.txt, {output_base}_speakers_refined.txt,
+    {output_base}_summary.json and {output_base}.md.
+    """
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        store: Optional[ArtifactStore] = None,
+        summarizer=None
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            config_path: Optional path to config file
+            store: Artifact store (default: pipeline.artifact_dir from config)
+            summarizer: Optional MeetingSummarizer shared with other runs
+                        (default: one is created and closed per run)
+        """
+        self.config_path = config_path
+        self.config = get_config(config_path)
+        self.store = store or ArtifactStore(self.config.get('pipeline', 'artifact_dir', default='.cache/artifacts'))
+        self.summarizer = summarizer
+
+        self.sample_rate = self.config.get('audio', 'sample_rate', default=16000)
+        self._decoded = None
+        self._audio_path = None
+
+    def _stage_config(self, stage: str) -> Dict[str, Any]:
+        """Config values a stage depends on."""
+        return {'.'.join(keys): _strip_secrets(self.config.get(*keys)) for keys in STAGE_CONFIG[stage]}
+
+    def _audio(self):
+        """Decode the input audio on first use."""
+        if self._decoded is None:
+            cache_dir = self.config.get_pcm_cache_dir() or str(self.store.root / 'pcm')
+            self._decoded = decode_audio(self._audio_path, self.sample_rate, cache_dir=cache_dir)
+        return self._decoded
+
+    def _stage(
+        self,
+        stage: str,
+        inputs: List[str],
+        compute: Callable[[], Any],
+        report: Dict[str, str],
+        force: Iterable[str] = (),
+        extra_config: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Any]:
+        """
+        Load a JSON stage artifact, or compute and save it.
+
+        Returns:
+            Tuple of (artifact key, data)
+        """
+        config = self._stage_config(stage)
+        if extra_config:
+            config.update(extra_config)
+        key = stage_key(stage, inputs, config)
+
+        data = None if stage in force else self.store.load_json(stage, key)
+        if data is not None:
+            logger.info(f"[{stage}] cached ({key[:12]})")
+            report[stage] = 'cached'
+            return key, data
+
+        logger.info(f"[{stage}] running...")
+        start_time = time.time()
+        data = compute()
+        self.store.save_json(stage, key, data)
+        logger.info(f"[{stage}] done in {time.time() - start_time:.2f}s ({key[:12]})")
+        report[stage] = 'ran'
+        return key, data
+
+    def run(
+        self,
+        audio_path: str,
+        output_base: str,
+        num_speakers: Optional[int] = None,
+        refine: bool = True,
+        summarize: bool = False,
+        force: Iterable[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Run the pipeline, reusing artifacts whose inputs are unchanged.
+
+        Args:
+            audio_path: Path to audio file
+            output_base: Output path prefix
+            num_speakers: Expected number of speakers (optional)
+            refine: Apply the glossary refinement
+            summarize: Generate an AI summary
+            force: Stage names to recompute even if cached
+
+        Stages that do not apply are reported as 'skipped' and write no
+        artifact: vad runs only in parallel transcription mode, and embed
+        only with the resemblyzer diarization method (pyannote and hybrid
+        embed inside the cluster stage, so force 'cluster' instead).
+
+        Returns:
+            Dict with 'stages' (stage -> 'cached', 'ran', 'skipped' or
+            'failed') and 'outputs' (written file paths)
+
+        Raises:
+            ValueError: If force names an unknown stage or one that does not
+                        run with the current config
+        """
+        from .utils.transcript import write_transcript_with_speakers
+
+        force = set(force)
+        unknown = force - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+        parallel = self.config.get('transcription', 'mode', default='sequential') == 'parallel'
+        method = self.config.get('diarization', 'method')
+        if 'vad' in force and not parallel:
+            raise ValueError("Stage 'vad' only runs in parallel transcription mode")
+        if 'embed' in force and method != 'resemblyzer':
+            raise ValueError(f"Stage 'embed' does not run with diarization method '{method}' "
+                             f"(it embeds inside 'cluster'; force that instead)")
+
+        self._audio_path = audio_path
+        self._decoded = None
+        report = {stage: 'skipped' for stage in STAGES}
+        outputs = []
+
+        # decode: the artifact is the PCM cache entry; keyed by file contents
+        audio_key = audio_cache_key(audio_path, self.sample_rate)
+        decode_key, decode_info = self._stage(
+            'decode', [audio_key],
+            lambda: {'duration': self._audio().duration, 'sample_rate': self._audio().sample_rate},
+            report, force
+        )
+
+        # vad: non-speech spans used to plan parallel transcription; the
+        # other modes don't split the audio, so the stage is skipped
+        if parallel:
+            vad_key, silences = self._stage(
+                'vad', [decode_key],
+                lambda: [[int(s), int(e)] for s, e in self._transcriber().find_silences(self._audio())],
+                report, force
+            )
+        else:
+            vad_key, silences = decode_key, []
+
+        # transcribe: raw segments with word timestamps
+        transcribe_key, transcription = self._stage(
+            'transcribe', [vad_key],
+            lambda: self._transcribe(silences),
+            report, force
+        )
+        segments = transcription['segments']
+
+        # embed + cluster: speaker-labelled segments
+        embed_key = None
+        if method == 'resemblyzer':
+            embed_key = self._embed(decode_key, report, force)
+            cluster_inputs = [transcribe_key, embed_key]
+
+            # Keep the embeddings next to the transcript for `rediarize`
+            embeddings_file = f"{output_base}_embeddings.npz"
+            shutil.copyfile(self.store.path('embed', embed_key, '.npz'), embeddings_file)
+            outputs.append(embeddings_file)
+        else:
+            # pyannote segments and embeds in one pass, inside the cluster stage
+            cluster_inputs = [transcribe_key, decode_key]
+
+        cluster_key, diarized_segments = self._stage(
+            'cluster', cluster_inputs,
+            lambda: self._cluster(method, segments, num_speakers, embed_key),
+            report, force,
+            extra_config={'num_speakers': num_speakers}
+        )
+
+        transcript_file = f"{output_base}_speakers.txt"
+        write_transcript_with_speakers(diarized_segments, transcript_file)
+        outputs.append(transcript_file)
+
+        with open(transcript_file, 'r', encoding='utf-8') as f:
+            transcript = f.read()
+        final_key, final_file = cluster_key, transcript_file
+
+        # refine: glossary corrections
+        if refine:
+            from refine_transcript import GLOSSARY, clean_text
+
+            final_key, transcript = self._stage(
+                'refine', [cluster_key],
+                lambda: clean_text(transcript),
+                report, force,
+                extra_config={'glossary': GLOSSARY}
+            )
+            final_file = f"{output_base}_speakers_refined.txt"
+            with open(final_file, 'w', encoding='utf-8') as f:
+                f.write(transcript)
+            outputs.append(final_file)
+
+        # summarize: AI summary (failures are not cached)
+        summary = None
+        summary_key = None
+        if summarize:
+            summary_key, summary = self._summarize(final_key, transcript, report, force)
+            if summary is not None:
+                summary_file = f"{output_base}_summary.json"
+                with open(summary_file, 'w', encoding='utf-8') as f:
+                    json.dump(summary, f, indent=2, ensure_ascii=False)
+                outputs.append(summary_file)
+
+        # format: Markdown document
+        import format_md
+
+        format_inputs = [final_key] + ([summary_key] if summary is not None else [])
+        _, markdown = self._stage(
+            'format', format_inputs,
+            lambda: format_md.build_markdown(
+                format_md.parse_transcript(final_file), Path(audio_path).name, summary
+            ),
+            report, force,
+            extra_config={'speaker_mapping': format_md.load_speaker_mapping(), 'audio_name': Path(audio_path).name}
+        )
+        markdown_file = f"{output_base}.md"
+        with open(markdown_file, 'w', encoding='utf-8') as f:
+            f.write(markdown)
+        outputs.append(markdown_file)
+
+        return {'stages': report, 'outputs': outputs}
+
+    def _transcriber(self):
+        """Create a transcriber (models come from the shared registry)."""
+        from .transcriber import EnhancedTranscriber
+
+        return EnhancedTranscriber(self.config_path)
+
+    def _transcribe(self, silences: List[List[int]]) -> Dict[str, Any]:
+        """Run the transcribe stage."""
+        transcriber = self._transcriber()
+        try:
+            segments, info = transcriber.transcribe(
+                self._audio(),
+                language=self.config.get('transcription', 'language', default='id'),
+                silences=[tuple(s) for s in silences]
+            )
+        finally:
+            transcriber.close()
+        return {'segments': segments, 'info': info}
+
+    def _embed(self, decode_key: str, report: Dict[str, str], force: Iterable[str]) -> str:
+        """Run or reuse the embed stage; returns its key."""
+        key = stage_key('embed', [decode_key], self._stage_config('embed'))
+
+        if 'embed' not in force and self.store.path('embed', key, '.npz').exists():
+            logger.info(f"[embed] cached ({key[:12]})")
+            report['embed'] = 'cached'
+            return key
+
+        from .diarization import EnhancedDiarization, save_embeddings
+
+        logger.info("[embed] running...")
+        start_time = time.time()
+        diarization = EnhancedDiarization(self.config_path)
+        try:
+            embeddings, time_points = diarization.extract_embeddings(self._audio())
+        finally:
+            diarization.close()
+
+        path = self.store.path('embed', key, '.npz')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        half_window = self.config.get('diarization', 'resemblyzer', 'window_duration_sec') / 2
+        save_embeddings(str(path), embeddings, time_points - half_window, time_points + half_window)
+        logger.info(f"[embed] done in {time.time() - start_time:.2f}s ({key[:12]})")
+        report['embed'] = 'ran'
+        return key
+
+    def _cluster(
+        self,
+        method: str,
+        segments: List[Dict],
+        num_speakers: Optional[int],
+        embed_key: Optional[str]
+    ) -> List[Dict]:
+        """Run the cluster stage."""
+        from .diarization import EnhancedDiarization
+
+        # Label copies so the cached transcription stays untouched
+        segments = [dict(seg) for seg in segments]
+
+        diarization = EnhancedDiarization(self.config_path)
+        try:
+            if method == 'resemblyzer':
+                embeddings_file = str(self.store.path('embed', embed_key, '.npz'))
+                return diarization.recluster(embeddings_file, num_speakers, segments)
+            return diarization.diarize(self._audio(), num_speakers=num_speakers, segments=segments)
+        finally:
+            diarization.close()
+
+    def _summarize(
+        self,
+        transcript_key: str,
+        transcript: str,
+        report: Dict[str, str],
+        force: Iterable[str]
+    ) -> Tuple[str, Optional[Dict]]:
+        """Run or reuse the summarize stage; failed summaries are not saved."""
+        from .summarizer import MeetingSummarizer
+
+        key = stage_key('summarize', [transcript_key], self._stage_config('summarize'))
+        summary = None if 'summarize' in force else self.store.load_json('summarize', key)
+        if summary is not None:
+            logger.info(f"[summarize] cached ({key[:12]})")
+            report['summarize'] = 'cached'
+            return key, summary
+
+        logger.info("[summarize] running...")
+        summarizer = self.summarizer or MeetingSummarizer(self.config_path)
+        try:
+            summary = summarizer.summarize(transcript)
+        finally:
+            if summarizer is not self.summarizer:
+                summarizer.close()
+        if summary.get('error'):
+            logger.warning(f"[summarize] failed: {summary['error']}")
+            report['summarize'] = 'failed'
+            return key, None
+
+        self.store.save_json('summarize', key, summary)
+        report['summarize'] = 'ran'
+        return key, summary
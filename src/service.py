@@ -0,0 +1,391 @@
+"""
+Long-running transcription service.
+
+Keeps the Whisper, diarization and embedding models warm in one process
+and runs submitted jobs through the same resumable Pipeline as
+`cli.py process-full` on a bounded worker pool. Jobs are accepted over a
+local HTTP endpoint:
+
+    GET  /health          Service status and loaded models
+    GET  /jobs            All jobs
+    POST /jobs            Submit a job (JSON body, see TranscriptionService.submit)
+    GET  /jobs/<id>       Job status
+"""
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import get_registry
+from .utils.config import get_config
+
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A queued or running pipeline job."""
+
+    def __init__(
+        self,
+        audio: str,
+        output_base: str,
+        num_speakers: Optional[int] = None,
+        refine: bool = True,
+        summarize: bool = False
+    ):
+        """
+        Initialize job.
+
+        Args:
+            audio: Path to audio file
+            output_base: Output path prefix ({output_base}_speakers.txt, ...)
+            num_speakers: Expected number of speakers (optional)
+            refine: Also write {output_base}_speakers_refined.txt
+            summarize: Also generate {output_base}_summary.json
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.audio = audio
+        self.output_base = output_base
+        self.num_speakers = num_speakers
+        self.refine = refine
+        self.summarize = summarize
+        self.status = "queued"
+        self.error = None
+        self.stages: Dict[str, str] = {}
+        self.outputs: List[str] = []
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize job for the HTTP API."""
+        return {
+            "id": self.id,
+            "audio": self.audio,
+            "output_base": self.output_base,
+            "num_speakers": self.num_speakers,
+            "refine": self.refine,
+            "summarize": self.summarize,
+            "status": self.status,
+            "error": self.error,
+            "stages": self.stages,
+            "outputs": self.outputs,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class TranscriptionService:
+    """
+    Job queue that runs the transcription pipeline with warm models.
+
+    Models come from the process-wide registry; the service holds a
+    reference to each for its lifetime so they are never evicted between
+    jobs.
+    """
+
+    def __init__(self, config_path: Optional[str] = None, workers: Optional[int] = None):
+        """
+        Initialize service.
+
+        Args:
+            config_path: Optional path to config file
+            workers: Concurrent jobs (default from service.workers)
+        """
+        self.config_path = config_path
+        self.config = get_config(config_path)
+        self.workers = workers or self.config.get('service', 'workers', default=1)
+
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self._warm = []
+        self._summarizer = None
+
+    def warm_up(self):
+        """Load the models used by every job and keep them referenced."""
+        from .diarization import EnhancedDiarization
+        from .transcriber import EnhancedTranscriber
+
+        logger.info("Warming up models...")
+
+        transcriber = EnhancedTranscriber(self.config_path)
+        transcriber._load_model()
+        self._warm.append(transcriber)
+
+        diarization = EnhancedDiarization(self.config_path)
+        if diarization.method in ["pyannote", "hybrid"]:
+            try:
+                diarization._load_pyannote_model()
+            except Exception as e:
+                logger.warning(f"pyannote.audio unavailable, warming resemblyzer instead: {e}")
+                diarization._load_resemblyzer_encoder()
+        else:
+            diarization._load_resemblyzer_encoder()
+        self._warm.append(diarization)
+
+        logger.info(f"Models ready: {list(get_registry().stats())}")
+
+    def submit(self, params: Dict[str, Any]) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            params: Dict with 'audio' (required), 'output_base',
+                    'num_speakers', 'refine' (default true) and 'summarize'
+
+        Returns:
+            The queued job
+        """
+        audio = params.get('audio')
+        if not audio:
+            raise ValueError("'audio' is required")
+        if not Path(audio).exists():
+            raise ValueError(f"Audio file not found: {audio}")
+
+        num_speakers = params.get('num_speakers')
+        job = Job(
+            audio=audio,
+            output_base=params.get('output_base') or str(Path(audio).with_suffix('')),
+            num_speakers=int(num_speakers) if num_speakers else None,
+            refine=bool(params.get('refine', True)),
+            summarize=bool(params.get('summarize', False))
+        )
+
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+
+        logger.info(f"Queued job {job.id}: {audio}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        """Get all jobs in submission order."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _run(self, job: Job):
+        """Run one job through the pipeline."""
+        from .pipeline import Pipeline
+
+        job.status = "running"
+        job.started_at = time.time()
+
+        try:
+            # A Pipeline per job is cheap: models come from the registry and
+            # stage artifacts from the shared store, as with process-full
+            pipeline = Pipeline(self.config_path, summarizer=self._get_summarizer() if job.summarize else None)
+            result = pipeline.run(
+                job.audio,
+                output_base=job.output_base,
+                num_speakers=job.num_speakers,
+                refine=job.refine,
+                summarize=job.summarize
+            )
+            job.stages = result['stages']
+            job.outputs = result['outputs']
+
+            job.status = "done"
+            logger.info(f"Job {job.id} done in {time.time() - job.started_at:.2f}s")
+
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+
+        finally:
+            job.finished_at = time.time()
+
+    def _get_summarizer(self):
+        """One summarizer for all jobs, so they share its LLM connection pool."""
+        from .summarizer import MeetingSummarizer
+
+        with self._lock:
+            if self._summarizer is None:
+                self._summarizer = MeetingSummarizer(self.config_path)
+            return self._summarizer
+
+    def health(self) -> Dict[str, Any]:
+        """Service status for GET /health."""
+        jobs = self.list()
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "jobs": {
+                status: sum(1 for job in jobs if job.status == status)
+                for status in ["queued", "running", "done", "failed"]
+            },
+            "models": [list(key) for key in get_registry().stats()],
+        }
+
+    def shutdown(self):
+        """Wait for running jobs and release the warm models."""
+        self._executor.shutdown(wait=True)
+        for obj in self._warm:
+            obj.close()
+        self._warm = []
+        if self._summarizer is not None:
+            self._summarizer.close()
+            self._summarizer = None
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    """JSON HTTP API over a TranscriptionService."""
+
+    service: TranscriptionService = None
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.rstrip('/')
+
+        if path == '/health':
+            self._send_json(200, self.service.health())
+        elif path == '/jobs':
+            self._send_json(200, [job.to_dict() for job in self.service.list()])
+        elif path.startswith('/jobs/'):
+            job = self.service.get(path[len('/jobs/'):])
+            if job is None:
+                self._send_json(404, {"error": "job not found"})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/jobs':
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            params = json.loads(self.rfile.read(length) or b'{}')
+            job = self.service.submit(params)
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        self._send_json(202, job.to_dict())
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def serve(
+    config_path: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    workers: Optional[int] = None
+):
+    """
+    Run the transcription service until interrupted.
+
+    Args:
+        config_path: Optional path to config file
+        host: Bind address (default from service.host)
+        port: Bind port (default from service.port)
+        workers: Concurrent jobs (default from service.workers)
+    """
+    config = get_config(config_path)
+    host = host or config.get('service', 'host', default='127.0.0.1')
+    port = port or config.get('service', 'port', default=8765)
+
+    service = TranscriptionService(config_path, workers=workers)
+    service.warm_up()
+
+    handler = type('JobRequestHandler', (_JobRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    logger.info(f"Serving on http://{host}:{port} ({service.workers} worker(s))")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+def _request(url: str, payload: Optional[Dict] = None, timeout: float = 10.0) -> Any:
+    """Send a JSON request to the service and decode the response."""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get('error', str(e))
+        except ValueError:
+            message = str(e)
+        raise ValueError(message) from e
+
+
+def service_url(config_path: Optional[str] = None) -> str:
+    """Get the base URL of the configured service."""
+    config = get_config(config_path)
+    host = config.get('service', 'host', default='127.0.0.1')
+    port = config.get('service', 'port', default=8765)
+    return f"http://{host}:{port}"
+
+
+def is_running(url: str, timeout: float = 1.0) -> bool:
+    """Check whether a service answers at url."""
+    try:
+        return _request(f"{url}/health", timeout=timeout).get('status') == 'ok'
+    except (OSError, ValueError):
+        return False
+
+
+def submit_job(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Submit a job to a running service.
+
+    Args:
+        url: Service base URL
+        params: Job parameters (see TranscriptionService.submit)
+
+    Returns:
+        Job dict
+    """
+    return _request(f"{url}/jobs", params)
+
+
+def wait_for_job(url: str, job_id: str, poll_interval: float = 2.0) -> Dict[str, Any]:
+    """
+    Poll a job until it is done or failed.
+
+    Args:
+        url: Service base URL
+        job_id: Job id
+        poll_interval: Seconds between polls
+
+    Returns:
+        Final job dict
+    """
+    while True:
+        job = _request(f"{url}/jobs/{job_id}")
+        if job['status'] in ['done', 'failed']:
+            return job
+        time.sleep(poll_interval)
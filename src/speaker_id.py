@@ -3,28 +3,375 @@ Speaker identification and enrollment system.
 """
 import json
 import logging
+import os
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import hashlib
 
 import numpy as np
-from scipy.spatial.distance import cosine
-from resemblyzer import VoiceEncoder
-from tqdm import tqdm
 
+from .models import acquire_voice_encoder, get_registry
+from .speaker_store import open_speaker_store
 from .utils.config import get_config
-from .utils.audio import load_audio_as_wav
+from .utils.audio import DecodedAudio, ensure_decoded
 
 
 logger = logging.getLogger(__name__)
 
 
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalise rows as float32."""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices and values of the k largest scores per row, best first."""
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def merge_centroids(
+    centroids: np.ndarray,
+    weights: np.ndarray,
+    max_centroids: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a set of weighted centroids to at most max_centroids.
+
+    The two most similar centroids are repeatedly replaced by their
+    weighted mean, so distinct conditions (e.g. headset vs room mic) stay
+    separate while near-duplicates collapse.
+
+    Args:
+        centroids: Array of shape (m, dim)
+        weights: Samples behind each centroid, shape (m,)
+        max_centroids: Cap on the number of centroids
+
+    Returns:
+        Tuple of (L2-normalised centroids, weights)
+    """
+    centroids = _normalize_rows(centroids)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    while len(centroids) > max(max_centroids, 1):
+        similarity = centroids @ centroids.T
+        np.fill_diagonal(similarity, -np.inf)
+        i, j = np.unravel_index(np.argmax(similarity), similarity.shape)
+
+        merged = (centroids[i] * weights[i] + centroids[j] * weights[j]) / (weights[i] + weights[j])
+        centroids[i] = _normalize_rows(merged)[0]
+        weights[i] += weights[j]
+        centroids = np.delete(centroids, j, axis=0)
+        weights = np.delete(weights, j)
+
+    return centroids, weights
+
+
+class BruteForceIndex:
+    """Exact cosine search: one matrix product per chunk of queries."""
+
+    kind = 'brute'
+
+    def __init__(self, chunk_size: int = 4096):
+        self.chunk_size = chunk_size
+        self.matrix = None
+
+    def build(self, matrix: np.ndarray):
+        """Index L2-normalised profile rows."""
+        self.matrix = matrix
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar rows for each query.
+
+        Args:
+            queries: L2-normalised array of shape (n, dim)
+            k: Neighbours per query (at most the number of rows)
+
+        Returns:
+            Tuple of (row indices (n, k), similarities (n, k)), best first
+        """
+        rows = np.zeros((len(queries), k), dtype=np.int64)
+        scores = np.zeros((len(queries), k), dtype=np.float32)
+
+        for chunk_start in range(0, len(queries), self.chunk_size):
+            chunk = slice(chunk_start, chunk_start + self.chunk_size)
+            rows[chunk], scores[chunk] = _top_k(queries[chunk] @ self.matrix.T, k)
+
+        return rows, scores
+
+    def search_groups(self, queries: np.ndarray, group_starts: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k best groups of contiguous rows, scoring each group by its best row.
+
+        Args:
+            queries: L2-normalised array of shape (n, dim)
+            group_starts: First row of each group, increasing
+            k: Groups per query (at most the number of groups)
+
+        Returns:
+            Tuple of (group indices (n, k), similarities (n, k)), best first
+        """
+        groups = np.zeros((len(queries), k), dtype=np.int64)
+        scores = np.zeros((len(queries), k), dtype=np.float32)
+
+        for chunk_start in range(0, len(queries), self.chunk_size):
+            chunk = slice(chunk_start, chunk_start + self.chunk_size)
+            group_scores = np.maximum.reduceat(queries[chunk] @ self.matrix.T, group_starts, axis=1)
+            groups[chunk], scores[chunk] = _top_k(group_scores, k)
+
+        return groups, scores
+
+    def save(self, path: str, fingerprint: str):
+        """Nothing to persist: the stored embeddings are the index."""
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str, **params):
+        """Nothing persisted; always rebuilt."""
+        return None
+
+
+class IVFIndex:
+    """
+    Inverted-file index in pure NumPy.
+
+    Profiles are partitioned with spherical k-means into n_lists cells;
+    a query scores the n_probe nearest cell centroids and then only the
+    profiles in those cells.
+    """
+
+    kind = 'ivf'
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        iterations: int = 20,
+        random_state: int = 0
+    ):
+        """
+        Initialize index.
+
+        Args:
+            n_lists: Number of cells (default: about 4 * sqrt(n))
+            n_probe: Cells searched per query (default: a fifth of the
+                     cells, at least 8); more cells trade speed for recall.
+                     With the default n_lists this reaches recall@1 of
+                     about 0.96-0.99 on `benchmark.py ann` (1k-50k profiles)
+            iterations: k-means iterations at build time
+            random_state: k-means seed
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.iterations = iterations
+        self.random_state = random_state
+
+    def build(self, matrix: np.ndarray):
+        """Partition L2-normalised profile rows into cells."""
+        rng = np.random.default_rng(self.random_state)
+        n_lists = min(self.n_lists or max(1, int(4 * np.sqrt(len(matrix)))), len(matrix))
+
+        centroids = matrix[rng.choice(len(matrix), n_lists, replace=False)]
+        for _ in range(self.iterations):
+            assignments = np.argmax(matrix @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, matrix)
+            counts = np.bincount(assignments, minlength=n_lists)
+
+            # Re-seed empty cells with random profiles
+            empty = counts == 0
+            sums[empty] = matrix[rng.choice(len(matrix), int(empty.sum()))]
+            centroids = _normalize_rows(sums)
+
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        self._set(centroids, assignments, matrix)
+
+    def _set(self, centroids: np.ndarray, assignments: np.ndarray, matrix: np.ndarray):
+        # Rows grouped by cell, so each cell is one contiguous slice
+        self.centroids = centroids
+        self.order = np.argsort(assignments, kind='stable')
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=len(centroids)))])
+        self.sorted_matrix = matrix[self.order]
+        self.assignments = assignments
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find (approximately) the k most similar rows for each query.
+
+        Args:
+            queries: L2-normalised array of shape (n, dim)
+            k: Neighbours per query (at most the number of rows)
+
+        Returns:
+            Tuple of (row indices (n, k), similarities (n, k)), best first
+        """
+        n_lists = len(self.centroids)
+        n_probe = min(self.n_probe or max(8, n_lists // 5), n_lists)
+        probes, _ = _top_k(queries @ self.centroids.T, n_probe)
+
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+
+        # Visit each cell once with all the queries probing it, keeping a
+        # running top k per query
+        probing = np.zeros((len(queries), n_lists), dtype=bool)
+        probing[np.arange(len(queries))[:, None], probes] = True
+
+        for cell in np.flatnonzero(probing.any(axis=0)):
+            start, end = self.offsets[cell], self.offsets[cell + 1]
+            if start == end:
+                continue
+            query_idx = np.flatnonzero(probing[:, cell])
+
+            merged_rows = np.concatenate(
+                [rows[query_idx], np.broadcast_to(np.arange(start, end), (len(query_idx), end - start))], axis=1
+            )
+            merged_scores = np.concatenate([scores[query_idx], queries[query_idx] @ self.sorted_matrix[start:end].T], axis=1)
+            top, top_scores = _top_k(merged_scores, k)
+            rows[query_idx] = np.take_along_axis(merged_rows, top, axis=1)
+            scores[query_idx] = top_scores
+
+        # Too few profiles in the probed cells: search everything
+        short = np.flatnonzero((rows < 0).any(axis=1))
+        if len(short):
+            top, top_scores = _top_k(queries[short] @ self.sorted_matrix.T, k)
+            rows[short], scores[short] = top, top_scores
+
+        return self.order[rows], scores
+
+    def save(self, path: str, fingerprint: str):
+        """Persist the cells to an .npz file."""
+        np.savez(path, fingerprint=fingerprint, centroids=self.centroids, assignments=self.assignments)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str, matrix: np.ndarray = None, **params):
+        """Load the cells if they were built from the same profiles."""
+        path = f"{path}.npz"
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as data:
+            if str(data['fingerprint']) != fingerprint:
+                return None
+            index = cls(**params)
+            index._set(data['centroids'], data['assignments'], matrix)
+        return index
+
+
+class HNSWIndex:
+    """Hierarchical navigable small-world graph (requires hnswlib)."""
+
+    kind = 'hnsw'
+
+    def __init__(self, m: int = 16, ef_construction: int = 200, ef_search: int = 64):
+        """
+        Initialize index.
+
+        Args:
+            m: Graph out-degree
+            ef_construction: Candidate list size while building
+            ef_search: Candidate list size while searching
+        """
+        import hnswlib  # noqa: F401  (fail early when not installed)
+
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.index = None
+
+    def build(self, matrix: np.ndarray):
+        """Insert L2-normalised profile rows into the graph."""
+        import hnswlib
+
+        self.index = hnswlib.Index(space='ip', dim=matrix.shape[1])
+        self.index.init_index(max_elements=len(matrix), ef_construction=self.ef_construction, M=self.m)
+        self.index.add_items(matrix, np.arange(len(matrix)))
+        self.index.set_ef(self.ef_search)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find (approximately) the k most similar rows for each query.
+
+        Args:
+            queries: L2-normalised array of shape (n, dim)
+            k: Neighbours per query (at most the number of rows)
+
+        Returns:
+            Tuple of (row indices (n, k), similarities (n, k)), best first
+        """
+        self.index.set_ef(max(self.ef_search, k))
+        rows, distances = self.index.knn_query(queries, k=k)
+        # 'ip' distance is 1 - inner product
+        return rows.astype(np.int64), (1.0 - distances).astype(np.float32)
+
+    def save(self, path: str, fingerprint: str):
+        """Persist the graph to a .bin file with a fingerprint sidecar."""
+        self.index.save_index(f"{path}.bin")
+        with open(f"{path}.json", 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'count': self.index.get_current_count()}, f)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str, matrix: np.ndarray = None, **params):
+        """Load the graph if it was built from the same profiles."""
+        import hnswlib
+
+        if not (os.path.exists(f"{path}.bin") and os.path.exists(f"{path}.json")):
+            return None
+        with open(f"{path}.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('fingerprint') != fingerprint:
+            return None
+
+        index = cls(**params)
+        index.index = hnswlib.Index(space='ip', dim=matrix.shape[1])
+        index.index.load_index(f"{path}.bin", max_elements=meta['count'])
+        index.index.set_ef(index.ef_search)
+        return index
+
+
+SPEAKER_INDEXES = {
+    'brute': BruteForceIndex,
+    'ivf': IVFIndex,
+    'hnsw': HNSWIndex,
+}
+
+
+def create_index(kind: str, **params):
+    """
+    Create an empty speaker index.
+
+    Args:
+        kind: 'brute', 'ivf' or 'hnsw'; 'hnsw' falls back to 'ivf' when
+              hnswlib is not installed
+        **params: Index parameters
+
+    Returns:
+        Index instance
+    """
+    if kind not in SPEAKER_INDEXES:
+        raise ValueError(f"Unknown speaker index: {kind}")
+
+    try:
+        return SPEAKER_INDEXES[kind](**params)
+    except ImportError:
+        logger.warning("hnswlib not installed, using the NumPy IVF index instead")
+        return IVFIndex()
+
+
 class SpeakerDatabase:
     """
     Speaker profile database for enrollment and identification.
 
-    Stores voice embeddings and metadata for identified speakers.
+    Stores voice embeddings and metadata for identified speakers. The
+    in-memory profiles are reloaded whenever another process changes the
+    store, so long-lived instances (e.g. the service) see new enrollments.
     """
 
     def __init__(self, config_path: Optional[str] = None):
@@ -42,58 +389,227 @@ class SpeakerDatabase:
         # Create directories
         Path(self.profiles_path).mkdir(parents=True, exist_ok=True)
 
-        # Load database
-        self.speakers = self._load_database()
+        # Load database; the version is read first so a write racing the
+        # load only causes an extra reload
+        self.store = open_speaker_store(self.config)
+        self._store_version = self.store.version()
+        self.speakers = self.store.load()
+
+        # Normalised profile matrix and search index, rebuilt lazily after each mutation
+        self._matrix = None
+        self._matrix_names = None
+        self._row_speakers = None
+        self._index = None
 
         # Encoder
         self.encoder = None
+        self.encoder_key = None
+
+    def _refresh(self):
+        """Reload the profiles if another process (or instance) changed the store."""
+        version = self.store.version()
+        if version != self._store_version:
+            self.speakers = self.store.load()
+            self._store_version = version
+            self._matrix = None
+            self._index = None
+
+    def _update_speaker(self, name: str, apply) -> Optional[Dict]:
+        """
+        Change one profile with a read-modify-write under the store lock.
 
-    def _load_database(self) -> Dict:
-        """Load speaker database from JSON file."""
-        if Path(self.db_path).exists():
-            with open(self.db_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('speakers', {})
-        return {}
-
-    def _save_database(self):
-        """Save speaker database to JSON file."""
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-
-        data = {
-            'version': '1.0',
-            'speakers': self.speakers,
-            'updated_at': datetime.now().isoformat()
-        }
+        apply receives the stored profile (not this instance's snapshot, which
+        may be stale) and returns the new one, or None to leave it unchanged.
+        """
+        profile, before, after = self.store.update(name, apply)
+
+        # Every mutation goes through here, so this is where the matrix goes stale
+        self._matrix = None
+        self._index = None
+        if before == self._store_version:
+            # Nobody else wrote in between: apply the change to the snapshot
+            if profile is not None:
+                self.speakers[name] = profile
+            self._store_version = after
+        else:
+            self._store_version = None
+
+        return profile
+
+    def _delete_speaker(self, name: str):
+        """Remove one speaker profile from the store."""
+        self._matrix = None
+        self._index = None
+        self.store.delete(name)
+        self._store_version = None
+
+    @staticmethod
+    def _centroids(speaker_data: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Centroids and weights of a profile (single-vector profiles have one)."""
+        if speaker_data.get('centroids') is not None and len(speaker_data['centroids']):
+            centroids = np.atleast_2d(np.asarray(speaker_data['centroids'], dtype=np.float32))
+            weights = speaker_data.get('centroid_weights') or [1] * len(centroids)
+            return centroids, np.asarray(weights, dtype=np.float64)
+
+        embedding = np.asarray(speaker_data['embedding'], dtype=np.float32)
+        return embedding[None, :], np.array([speaker_data.get('num_samples', 1)], dtype=np.float64)
+
+    def _profile_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get every profile centroid as one L2-normalised float32 matrix.
 
-        with open(self.db_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        Rows of one speaker are contiguous; self._row_speakers maps each
+        row to its speaker's position in the names array.
 
-    def _get_encoder(self):
-        """Lazy-load voice encoder."""
-        if self.encoder is None:
-            device = self.config.get('transcription', 'device')
-            if device in ['cuda', 'mps']:
-                encoder_device = device
+        Returns:
+            Tuple of (matrix (n_centroids, dim), speaker names (n_speakers,))
+        """
+        if self._matrix is None:
+            names = list(self.speakers)
+            if names:
+                blocks = [self._centroids(self.speakers[name])[0] for name in names]
+                matrix = _normalize_rows(np.concatenate(blocks))
+                row_speakers = np.repeat(np.arange(len(names)), [len(block) for block in blocks])
             else:
-                encoder_device = 'cpu'
+                matrix = np.zeros((0, 0), dtype=np.float32)
+                row_speakers = np.zeros(0, dtype=np.int64)
+            self._matrix = matrix
+            self._matrix_names = np.array(names, dtype=object)
+            self._row_speakers = row_speakers
+
+        return self._matrix, self._matrix_names
+
+    def _index_path(self) -> str:
+        """Path prefix of the persisted index, next to the database."""
+        if self.config.get('speaker_identification', 'backend', default='sqlite') == 'sqlite':
+            path = self.config.get('speaker_identification', 'store_path', default='speakers/speakers.db')
+        else:
+            path = self.db_path
+        return f"{os.path.splitext(path)[0]}_index"
+
+    def _get_index(self):
+        """
+        Get the search index over the profile matrix.
+
+        Rosters smaller than index.min_profiles always use brute force. ANN
+        indexes are loaded from disk when they were built from the same
+        profiles, and otherwise rebuilt and saved.
+        """
+        if self._index is not None:
+            return self._index
+
+        matrix, _ = self._profile_matrix()
+        kind = self.config.get('speaker_identification', 'index', 'type', default='brute')
+        min_profiles = self.config.get('speaker_identification', 'index', 'min_profiles', default=1000)
+        if len(matrix) < min_profiles:
+            kind = 'brute'
+
+        params = self.config.get('speaker_identification', 'index', kind, default=None) or {}
+        index = create_index(kind, **params)
+        if index.kind != kind:
+            # Optional dependency missing: configure the fallback from its own section
+            params = self.config.get('speaker_identification', 'index', index.kind, default=None) or {}
+            index = create_index(index.kind, **params)
+
+        if index.kind != 'brute':
+            path = f"{self._index_path()}_{index.kind}"
+            fingerprint = hashlib.sha1(matrix.tobytes()).hexdigest()
+            loaded = type(index).load(path, fingerprint, matrix=matrix, **params)
+            if loaded is not None:
+                self._index = loaded
+                return loaded
+
+            start = datetime.now()
+            index.build(matrix)
+            logger.info(f"Built {index.kind} speaker index over {len(matrix)} profiles "
+                        f"in {(datetime.now() - start).total_seconds():.2f}s")
+            try:
+                index.save(path, fingerprint)
+            except OSError as e:
+                logger.warning(f"Could not save speaker index to {path}: {e}")
+        else:
+            index.build(matrix)
+
+        self._index = index
+        return index
+
+    def search(self, embeddings: np.ndarray, top_k: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the most similar enrolled speakers for many embeddings at once.
+
+        Each speaker scores as its best-matching centroid. Searches the
+        index from speaker_identification.index: exact brute force (one
+        matrix product per chunk of queries) or an approximate IVF/HNSW
+        index for large rosters.
+
+        Args:
+            embeddings: Array of shape (n, dim) or a list of embeddings
+            top_k: Number of candidates per embedding
+
+        Returns:
+            Tuple of (names (n, k), similarities (n, k)), best first;
+            k is at most the number of enrolled speakers
+        """
+        self._refresh()
+        matrix, names = self._profile_matrix()
+        k = min(top_k, len(names))
+
+        if k == 0 or len(embeddings) == 0:
+            return np.empty((len(embeddings), k), dtype=object), np.zeros((len(embeddings), k), dtype=np.float32)
+
+        queries = _normalize_rows(embeddings)
+        index = self._get_index()
+
+        if isinstance(index, BruteForceIndex):
+            # Best centroid per speaker in one product + reduceat
+            speaker_starts = np.flatnonzero(np.diff(self._row_speakers, prepend=-1))
+            speakers, scores = index.search_groups(queries, speaker_starts, k)
+            return names[speakers], scores
+
+        # ANN: fetch enough rows to cover k distinct speakers in the common
+        # case, then keep each speaker's best row
+        max_rows = int(np.bincount(self._row_speakers).max())
+        rows, row_scores = index.search(queries, min(k * max_rows, len(matrix)))
+        row_speakers = self._row_speakers[rows]
 
-            logger.info(f"Loading voice encoder on {encoder_device}")
-            self.encoder = VoiceEncoder(device=encoder_device)
+        first = np.ones(row_speakers.shape, dtype=bool)
+        for j in range(1, row_speakers.shape[1]):
+            first[:, j] = ~(row_speakers[:, :j] == row_speakers[:, j:j + 1]).any(axis=1)
+
+        top_names = np.empty((len(queries), k), dtype=object)
+        top_scores = np.full((len(queries), k), -1.0, dtype=np.float32)
+        for i in range(len(queries)):
+            keep = np.flatnonzero(first[i])[:k]
+            top_names[i, :len(keep)] = names[row_speakers[i, keep]]
+            top_scores[i, :len(keep)] = row_scores[i, keep]
+
+        return top_names, top_scores
+
+    def _get_encoder(self):
+        """Lazy-load voice encoder (shared through the model registry)."""
+        if self.encoder is None:
+            self.encoder_key, self.encoder = acquire_voice_encoder(self.config.get('transcription', 'device'))
 
         return self.encoder
 
-    def _compute_embedding(self, audio_path: str) -> np.ndarray:
+    def close(self):
+        """Release the encoder reference held by this database."""
+        if self.encoder_key is not None:
+            get_registry().release(self.encoder_key)
+        self.encoder = None
+        self.encoder_key = None
+
+    def _compute_embedding(self, audio: Union[str, DecodedAudio]) -> np.ndarray:
         """
         Compute speaker embedding from audio file.
 
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file or already decoded audio
 
         Returns:
             Speaker embedding vector
         """
-        wav = load_audio_as_wav(audio_path)
+        wav = ensure_decoded(audio, cache_dir=self.config.get_pcm_cache_dir()).samples
         encoder = self._get_encoder()
         return encoder.embed_utterance(wav)
 
@@ -110,6 +626,58 @@ class SpeakerDatabase:
         encoder = self._get_encoder()
         return encoder.embed_utterance(wav)
 
+    def _compute_sample_embeddings(self, sample_paths: List[str], desc: str) -> Tuple[List[np.ndarray], List[str]]:
+        """
+        Decode and embed voice samples on a thread pool.
+
+        Decoding runs in ffmpeg and the encoder in torch, both outside the
+        GIL, so samples overlap. Missing or unreadable samples are skipped.
+
+        Args:
+            sample_paths: Voice sample files
+            desc: Progress bar label
+
+        Returns:
+            Tuple of (embeddings, paths of the samples that succeeded), in input order
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from tqdm import tqdm
+
+        existing = []
+        for sample_path in sample_paths:
+            if Path(sample_path).exists():
+                existing.append(sample_path)
+            else:
+                logger.warning(f"Sample not found: {sample_path}")
+
+        if not existing:
+            return [], []
+
+        # Load the shared encoder once, before the workers use it
+        self._get_encoder()
+
+        def compute(sample_path):
+            try:
+                return self._compute_embedding(sample_path)
+            except Exception as e:
+                logger.warning(f"Failed to process {sample_path}: {e}")
+                return None
+
+        workers = self.config.get('speaker_identification', 'enrollment_workers', default=4)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(existing)))) as executor:
+            results = list(tqdm(executor.map(compute, existing), total=len(existing), desc=desc))
+
+        embeddings = [embedding for embedding in results if embedding is not None]
+        valid_samples = [path for path, embedding in zip(existing, results) if embedding is not None]
+        return embeddings, valid_samples
+
+    def _set_centroids(self, speaker_data: Dict, centroids: np.ndarray, weights: np.ndarray):
+        """Cap a profile's centroids and store them."""
+        max_centroids = self.config.get('speaker_identification', 'max_profile_centroids', default=10)
+        centroids, weights = merge_centroids(centroids, weights, max_centroids)
+        speaker_data['centroids'] = centroids.tolist()
+        speaker_data['centroid_weights'] = weights.tolist()
+
     def enroll(
         self,
         name: str,
@@ -142,6 +710,7 @@ class SpeakerDatabase:
                 'error': f'Maximum {max_samples} samples allowed, got {len(sample_paths)}'
             }
 
+        self._refresh()
         if name in self.speakers:
             return {
                 'success': False,
@@ -151,20 +720,7 @@ class SpeakerDatabase:
         logger.info(f"Enrolling speaker: {name} ({len(sample_paths)} samples)")
 
         # Compute embeddings from all samples
-        embeddings = []
-        valid_samples = []
-
-        for sample_path in tqdm(sample_paths, desc=f"Processing {name}"):
-            if not Path(sample_path).exists():
-                logger.warning(f"Sample not found: {sample_path}")
-                continue
-
-            try:
-                embedding = self._compute_embedding(sample_path)
-                embeddings.append(embedding)
-                valid_samples.append(sample_path)
-            except Exception as e:
-                logger.warning(f"Failed to process {sample_path}: {e}")
+        embeddings, valid_samples = self._compute_sample_embeddings(sample_paths, desc=f"Processing {name}")
 
         if len(embeddings) < min_samples:
             return {
@@ -192,9 +748,16 @@ class SpeakerDatabase:
             'metadata': metadata or {}
         }
 
-        # Save to database
-        self.speakers[name] = speaker_data
-        self._save_database()
+        # Keep the individual samples (up to the cap) so identification can
+        # match whichever recording condition is closest
+        self._set_centroids(speaker_data, np.array(embeddings), np.ones(len(embeddings)))
+
+        # Save to database, unless another process enrolled the name meanwhile
+        if self._update_speaker(name, lambda current: speaker_data if current is None else None) is None:
+            return {
+                'success': False,
+                'error': f'Speaker "{name}" already enrolled. Use update_enrollment() to modify.'
+            }
 
         logger.info(f"Successfully enrolled: {name} (ID: {profile_id})")
 
@@ -209,64 +772,84 @@ class SpeakerDatabase:
         self,
         name: str,
         additional_samples: Optional[List[str]] = None,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        additional_embeddings: Optional[List[np.ndarray]] = None
     ) -> Dict:
         """
         Update existing speaker enrollment.
 
+        New embeddings are merged into the stored centroids incrementally;
+        earlier samples are never re-read from audio. The merge is applied
+        to the profile as stored, under the store's lock, so concurrent
+        updates from other processes are kept.
+
         Args:
             name: Speaker name
             additional_samples: Additional voice samples to add
             metadata: Updated metadata
+            additional_embeddings: Already computed embeddings to add (e.g.
+                                   from a confirmed diarization cluster)
 
         Returns:
             Update result
         """
+        self._refresh()
         if name not in self.speakers:
             return {
                 'success': False,
                 'error': f'Speaker "{name}" not found in database'
             }
 
-        speaker_data = self.speakers[name]
-
-        # Update metadata
-        if metadata:
-            speaker_data['metadata'].update(metadata)
+        # Embed new samples before taking the lock
+        new_embeddings = [np.asarray(embedding) for embedding in (additional_embeddings or [])]
+        valid_samples = []
 
-        # Add new samples
         if additional_samples:
             logger.info(f"Adding {len(additional_samples)} samples to {name}")
+            sample_embeddings, valid_samples = self._compute_sample_embeddings(
+                additional_samples, desc=f"Processing {name}"
+            )
+            new_embeddings.extend(sample_embeddings)
 
-            current_embedding = np.array(speaker_data['embedding'])
-            num_existing = speaker_data['num_samples']
-
-            new_embeddings = []
-            valid_samples = []
-
-            for sample_path in additional_samples:
-                if not Path(sample_path).exists():
-                    continue
+        def merge(speaker_data):
+            if speaker_data is None:
+                return None
 
-                try:
-                    embedding = self._compute_embedding(sample_path)
-                    new_embeddings.append(embedding)
-                    valid_samples.append(sample_path)
-                except Exception as e:
-                    logger.warning(f"Failed to process {sample_path}: {e}")
+            # Update metadata
+            if metadata:
+                speaker_data['metadata'] = {**speaker_data.get('metadata', {}), **metadata}
 
             if new_embeddings:
+                current_embedding = np.array(speaker_data['embedding'])
+                num_existing = speaker_data['num_samples']
+
                 # Recombine with existing embedding
                 total_samples = num_existing + len(new_embeddings)
                 new_profile = (current_embedding * num_existing + np.mean(new_embeddings, axis=0) * len(new_embeddings)) / total_samples
                 new_profile = new_profile / np.linalg.norm(new_profile)
 
+                # New samples join the centroids, then the closest ones merge down to the cap
+                centroids, weights = self._centroids(speaker_data)
+                self._set_centroids(
+                    speaker_data,
+                    np.concatenate([centroids, np.array(new_embeddings, dtype=np.float32)]),
+                    np.concatenate([weights, np.ones(len(new_embeddings))])
+                )
+
                 speaker_data['embedding'] = new_profile.tolist()
                 speaker_data['num_samples'] = total_samples
-                speaker_data['sample_paths'].extend(valid_samples)
+                speaker_data['sample_paths'] = list(speaker_data.get('sample_paths', [])) + valid_samples
+
+            speaker_data['updated_at'] = datetime.now().isoformat()
+            return speaker_data
 
-        speaker_data['updated_at'] = datetime.now().isoformat()
-        self._save_database()
+        speaker_data = self._update_speaker(name, merge)
+        if speaker_data is None:
+            # Removed by another process while the samples were embedded
+            return {
+                'success': False,
+                'error': f'Speaker "{name}" not found in database'
+            }
 
         return {
             'success': True,
@@ -289,46 +872,35 @@ class SpeakerDatabase:
         Returns:
             Tuple of (speaker_name, confidence_score) or (None, 0) if no match
         """
+        self._refresh()
         if not self.speakers:
             return None, 0.0
 
         if threshold is None:
             threshold = self.threshold
 
-        # Normalize query embedding
-        embedding = embedding / np.linalg.norm(embedding)
-
-        best_match = None
-        best_score = threshold
-
-        for name, speaker_data in self.speakers.items():
-            profile_embedding = np.array(speaker_data['embedding'])
-
-            # Compute cosine similarity
-            similarity = 1 - cosine(embedding, profile_embedding)
-
-            if similarity > best_score:
-                best_match = name
-                best_score = similarity
+        names, scores = self.search(embedding, top_k=1)
+        if scores[0, 0] > threshold:
+            return names[0, 0], float(scores[0, 0])
 
-        return best_match, best_score
+        return None, threshold
 
     def identify_from_audio(
         self,
-        audio_path: str,
+        audio: Union[str, DecodedAudio],
         threshold: Optional[float] = None
     ) -> Tuple[Optional[str], float]:
         """
         Identify speaker from audio file.
 
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file or already decoded audio
             threshold: Similarity threshold
 
         Returns:
             Tuple of (speaker_name, confidence_score)
         """
-        embedding = self._compute_embedding(audio_path)
+        embedding = self._compute_embedding(audio)
         return self.identify(embedding, threshold)
 
     def list_speakers(self) -> List[Dict]:
@@ -338,6 +910,7 @@ class SpeakerDatabase:
         Returns:
             List of speaker info dicts
         """
+        self._refresh()
         speakers = []
 
         for name, data in self.speakers.items():
@@ -361,9 +934,10 @@ class SpeakerDatabase:
         Returns:
             True if removed, False if not found
         """
+        self._refresh()
         if name in self.speakers:
             del self.speakers[name]
-            self._save_database()
+            self._delete_speaker(name)
             logger.info(f"Removed speaker: {name}")
             return True
         return False
@@ -378,6 +952,7 @@ class SpeakerDatabase:
         Returns:
             Speaker info dict or None
         """
+        self._refresh()
         return self.speakers.get(name)
 
     def get_embedding(self, name: str) -> Optional[np.ndarray]:
@@ -390,6 +965,7 @@ class SpeakerDatabase:
         Returns:
             Embedding array or None
         """
+        self._refresh()
         data = self.speakers.get(name)
         if data:
             return np.array(data['embedding'])
@@ -397,25 +973,46 @@ class SpeakerDatabase:
 
 
 def batch_identify(
-    embeddings: List[np.ndarray],
+    embeddings: Union[List[np.ndarray], np.ndarray],
     database: SpeakerDatabase,
-    threshold: Optional[float] = None
-) -> List[Tuple[Optional[str], float]]:
+    threshold: Optional[float] = None,
+    return_margins: bool = False
+) -> List[Tuple]:
     """
-    Identify multiple embeddings.
+    Identify multiple embeddings with one matrix product.
 
     Args:
-        embeddings: List of speaker embeddings
+        embeddings: List or array of speaker embeddings
         database: Speaker database
-        threshold: Similarity threshold
+        threshold: Similarity threshold (default from config)
+        return_margins: Also return the gap between the best and
+                        second-best speaker's similarity (the best
+                        similarity itself when only one is enrolled)
 
     Returns:
-        List of (speaker_name, confidence) tuples
+        List of (speaker_name, confidence) tuples, or
+        (speaker_name, confidence, margin) with return_margins; unmatched
+        embeddings give (None, threshold)
     """
-    results = []
+    if threshold is None:
+        threshold = database.threshold
+
+    if len(embeddings) == 0:
+        return []
+
+    if not database.speakers:
+        return [(None, 0.0, 0.0) if return_margins else (None, 0.0) for _ in range(len(embeddings))]
 
-    for embedding in embeddings:
-        speaker, confidence = database.identify(embedding, threshold)
-        results.append((speaker, confidence))
+    names, scores = database.search(embeddings, top_k=2)
+    best = scores[:, 0]
+    margins = best - scores[:, 1] if scores.shape[1] > 1 else best
+
+    results = []
+    for name, score, margin in zip(names[:, 0], best, margins):
+        if score > threshold:
+            result = (name, float(score))
+        else:
+            result = (None, threshold)
+        results.append(result + (float(margin),) if return_margins else result)
 
     return results
@@ -0,0 +1,455 @@
+"""
+Storage backends for enrolled speaker profiles.
+
+JsonSpeakerStore keeps the original single database.json. SqliteSpeakerStore
+keeps metadata in SQLite and embeddings in an append-only file of float32
+rows next to it, so enrolling a speaker appends one row instead of
+rewriting the whole roster. Writers serialise on an exclusive file lock and
+readers take a shared one. Changes to an existing profile go through
+update(), which re-reads the profile and applies the change under the
+lock, so concurrent enrollments from several processes cannot clobber each
+other.
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single writer assumed
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def file_lock(lock_path: str, shared: bool = False):
+    """
+    Hold an advisory lock on lock_path for the duration of the block.
+
+    Args:
+        lock_path: Lock file path (created if missing)
+        shared: Take a shared (reader) lock instead of an exclusive one
+    """
+    Path(lock_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_atomic(path: str, data: bytes):
+    """Write a file via a temporary file and rename."""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class JsonSpeakerStore:
+    """All profiles in one JSON file (the original database.json format)."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize store.
+
+        Args:
+            db_path: Path to database.json
+        """
+        self.db_path = db_path
+        self.lock_path = f"{db_path}.lock"
+
+    def version(self) -> Optional[Tuple]:
+        """Token that changes whenever the file is rewritten (None if missing)."""
+        try:
+            stat = os.stat(self.db_path)
+        except FileNotFoundError:
+            return None
+        # Every write replaces the file, so the inode changes too
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _read(self) -> Dict:
+        if Path(self.db_path).exists():
+            with open(self.db_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                # The bundled empty database stores speakers as []
+                return data.get('speakers') or {}
+        return {}
+
+    def load(self) -> Dict[str, Dict]:
+        """Load all speaker profiles keyed by name."""
+        with file_lock(self.lock_path, shared=True):
+            return self._read()
+
+    def _write(self, speakers: Dict):
+        """Rewrite the whole file (caller holds the lock)."""
+        data = {
+            'version': '1.0',
+            'speakers': speakers,
+            'updated_at': datetime.now().isoformat()
+        }
+        _write_atomic(self.db_path, json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+
+    def _update(self, apply):
+        """Re-read, apply a change and rewrite, under the lock."""
+        with file_lock(self.lock_path):
+            speakers = self._read()
+            apply(speakers)
+            self._write(speakers)
+
+    @staticmethod
+    def _serializable(speaker: Dict) -> Dict:
+        speaker = {**speaker, 'embedding': np.asarray(speaker['embedding'], dtype=float).tolist()}
+        if speaker.get('centroids') is not None:
+            speaker['centroids'] = np.asarray(speaker['centroids'], dtype=float).tolist()
+            speaker['centroid_weights'] = np.asarray(speaker['centroid_weights'], dtype=float).tolist()
+        return speaker
+
+    def put(self, speaker: Dict):
+        """Insert or replace one speaker profile."""
+        speaker = self._serializable(speaker)
+        self._update(lambda speakers: speakers.__setitem__(speaker['name'], speaker))
+
+    def update(
+        self,
+        name: str,
+        apply: Callable[[Optional[Dict]], Optional[Dict]]
+    ) -> Tuple[Optional[Dict], Optional[Tuple], Optional[Tuple]]:
+        """
+        Read-modify-write one profile under the exclusive lock.
+
+        Args:
+            name: Speaker name
+            apply: fn(current profile or None) returning the new profile,
+                   or None to leave the store unchanged
+
+        Returns:
+            Tuple of (new profile or None, store version before the
+            write, store version after it)
+        """
+        with file_lock(self.lock_path):
+            before = self.version()
+            speakers = self._read()
+            current = speakers.get(name)
+            profile = apply({**current, 'name': name} if current is not None else None)
+            if profile is not None:
+                speakers[name] = self._serializable({**profile, 'name': name})
+                self._write(speakers)
+            return profile, before, self.version()
+
+    def delete(self, name: str):
+        """Remove one speaker profile."""
+        self._update(lambda speakers: speakers.pop(name, None))
+
+
+class SqliteSpeakerStore:
+    """
+    Profile metadata in SQLite, embeddings in an append-only float32 file.
+
+    The embeddings file is a headerless row-major float32 matrix; each
+    speaker in SQLite points at a contiguous block of rows: the mean
+    embedding followed by its centroids. Updating a profile appends a new
+    block and repoints the speaker, so the file only grows until compact()
+    rewrites it with the live blocks.
+    """
+
+    def __init__(self, store_path: str):
+        """
+        Initialize store.
+
+        Args:
+            store_path: Path to the SQLite database (e.g. speakers/speakers.db)
+        """
+        self.store_path = store_path
+        base, _ = os.path.splitext(store_path)
+        self.embeddings_path = f"{base}_embeddings.f32"
+        self.lock_path = f"{store_path}.lock"
+
+        Path(store_path).parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path), self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE TABLE IF NOT EXISTS speakers (
+                    name TEXT PRIMARY KEY,
+                    id TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    num_samples INTEGER NOT NULL,
+                    sample_paths TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    created_at TEXT,
+                    updated_at TEXT
+                );
+            """)
+
+            # Stores created before multi-centroid profiles hold one row each
+            columns = {column[1] for column in conn.execute("PRAGMA table_info(speakers)")}
+            if 'n_rows' not in columns:
+                conn.execute("ALTER TABLE speakers ADD COLUMN n_rows INTEGER NOT NULL DEFAULT 1")
+                conn.execute("ALTER TABLE speakers ADD COLUMN centroid_weights TEXT")
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.store_path, timeout=30.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _dim(self, conn: sqlite3.Connection) -> Optional[int]:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        return int(row[0]) if row else None
+
+    def _read_matrix(self, dim: int) -> np.ndarray:
+        """Map the embeddings file read-only as an (n, dim) matrix."""
+        if not os.path.exists(self.embeddings_path) or os.path.getsize(self.embeddings_path) < dim * 4:
+            return np.zeros((0, dim), dtype=np.float32)
+        n_rows = os.path.getsize(self.embeddings_path) // (dim * 4)
+        return np.memmap(self.embeddings_path, dtype=np.float32, mode='r', shape=(n_rows, dim))
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM speakers").fetchone()[0]
+
+    def version(self) -> Tuple:
+        """
+        Token that changes whenever another writer changes the store.
+
+        Every put appends to the embeddings file and every delete changes
+        the row count, so the pair is cheap and never misses a write.
+        """
+        with self._connect() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM speakers").fetchone()[0]
+        try:
+            size = os.path.getsize(self.embeddings_path)
+        except FileNotFoundError:
+            size = 0
+        return (count, size, os.stat(self.store_path).st_mtime_ns)
+
+    _COLUMNS = ("name, id, row, n_rows, centroid_weights, num_samples, sample_paths, metadata, "
+                "created_at, updated_at")
+
+    @staticmethod
+    def _speaker(record: Tuple, matrix: np.ndarray) -> Dict:
+        """Build a profile dict from a speakers row and the embeddings matrix."""
+        (name, profile_id, row, n_rows, centroid_weights, num_samples,
+         sample_paths, metadata, created_at, updated_at) = record
+        speaker = {
+            'id': profile_id,
+            'name': name,
+            'embedding': np.array(matrix[row]),
+            'num_samples': num_samples,
+            'sample_paths': json.loads(sample_paths),
+            'created_at': created_at,
+            'metadata': json.loads(metadata),
+        }
+        if n_rows > 1:
+            speaker['centroids'] = np.array(matrix[row + 1:row + n_rows])
+            speaker['centroid_weights'] = json.loads(centroid_weights)
+        if updated_at:
+            speaker['updated_at'] = updated_at
+        return speaker
+
+    def load(self) -> Dict[str, Dict]:
+        """Load all speaker profiles keyed by name."""
+        with file_lock(self.lock_path, shared=True), self._connect() as conn:
+            dim = self._dim(conn)
+            rows = conn.execute(f"SELECT {self._COLUMNS} FROM speakers ORDER BY rowid").fetchall()
+            matrix = self._read_matrix(dim) if dim else None
+            return {record[0]: self._speaker(record, matrix) for record in rows}
+
+    def _append(self, conn: sqlite3.Connection, block: np.ndarray) -> int:
+        """Append a block of embedding rows and return its first index (caller holds the lock)."""
+        block = np.atleast_2d(np.asarray(block, dtype=np.float32))
+
+        dim = self._dim(conn)
+        if dim is None:
+            dim = block.shape[1]
+            conn.execute("INSERT INTO meta (key, value) VALUES ('dim', ?)", (str(dim),))
+        elif block.shape[1] != dim:
+            raise ValueError(f"Embedding has {block.shape[1]} dimensions, store has {dim}")
+
+        with open(self.embeddings_path, 'ab') as f:
+            # Drop a partial row left by an interrupted append
+            size = f.seek(0, os.SEEK_END)
+            row = size // (dim * 4)
+            if size != row * dim * 4:
+                f.truncate(row * dim * 4)
+            f.write(block.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        return row
+
+    def put(self, speaker: Dict):
+        """
+        Insert or replace one speaker profile.
+
+        The embedding rows are appended and synced before the metadata
+        commit points at them, so a crash leaves at most an unreferenced block.
+        """
+        with file_lock(self.lock_path), self._connect() as conn:
+            self._put(conn, speaker)
+
+    def update(
+        self,
+        name: str,
+        apply: Callable[[Optional[Dict]], Optional[Dict]]
+    ) -> Tuple[Optional[Dict], Tuple, Tuple]:
+        """Read-modify-write one profile under the exclusive lock; see JsonSpeakerStore.update."""
+        with file_lock(self.lock_path):
+            before = self.version()
+            with self._connect() as conn:
+                dim = self._dim(conn)
+                record = conn.execute(f"SELECT {self._COLUMNS} FROM speakers WHERE name = ?", (name,)).fetchone()
+                current = self._speaker(record, self._read_matrix(dim)) if record else None
+                profile = apply(current)
+                if profile is not None:
+                    self._put(conn, {**profile, 'name': name})
+            return profile, before, self.version()
+
+    def _put(self, conn: sqlite3.Connection, speaker: Dict):
+        """Write one profile (caller holds the lock)."""
+        block = [np.asarray(speaker['embedding'], dtype=np.float32)]
+        centroid_weights = None
+        if speaker.get('centroids') is not None and len(speaker['centroids']):
+            block.extend(np.asarray(speaker['centroids'], dtype=np.float32))
+            centroid_weights = json.dumps(np.asarray(speaker['centroid_weights'], dtype=float).tolist())
+
+        row = self._append(conn, np.array(block))
+        conn.execute(
+            "INSERT OR REPLACE INTO speakers "
+            "(name, id, row, n_rows, centroid_weights, num_samples, sample_paths, metadata, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                speaker['name'],
+                speaker['id'],
+                row,
+                len(block),
+                centroid_weights,
+                speaker['num_samples'],
+                json.dumps(speaker.get('sample_paths', []), ensure_ascii=False),
+                json.dumps(speaker.get('metadata', {}), ensure_ascii=False),
+                speaker.get('created_at'),
+                speaker.get('updated_at'),
+            )
+        )
+
+    def delete(self, name: str):
+        """Remove one speaker profile (its embedding rows are reclaimed by compact())."""
+        with file_lock(self.lock_path), self._connect() as conn:
+            conn.execute("DELETE FROM speakers WHERE name = ?", (name,))
+
+    def compact(self) -> int:
+        """
+        Rewrite the embeddings file with only the live blocks.
+
+        Returns:
+            Number of rows reclaimed
+        """
+        with file_lock(self.lock_path), self._connect() as conn:
+            dim = self._dim(conn)
+            if dim is None:
+                return 0
+
+            entries = conn.execute("SELECT name, row, n_rows FROM speakers ORDER BY row").fetchall()
+            new_rows = np.concatenate([[0], np.cumsum([n_rows for _, _, n_rows in entries])])
+
+            matrix = self._read_matrix(dim)
+            live_rows = [i for _, row, n_rows in entries for i in range(row, row + n_rows)]
+            live = np.array(matrix[live_rows], dtype=np.float32).reshape(-1, dim)
+            reclaimed = len(matrix) - len(live)
+            del matrix
+
+            # Readers hold the shared lock, so the swap is never seen half-done
+            _write_atomic(self.embeddings_path, live.tobytes())
+            conn.executemany(
+                "UPDATE speakers SET row = ? WHERE name = ?",
+                [(int(new_row), name) for new_row, (name, _, _) in zip(new_rows, entries)]
+            )
+
+        logger.info(f"Compacted speaker embeddings: {reclaimed} rows reclaimed")
+        return reclaimed
+
+
+def migrate_json_store(json_path: str, store_path: str, overwrite: bool = False) -> int:
+    """
+    Copy every profile from a database.json into a SQLite store.
+
+    Args:
+        json_path: Source database.json
+        store_path: Destination SQLite database
+        overwrite: Replace speakers that already exist in the store
+
+    Returns:
+        Number of speakers copied
+    """
+    source = JsonSpeakerStore(json_path).load()
+    store = SqliteSpeakerStore(store_path)
+    existing = set(store.load())
+
+    copied = 0
+    for name, speaker in source.items():
+        if name in existing and not overwrite:
+            logger.info(f"Skipping {name}: already in {store_path}")
+            continue
+        store.put({**speaker, 'name': name})
+        copied += 1
+
+    logger.info(f"Migrated {copied} speakers from {json_path} to {store_path}")
+    return copied
+
+
+def open_speaker_store(config):
+    """
+    Open the speaker store selected by speaker_identification.backend.
+
+    A new SQLite store is seeded from an existing database.json, so
+    switching backends does not lose enrolled speakers.
+
+    Args:
+        config: Config instance
+
+    Returns:
+        JsonSpeakerStore or SqliteSpeakerStore
+    """
+    backend = config.get('speaker_identification', 'backend', default='sqlite')
+    json_path = config.get('speaker_identification', 'database_path')
+
+    if backend == 'json':
+        return JsonSpeakerStore(json_path)
+
+    if backend == 'sqlite':
+        store_path = config.get('speaker_identification', 'store_path', default='speakers/speakers.db')
+        is_new = not os.path.exists(store_path)
+        store = SqliteSpeakerStore(store_path)
+        if is_new and json_path and os.path.exists(json_path) and JsonSpeakerStore(json_path).load():
+            logger.info(f"Migrating speakers from {json_path}")
+            migrate_json_store(json_path, store_path)
+        return store
+
+    raise ValueError(f"Unknown speaker store backend: {backend}")
@@ -4,15 +4,166 @@ Supports OpenAI GPT and local LLMs.
 """
 import json
 import logging
-import time
-from typing import Dict, List, Optional, Any
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
 
 from .utils.config import get_config
+from .utils.llm_cache import LLMCache, cache_key
 
 
 logger = logging.getLogger(__name__)
 
+# Rough characters per token for Indonesian/English text; no tokenizer is
+# needed to keep chunks inside the model's context
+CHARS_PER_TOKEN = 4
+
+# Part of every response cache key: bump when _create_prompt or
+# _create_reduce_prompt change so earlier responses are not reused
+PROMPT_VERSION = 1
+
+SPEAKER_HEADER = re.compile(r'^--- (.+?) ---$')
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_transcript(transcript: str, chunk_tokens: int) -> List[str]:
+    """
+    Split a transcript into chunks of at most about chunk_tokens.
+
+    Chunks end on speaker-turn boundaries where possible. A turn longer
+    than a chunk is split between timestamped lines, and the continuation
+    chunk repeats the speaker header so every chunk is self-describing.
+
+    Args:
+        transcript: Transcript text ("--- Speaker ---" headers and
+                    "[MM:SS - MM:SS] text" lines, or plain lines)
+        chunk_tokens: Token budget per chunk
+
+    Returns:
+        List of transcript chunks
+    """
+    budget = max(chunk_tokens, 1) * CHARS_PER_TOKEN
+
+    # Group lines into speaker turns
+    turns = []
+    header = None
+    for line in transcript.splitlines():
+        if not line.strip():
+            continue
+        if SPEAKER_HEADER.match(line.strip()):
+            header = line.strip()
+            turns.append((header, []))
+        elif turns:
+            turns[-1][1].append(line)
+        else:
+            turns.append((None, [line]))
+
+    chunks = []
+    current = []
+    current_size = 0
+
+    def flush():
+        nonlocal current, current_size
+        if current:
+            chunks.append('\n'.join(current).strip())
+        current = []
+        current_size = 0
+
+    for header, lines in turns:
+        turn_text = '\n'.join(([header] if header else []) + lines)
+        if current_size + len(turn_text) + 1 <= budget:
+            current.append(turn_text if not current else '\n' + turn_text)
+            current_size += len(turn_text) + 1
+            continue
+
+        if len(turn_text) <= budget:
+            flush()
+            current.append(turn_text)
+            current_size = len(turn_text)
+            continue
+
+        # Turn longer than a chunk: split between lines. Every chunk of the
+        # turn starts with the header, so lines get what the header leaves
+        flush()
+        line_budget = max(budget - (len(header) + 1 if header else 0), 1)
+        for line in lines:
+            # A single oversized line is cut by characters
+            pieces = [line[i:i + line_budget] for i in range(0, len(line), line_budget)] or ['']
+            for piece in pieces:
+                if current_size + len(piece) + 1 > budget:
+                    flush()
+                if not current and header:
+                    current.append(header)
+                    current_size = len(header) + 1
+                current.append(piece)
+                current_size += len(piece) + 1
+
+    flush()
+    return chunks
+
+
+def _dedupe(items: List[Any], key) -> List[Any]:
+    """Drop items whose key was already seen, keeping order."""
+    seen = set()
+    result = []
+    for item in items:
+        item_key = key(item)
+        if item_key in seen:
+            continue
+        seen.add(item_key)
+        result.append(item)
+    return result
+
+
+def _normalize_key(value: Any) -> str:
+    return ' '.join(str(value or '').lower().split())
+
+
+def merge_summaries(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge partial summaries of consecutive transcript chunks.
+
+    discussion_points, decisions and action_items are concatenated in
+    transcript order with duplicates removed; the executive summaries and
+    key topics are only collected, for the reduce prompt to rewrite.
+
+    Args:
+        summaries: Parsed chunk summaries in transcript order
+
+    Returns:
+        Summary dict in the usual schema
+    """
+    merged = {
+        "executive_summary": " ".join(s.get("executive_summary") or "" for s in summaries).strip(),
+        "key_topics": _dedupe(
+            [topic for s in summaries for topic in (s.get("key_topics") or [])],
+            _normalize_key
+        ),
+        "discussion_points": [point for s in summaries for point in (s.get("discussion_points") or [])],
+        "decisions": _dedupe(
+            [decision for s in summaries for decision in (s.get("decisions") or [])],
+            lambda d: _normalize_key(d.get("decision") if isinstance(d, dict) else d)
+        ),
+        "action_items": _dedupe(
+            [item for s in summaries for item in (s.get("action_items") or [])],
+            lambda item: _normalize_key(item.get("task") if isinstance(item, dict) else item)
+        ),
+        "next_meeting": None,
+    }
+
+    # The latest mention of the next meeting wins
+    for s in summaries:
+        if s.get("next_meeting"):
+            merged["next_meeting"] = s["next_meeting"]
+
+    return merged
+
 
 class MeetingSummarizer:
     """
@@ -39,87 +190,137 @@ class MeetingSummarizer:
         # Initialize client
         self._init_client()
 
+        self.cache = self._init_cache()
+        self._stats_lock = threading.Lock()
+
+    def close(self):
+        """Close the LLM client's connection pool."""
+        self.client.close()
+
     def _init_client(self):
-        """Initialize AI client based on provider."""
+        """Initialize the provider and the shared LLM client."""
+        from .llm_client import LLMClient
+
         if self.provider == "openai":
-            self._init_openai()
+            provider = self._init_openai()
+            limits = {
+                "requests_per_minute": self.config.get('summarization', 'openai', 'requests_per_minute', default=None),
+                "tokens_per_minute": self.config.get('summarization', 'openai', 'tokens_per_minute', default=None),
+            }
         elif self.provider == "local":
-            self._init_local_llm()
+            provider = self._init_local_llm()
+            limits = {}
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
 
-    def _init_openai(self):
-        """Initialize OpenAI client."""
-        try:
-            from openai import OpenAI
+        client_config = self.config.get('summarization', 'client', default=None) or {}
+        self.client = LLMClient(
+            provider,
+            concurrency=client_config.get('concurrency', 4),
+            max_retries=client_config.get('max_retries', 5),
+            deadline_sec=client_config.get('deadline_sec', 900),
+            backoff_base_sec=client_config.get('backoff_base_sec', 1.0),
+            backoff_max_sec=client_config.get('backoff_max_sec', 30.0),
+            **limits
+        )
 
-            api_key = self.config.get_openai_api_key()
-            if not api_key:
-                raise ValueError("OPENAI_API_KEY not found in config or environment")
+        if self.provider == "local" and not self.client.check():
+            logger.warning(
+                f"Cannot connect to local LLM at {self.base_url}. "
+                f"Make sure Ollama is running: ollama serve"
+            )
 
-            self.client = OpenAI(api_key=api_key)
-            self.model = self.config.get('summarization', 'openai', 'model')
-            self.temperature = self.config.get('summarization', 'openai', 'temperature')
-            self.max_tokens = self.config.get('summarization', 'openai', 'max_tokens')
+        logger.info(f"LLM client initialized: {self.provider} / {self.model}")
 
-            logger.info(f"OpenAI client initialized: {self.model}")
+    def _init_cache(self) -> Optional[LLMCache]:
+        """Open the response cache, or return None if disabled or unusable."""
+        cache_config = self.config.get('summarization', 'cache', default=None) or {}
+        if not cache_config.get('enabled', True):
+            return None
 
-        except ImportError:
-            logger.error("OpenAI package not installed. Install with: pip install openai")
-            raise
+        try:
+            return LLMCache(
+                cache_config.get('path', '.cache/llm/responses.db'),
+                max_size_mb=cache_config.get('max_size_mb', 100),
+                max_age_days=cache_config.get('max_age_days', 30)
+            )
         except Exception as e:
-            logger.error(f"Failed to initialize OpenAI: {e}")
-            raise
+            logger.warning(f"LLM response cache unavailable, continuing without it: {e}")
+            return None
 
-    def _init_local_llm(self):
-        """Initialize local LLM client (Ollama, etc.)."""
-        try:
-            import requests
+    def _init_openai(self):
+        """Create the OpenAI provider."""
+        from .llm_client import OpenAIProvider
+
+        api_key = self.config.get_openai_api_key()
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in config or environment")
+
+        self.model = self.config.get('summarization', 'openai', 'model')
+        self.temperature = self.config.get('summarization', 'openai', 'temperature')
+        self.max_tokens = self.config.get('summarization', 'openai', 'max_tokens')
+        self.base_url = (
+            self.config.get('summarization', 'openai', 'base_url', default=None)
+            or "https://api.openai.com/v1"
+        )
 
-            self.model = self.config.get('summarization', 'local', 'model')
-            self.base_url = self.config.get('summarization', 'local', 'base_url')
-            self.temperature = self.config.get('summarization', 'local', 'temperature')
+        return OpenAIProvider(
+            api_key,
+            self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            base_url=self.base_url,
+            timeout=self.config.get('summarization', 'openai', 'timeout', default=120),
+            system_prompt="You are a professional meeting assistant that creates structured summaries in Indonesian or English."
+        )
 
-            # Test connection
-            try:
-                response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-                if response.status_code != 200:
-                    logger.warning(
-                        f"Local LLM server may not be running at {self.base_url}. "
-                        f"Start Ollama with: ollama serve"
-                    )
-            except requests.exceptions.ConnectionError:
-                logger.warning(
-                    f"Cannot connect to local LLM at {self.base_url}. "
-                    f"Make sure Ollama is running: ollama serve"
-                )
-            except requests.exceptions.Timeout:
-                logger.warning(
-                    f"Connection to local LLM at {self.base_url} timed out. "
-                    f"Check if Ollama is running."
-                )
+    def _init_local_llm(self):
+        """Create the local LLM (Ollama) provider."""
+        from .llm_client import OllamaProvider
 
-            logger.info(f"Local LLM client initialized: {self.model} at {self.base_url}")
+        self.model = self.config.get('summarization', 'local', 'model')
+        self.base_url = self.config.get('summarization', 'local', 'base_url')
+        self.temperature = self.config.get('summarization', 'local', 'temperature')
 
-        except ImportError:
-            logger.error("Requests package not installed. Install with: pip install requests")
-            raise
+        return OllamaProvider(
+            self.base_url,
+            self.model,
+            temperature=self.temperature,
+            stream=self.config.get('summarization', 'local', 'stream', default=True),
+            timeout=self.config.get('summarization', 'local', 'timeout', default=300),
+            progress_interval=self.config.get('summarization', 'local', 'progress_interval_sec', default=10),
+            continuation_prompt=self._continuation_prompt
+        )
 
-    def _create_prompt(self, transcript: str, speakers: Optional[List[str]] = None) -> str:
+    def _create_prompt(
+        self,
+        transcript: str,
+        speakers: Optional[List[str]] = None,
+        part: Optional[tuple] = None
+    ) -> str:
         """
         Create summarization prompt.
 
         Args:
             transcript: Meeting transcript
             speakers: List of speaker names
+            part: Optional (index, total) when transcript is one chunk of a
+                  longer meeting
 
         Returns:
             Formatted prompt
         """
         lang_instruction = "Indonesia" if self.language == 'id' else "Inggris"
 
-        prompt = f"""Analisis transkrip rapat berikut dan buat rangkuman terstruktur dalam bahasa {lang_instruction}.
+        part_note = ""
+        if part:
+            part_note = (
+                f"\nIni adalah bagian {part[0]} dari {part[1]} transkrip rapat yang sama. "
+                f"Rangkum hanya isi bagian ini.\n"
+            )
 
+        prompt = f"""Analisis transkrip rapat berikut dan buat rangkuman terstruktur dalam bahasa {lang_instruction}.
+{part_note}
 Transkrip:
 {transcript}
 
@@ -167,121 +368,140 @@ Output HANYA JSON valid, tanpa teks tambahan."""
 
         return prompt
 
-    def _call_openai(self, prompt: str) -> str:
-        """Call OpenAI API."""
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a professional meeting assistant that creates structured summaries in Indonesian or English."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=self.temperature,
-            max_tokens=self.max_tokens
-        )
+    def _create_reduce_prompt(self, digests: List[Dict[str, Any]]) -> str:
+        """
+        Create the prompt that merges chunk summaries into one overview.
 
-        return response.choices[0].message.content
+        Args:
+            digests: Per-chunk executive_summary, key_topics and next_meeting,
+                     in transcript order
 
-    def _call_local_llm(self, prompt: str, max_retries: int = 3) -> str:
+        Returns:
+            Formatted prompt
         """
-        Call local LLM API with retry logic.
+        lang_instruction = "Indonesia" if self.language == 'id' else "Inggris"
+
+        return f"""Berikut adalah rangkuman dari beberapa bagian berurutan dari satu rapat.
+Gabungkan menjadi satu rangkuman keseluruhan dalam bahasa {lang_instruction}.
+
+Rangkuman per bagian:
+{json.dumps(digests, indent=1, ensure_ascii=False)}
+
+Buat rangkuman dengan format JSON berikut:
+{{
+  "executive_summary": "Ringkasan eksekutif 2-3 kalimat untuk seluruh rapat",
+  "key_topics": ["Topik 1", "Topik 2", "Topik 3"],
+  "next_meeting": "Tanggal/jadwal rapat berikutnya (jika disebutkan)"
+}}
+
+Petunjuk:
+- Key topics: 3-7 topik utama seluruh rapat, gabungkan topik yang sama
+- Jika informasi tidak tersedia, gunakan null
+
+Output HANYA JSON valid, tanpa teks tambahan."""
+
+    def _call_llm(
+        self,
+        prompt: str,
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        stats: Optional[Dict[str, int]] = None
+    ) -> str:
+        """
+        Call the configured provider through the shared client.
 
         Args:
             prompt: The prompt to send to the LLM
-            max_retries: Maximum number of retry attempts
+            on_field: Optional callback(key, value) for each top-level
+                      JSON field as soon as it is complete
+            stats: Optional dict whose calls and token counts are incremented
 
         Returns:
             LLM response text
-
-        Raises:
-            Exception: If all retries fail
         """
-        import requests
-
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": self.temperature
-            }
-        }
+        from .utils.json_stream import IncrementalJSONParser
 
-        last_error = None
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"Calling local LLM (attempt {attempt + 1}/{max_retries})...")
+        on_piece = None
+        if on_field is not None:
+            parser = IncrementalJSONParser()
 
-                response = requests.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload,
-                    timeout=300  # 5 minutes timeout for long transcripts
-                )
+            def on_piece(piece, reset):
+                nonlocal parser
+                if reset:
+                    parser = IncrementalJSONParser()
+                for key, value in parser.feed(piece):
+                    on_field(key, value)
 
-                response.raise_for_status()
-                data = response.json()
-                result = data.get("response", "")
+        text, usage = self.client.generate(prompt, on_piece=on_piece, prompt_tokens=estimate_tokens(prompt))
 
-                if not result:
-                    raise ValueError("Empty response from local LLM")
+        if stats is not None:
+            with self._stats_lock:
+                stats['calls'] += 1
+                stats['prompt_tokens'] += usage.get('prompt_tokens', 0)
+                stats['completion_tokens'] += usage.get('completion_tokens', 0)
+        return text
 
-                logger.info("Local LLM response received successfully")
-                return result
+    def _generate(
+        self,
+        prompt: str,
+        cache_input: Dict[str, Any],
+        stats: Optional[Dict[str, int]] = None,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the parsed model response for a prompt, through the response cache.
 
-            except requests.exceptions.ConnectionError as e:
-                last_error = e
-                logger.error(
-                    f"Failed to connect to Ollama at {self.base_url}. "
-                    f"Make sure Ollama is running: ollama serve"
-                )
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt  # Exponential backoff: 1, 2, 4 seconds
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-
-            except requests.exceptions.Timeout as e:
-                last_error = e
-                logger.error(
-                    f"Request to Ollama timed out. "
-                    f"The model may still be loading or the transcript is too long."
-                )
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-
-            except requests.exceptions.HTTPError as e:
-                last_error = e
-                logger.error(f"HTTP error from Ollama: {e}")
-
-                if response.status_code == 404:
-                    logger.error(
-                        f"Model '{self.model}' not found. "
-                        f"Download it with: ollama pull {self.model}"
-                    )
-                    break  # Don't retry for 404 errors
-                elif response.status_code == 500:
-                    # Server error, may be worth retrying
-                    if attempt < max_retries - 1:
-                        wait_time = 2 ** attempt
-                        logger.info(f"Retrying in {wait_time} seconds...")
-                        time.sleep(wait_time)
+        Only responses that parse as JSON are cached.
 
-            except Exception as e:
-                last_error = e
-                logger.error(f"Unexpected error calling local LLM: {e}")
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-
-        # All retries failed
-        error_msg = (
-            f"Failed to call local LLM after {max_retries} attempts. "
-            f"Last error: {last_error}"
-        )
-        logger.error(error_msg)
+        Args:
+            prompt: The prompt to send to the LLM
+            cache_input: What the prompt was built from (e.g. the transcript
+                         chunk); hashed with provider, model, temperature and
+                         PROMPT_VERSION into the cache key
+            stats: Optional dict of summarize() counters (cache hits and
+                   misses, calls, tokens)
+            on_field: Optional callback(key, value) per summary field; on a
+                      cache hit it is called for every field at once
 
-        raise Exception(error_msg)
+        Returns:
+            Parsed response dict
+        """
+        key = None
+        if self.cache is not None:
+            key = cache_key(
+                provider=self.provider,
+                model=self.model,
+                temperature=self.temperature,
+                max_tokens=getattr(self, 'max_tokens', None),
+                language=self.language,
+                prompt_version=PROMPT_VERSION,
+                **cache_input
+            )
+            response = self.cache.get(key)
+            if stats is not None:
+                with self._stats_lock:
+                    stats['hits' if response is not None else 'misses'] += 1
+
+            if response is not None:
+                logger.debug(f"LLM cache hit ({key[:12]})")
+                parsed = self._parse_response(response)
+                if on_field is not None:
+                    for field, value in parsed.items():
+                        on_field(field, value)
+                return parsed
+
+        response = self._call_llm(prompt, on_field=on_field, stats=stats)
+        parsed = self._parse_response(response)
+        if key is not None and "raw_response" not in parsed:
+            self.cache.put(key, response)
+        return parsed
+
+    def _continuation_prompt(self, prompt: str, partial: str) -> str:
+        """Prompt asking the model to continue a response that was cut off."""
+        return (
+            f"{prompt}\n\n"
+            f"Jawaban sebelumnya terpotong. Lanjutkan TEPAT dari karakter terakhir berikut, "
+            f"tanpa mengulang bagian yang sudah ada:\n{partial}"
+        )
 
     def _parse_response(self, response: str) -> Dict[str, Any]:
         """
@@ -320,7 +540,8 @@ Output HANYA JSON valid, tanpa teks tambahan."""
     def summarize(
         self,
         transcript: str,
-        speakers: Optional[List[str]] = None
+        speakers: Optional[List[str]] = None,
+        on_field: Optional[Callable[[str, Any], None]] = None
     ) -> Dict[str, Any]:
         """
         Generate meeting summary from transcript.
@@ -328,9 +549,12 @@ Output HANYA JSON valid, tanpa teks tambahan."""
         Args:
             transcript: Meeting transcript text
             speakers: Optional list of speaker names
+            on_field: Optional callback(key, value) invoked as each summary
+                      field completes (single-pass summaries only)
 
         Returns:
-            Summary dict with executive summary, topics, decisions, action items
+            Summary dict with executive summary, topics, decisions, action
+            items, and 'usage' (LLM calls and tokens)
         """
         logger.info("Generating meeting summary...")
 
@@ -339,24 +563,30 @@ Output HANYA JSON valid, tanpa teks tambahan."""
             logger.info("Summarization disabled in config")
             return self._empty_summary()
 
-        # Truncate transcript if too long
-        max_length = 12000  # Approx token limit
-        if len(transcript) > max_length:
-            logger.warning(f"Transcript too long ({len(transcript)} chars), truncating to {max_length}")
-            transcript = transcript[:max_length] + "\n\n[Transkrip dipotong karena terlalu panjang...]"
+        map_reduce = self.config.get('summarization', 'map_reduce', default=None) or {}
+        context_tokens = map_reduce.get('context_tokens', 3000)
 
-        # Create prompt
-        prompt = self._create_prompt(transcript, speakers)
+        stats = {'hits': 0, 'misses': 0, 'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
 
-        # Call AI
         try:
-            if self.provider == "openai":
-                response = self._call_openai(prompt)
+            if estimate_tokens(transcript) > context_tokens:
+                summary = self._summarize_map_reduce(transcript, speakers, stats)
             else:
-                response = self._call_local_llm(prompt)
+                # Create prompt
+                prompt = self._create_prompt(transcript, speakers)
+
+                # Call AI (or reuse a cached response) and parse it
+                summary = self._generate(
+                    prompt,
+                    {"kind": "summary", "transcript": transcript, "speakers": speakers},
+                    stats,
+                    on_field=on_field
+                )
 
-            # Parse response
-            summary = self._parse_response(response)
+            summary["usage"] = self._usage(stats)
+            if self.cache is not None:
+                summary["cache"] = {"hits": stats['hits'], "misses": stats['misses']}
+                logger.info(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses")
 
             # Add metadata
             summary["generated_at"] = datetime.now().isoformat()
@@ -374,9 +604,147 @@ Output HANYA JSON valid, tanpa teks tambahan."""
                 "key_topics": [],
                 "decisions": [],
                 "action_items": [],
+                "usage": self._usage(stats),
                 "error": str(e)
             }
 
+    def _usage(self, stats: Dict[str, int]) -> Dict[str, int]:
+        """LLM calls and tokens from summarize() counters."""
+        return {key: stats[key] for key in ['calls', 'prompt_tokens', 'completion_tokens']}
+
+    def _summarize_map_reduce(
+        self,
+        transcript: str,
+        speakers: Optional[List[str]] = None,
+        stats: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Summarize a long transcript chunk by chunk, then merge.
+
+        Map: token-budgeted chunks are summarized concurrently on a bounded
+        pool. Reduce: discussion points, decisions and action items are
+        merged in transcript order, and the chunk overviews are combined by
+        the model, in several rounds if they do not fit one prompt.
+
+        Args:
+            transcript: Meeting transcript text
+            speakers: Optional list of speaker names
+            stats: Optional summarize() counters
+
+        Returns:
+            Summary dict; contains 'error' if any chunk failed
+        """
+        map_reduce = self.config.get('summarization', 'map_reduce', default=None) or {}
+        chunk_tokens = map_reduce.get('chunk_tokens', 2500)
+        concurrency = map_reduce.get('concurrency', 2)
+
+        chunks = split_transcript(transcript, chunk_tokens)
+        logger.info(f"Transcript is ~{estimate_tokens(transcript)} tokens: "
+                    f"summarizing {len(chunks)} chunks ({concurrency} at a time)")
+
+        def summarize_chunk(i):
+            prompt = self._create_prompt(chunks[i], speakers, part=(i + 1, len(chunks)))
+            try:
+                # Keyed on the chunk text alone, so a chunk that moved to a
+                # different position still reuses its cached summary
+                partial = self._generate(
+                    prompt,
+                    {"kind": "chunk", "transcript": chunks[i], "speakers": speakers},
+                    stats
+                )
+                logger.info(f"Chunk {i + 1}/{len(chunks)} summarized")
+                return partial
+            except Exception as e:
+                logger.error(f"Chunk {i + 1}/{len(chunks)} failed: {e}")
+                return {"error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            partials = list(executor.map(summarize_chunk, range(len(chunks))))
+
+        failed = [i + 1 for i, partial in enumerate(partials) if "error" in partial]
+        succeeded = [partial for partial in partials if "error" not in partial]
+        if not succeeded:
+            raise RuntimeError(f"All {len(chunks)} chunks failed: {partials[0]['error']}")
+
+        summary = merge_summaries(succeeded)
+
+        digests = [
+            {
+                "executive_summary": partial.get("executive_summary"),
+                "key_topics": partial.get("key_topics") or [],
+                "next_meeting": partial.get("next_meeting"),
+            }
+            for partial in succeeded
+        ]
+        overview, levels = self._reduce_digests(digests, map_reduce.get('context_tokens', 3000), stats)
+        for key in ["executive_summary", "key_topics", "next_meeting"]:
+            if overview.get(key):
+                summary[key] = overview[key]
+
+        summary["map_reduce"] = {"chunks": len(chunks), "reduce_levels": levels}
+        if failed:
+            summary["error"] = f"{len(failed)} of {len(chunks)} chunks failed: {failed}"
+
+        return summary
+
+    def _reduce_digests(
+        self,
+        digests: List[Dict[str, Any]],
+        context_tokens: int,
+        stats: Optional[Dict[str, int]] = None
+    ) -> tuple:
+        """
+        Combine chunk overviews with the model, hierarchically.
+
+        Digests are grouped to fit the token budget and each group is
+        reduced to one digest, until a single group remains. If the model
+        output cannot be parsed, the deterministic merge is kept.
+
+        Returns:
+            Tuple of (overview dict, number of reduce rounds)
+        """
+        levels = 0
+        while True:
+            groups = []
+            for digest in digests:
+                size = estimate_tokens(json.dumps(digest, ensure_ascii=False))
+                if groups and groups[-1][1] + size <= context_tokens:
+                    groups[-1][0].append(digest)
+                    groups[-1][1] += size
+                else:
+                    groups.append([[digest], size])
+
+            # Always make progress: merge at least pairs
+            if len(groups) == len(digests) and len(digests) > 1:
+                groups = [[digests[i:i + 2], 0] for i in range(0, len(digests), 2)]
+
+            reduced = []
+            for group, _ in groups:
+                if len(group) == 1 and levels > 0:
+                    reduced.append(group[0])
+                    continue
+                try:
+                    overview = self._generate(
+                        self._create_reduce_prompt(group),
+                        {"kind": "reduce", "digests": group},
+                        stats
+                    )
+                    if "raw_response" in overview:
+                        raise ValueError("unparseable reduce response")
+                except Exception as e:
+                    logger.warning(f"Reduce step failed, keeping merged chunk overviews: {e}")
+                    overview = merge_summaries(group)
+                reduced.append({
+                    "executive_summary": overview.get("executive_summary"),
+                    "key_topics": overview.get("key_topics") or [],
+                    "next_meeting": overview.get("next_meeting"),
+                })
+
+            levels += 1
+            digests = reduced
+            if len(digests) == 1:
+                return digests[0], levels
+
     def _empty_summary(self) -> Dict[str, Any]:
         """Return empty summary structure."""
         return {
@@ -470,4 +838,7 @@ def summarize_meeting(
         Summary dict
     """
     summarizer = MeetingSummarizer()
-    return summarizer.summarize(transcript)
+    try:
+        return summarizer.summarize(transcript)
+    finally:
+        summarizer.close()
@@ -2,20 +2,122 @@
 Enhanced transcription module using faster-whisper with GPU support.
 """
 import logging
+import os
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 import time
 
-import torch
-from faster_whisper import WhisperModel
+import numpy as np
 
+from .models import get_registry
 from .utils.config import get_config
-from .utils.audio import load_audio_as_wav, get_audio_duration
+from .utils.audio import DecodedAudio, detect_silence_blocks, ensure_decoded, iter_audio_blocks, plan_segments
 
 
 logger = logging.getLogger(__name__)
 
 
+def _segment_to_dict(seg, word_timestamps: bool, offset: float = 0.0) -> Dict:
+    """Convert a faster-whisper segment to a dict, shifting times by offset."""
+    segment_data = {
+        "start": seg.start + offset,
+        "end": seg.end + offset,
+        "text": seg.text.strip()
+    }
+
+    # Add word timestamps if available
+    if word_timestamps and getattr(seg, 'words', None) is not None:
+        segment_data["words"] = [
+            {
+                "start": w.start + offset,
+                "end": w.end + offset,
+                "word": w.word,
+                "probability": w.probability
+            }
+            for w in seg.words
+        ]
+
+    return segment_data
+
+
+def _stitch_chunks(chunk_segments: List[List[Dict]], owned: List[Tuple[float, float]]) -> List[Dict]:
+    """
+    Merge per-chunk segments into one globally ordered list.
+
+    A segment is kept only by the chunk whose owned range contains its
+    midpoint, which drops the copies transcribed twice in the overlaps.
+    Identical neighbouring segments that still overlap are de-duplicated.
+
+    Args:
+        chunk_segments: Segments of each chunk, in global time
+        owned: (start, end) seconds owned by each chunk
+
+    Returns:
+        Stitched list of segments
+    """
+    stitched = []
+    last_end = owned[-1][1] if owned else 0.0
+
+    for segments, (own_start, own_end) in zip(chunk_segments, owned):
+        for seg in sorted(segments, key=lambda s: s["start"]):
+            mid = (seg["start"] + seg["end"]) / 2
+            if not (own_start <= mid < own_end or (own_end == last_end and mid >= own_end)):
+                continue
+
+            if stitched:
+                prev = stitched[-1]
+                overlap = min(prev["end"], seg["end"]) - max(prev["start"], seg["start"])
+                shortest = min(prev["end"] - prev["start"], seg["end"] - seg["start"])
+                if overlap > 0.5 * shortest and prev["text"].lower() == seg["text"].lower():
+                    continue
+
+            stitched.append(seg)
+
+    return stitched
+
+
+# Per-process model for parallel transcription workers
+_worker_model = None
+
+
+def _init_parallel_worker(model_size: str, device: str, compute_type: str, cpu_threads: int):
+    """Load the Whisper model once in each worker process."""
+    from faster_whisper import WhisperModel
+
+    global _worker_model
+    _worker_model = get_registry().acquire(
+        ('whisper', model_size, device, compute_type, cpu_threads),
+        lambda: WhisperModel(
+            model_size,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=1
+        )
+    )
+
+
+def _transcribe_chunk(
+    chunk: Union[np.ndarray, Tuple[str, int, int]],
+    offset: float,
+    decode_options: Dict[str, Any]
+) -> Tuple[List[Dict], str, float]:
+    """
+    Transcribe one chunk in a worker process; timestamps are shifted by offset.
+
+    chunk is either the samples or a (pcm_path, start, end) span of a PCM
+    cache file, which the worker maps itself instead of receiving a copy.
+    """
+    if isinstance(chunk, tuple):
+        pcm_path, start, end = chunk
+        samples = np.memmap(pcm_path, dtype=np.float32, mode='r', offset=start * 4, shape=(end - start,))
+    else:
+        samples = chunk
+    segments_gen, info = _worker_model.transcribe(samples, **decode_options)
+    segments = [_segment_to_dict(seg, decode_options.get("word_timestamps", True), offset) for seg in segments_gen]
+    return segments, info.language, info.language_probability
+
+
 class EnhancedTranscriber:
     """
     High-accuracy Indonesian speech transcriber using Whisper.
@@ -37,123 +139,149 @@ class EnhancedTranscriber:
         """
         self.config = get_config(config_path)
         self.model = None
-        self._load_model()
+        self.model_key = None
+        self.batched_pipeline = None
 
     def _load_model(self):
-        """Load Whisper model with optimal settings."""
+        """Fetch the Whisper model from the registry, loading it on first use."""
         model_size = self.config.get('transcription', 'model')
         device = self.config.get('transcription', 'device')
         compute_type = self.config.get('transcription', 'compute_type')
 
-        logger.info(f"Loading Whisper model: {model_size}")
-        logger.info(f"Device: {device.upper()}, Compute type: {compute_type}")
+        def load():
+            from faster_whisper import WhisperModel
 
-        self.model = WhisperModel(
-            model_size,
-            device=device,
-            compute_type=compute_type
-        )
+            logger.info(f"Loading Whisper model: {model_size}")
+            logger.info(f"Device: {device.upper()}, Compute type: {compute_type}")
+
+            model = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type
+            )
+
+            # Log device info
+            if device == 'cuda':
+                import torch
+                gpu_name = torch.cuda.get_device_name(0)
+                logger.info(f"GPU: {gpu_name}")
+            elif device == 'mps':
+                logger.info("Apple Silicon GPU acceleration enabled")
+
+            return model
+
+        self.model_key = ('whisper', model_size, device, compute_type)
+        self.model = get_registry().acquire(self.model_key, load)
+
+    def close(self):
+        """Release the model reference held by this transcriber."""
+        if self.model_key is not None:
+            get_registry().release(self.model_key)
+        self.model = None
+        self.model_key = None
+        self.batched_pipeline = None
 
-        # Log device info
-        if device == 'cuda':
-            gpu_name = torch.cuda.get_device_name(0)
-            logger.info(f"GPU: {gpu_name}")
-        elif device == 'mps':
-            logger.info("Apple Silicon GPU acceleration enabled")
+    def _get_batched_pipeline(self):
+        """Lazy-create the batched inference pipeline around the loaded model."""
+        if self.batched_pipeline is None:
+            from faster_whisper import BatchedInferencePipeline
+
+            self.batched_pipeline = BatchedInferencePipeline(model=self.model)
+        return self.batched_pipeline
 
     def transcribe(
         self,
-        audio_path: str,
+        audio: Union[str, DecodedAudio],
         language: str = "id",
         beam_size: Optional[int] = None,
         vad_filter: Optional[bool] = None,
         word_timestamps: bool = True,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        silences: Optional[List[Tuple[int, int]]] = None
     ) -> Tuple[List[Dict], Dict[str, Any]]:
         """
-        Transcribe audio file with timestamps.
+        Transcribe audio with timestamps.
 
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file or already decoded audio
             language: Language code (default: 'id' for Indonesian)
             beam_size: Beam size for decoding (default from config)
             vad_filter: Enable VAD to skip silence (default from config)
             word_timestamps: Include word-level timestamps
             progress_callback: Optional callback for progress updates
+            silences: Precomputed find_silences() result for parallel mode
 
         Returns:
             Tuple of (segments, info) where:
                 - segments: List of segment dicts with start, end, text
                 - info: Dict with metadata (language, duration, etc.)
         """
-        if not self.model:
-            self._load_model()
-
-        if not Path(audio_path).exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
-
         # Get parameters from config if not specified
         if beam_size is None:
             beam_size = self.config.get('transcription', 'beam_size')
         if vad_filter is None:
             vad_filter = self.config.get('transcription', 'vad', 'enabled')
+        mode = self.config.get('transcription', 'mode', default='sequential')
 
-        # Get audio duration
-        duration = get_audio_duration(audio_path)
+        # Decode once; faster-whisper consumes the in-memory samples directly
+        decoded = ensure_decoded(audio, cache_dir=self.config.get_pcm_cache_dir())
+        duration = decoded.duration
 
-        logger.info(f"Transcribing: {audio_path}")
+        logger.info(f"Transcribing: {decoded.path or 'in-memory audio'}")
         logger.info(f"Duration: {duration:.2f}s")
         logger.info(f"Language: {language} (enforced)")
         logger.info(f"VAD: {('enabled' if vad_filter else 'disabled')}")
         logger.info(f"Beam size: {beam_size}")
+        logger.info(f"Mode: {mode}")
 
         start_time = time.time()
 
         # Prepare VAD parameters
-        vad_params = None
-        if vad_filter:
-            vad_params = {
-                "min_speech_duration_ms": self.config.get('transcription', 'vad', 'min_speech_duration_ms'),
-                "min_silence_duration_ms": self.config.get('transcription', 'vad', 'min_silence_duration_ms'),
-                "speech_pad_ms": self.config.get('transcription', 'vad', 'speech_pad_ms'),
-            }
-
-        # Transcribe
-        segments_gen, info = self.model.transcribe(
-            audio_path,
-            language=language,
-            beam_size=beam_size,
-            vad_filter=vad_filter,
-            vad_parameters=vad_params,
-            word_timestamps=word_timestamps
-        )
-
-        # Collect segments
-        segments = []
-        for seg in segments_gen:
-            segment_data = {
-                "start": seg.start,
-                "end": seg.end,
-                "text": seg.text.strip()
-            }
-
-            # Add word timestamps if available
-            if word_timestamps and hasattr(seg, 'words'):
-                segment_data["words"] = [
-                    {
-                        "start": w.start,
-                        "end": w.end,
-                        "word": w.word,
-                        "probability": w.probability
-                    }
-                    for w in seg.words
-                ]
-
-            segments.append(segment_data)
+        vad_params = self._vad_parameters() if vad_filter else None
+
+        decode_options = {
+            "language": language,
+            "beam_size": beam_size,
+            "vad_filter": vad_filter,
+            "vad_parameters": vad_params,
+            "word_timestamps": word_timestamps,
+        }
 
-            if progress_callback:
-                progress = min(seg.end / duration * 100, 100)
-                progress_callback(progress)
+        if mode == "parallel":
+            segments, detected_language, language_probability = self._transcribe_parallel(
+                decoded, decode_options, progress_callback, silences
+            )
+
+        elif mode in ("sequential", "batched"):
+            if not self.model:
+                self._load_model()
+
+            # Transcribe
+            if mode == "batched":
+                batch_size = self.config.get('transcription', 'batch_size', default=16)
+                logger.info(f"Batch size: {batch_size}")
+                segments_gen, info = self._get_batched_pipeline().transcribe(
+                    decoded.samples,
+                    batch_size=batch_size,
+                    **decode_options
+                )
+            else:
+                segments_gen, info = self.model.transcribe(decoded.samples, **decode_options)
+
+            # Collect segments
+            segments = []
+            for seg in segments_gen:
+                segments.append(_segment_to_dict(seg, word_timestamps))
+
+                if progress_callback:
+                    progress = min(seg.end / duration * 100, 100)
+                    progress_callback(progress)
+
+            detected_language = info.language
+            language_probability = info.language_probability
+
+        else:
+            raise ValueError(f"Unknown transcription mode: {mode}")
 
         elapsed = time.time() - start_time
         real_time_factor = elapsed / duration if duration > 0 else 0
@@ -163,8 +291,8 @@ class EnhancedTranscriber:
 
         # Prepare info dict
         info_dict = {
-            "language": info.language,
-            "language_probability": info.language_probability,
+            "language": detected_language,
+            "language_probability": language_probability,
             "duration": duration,
             "num_segments": len(segments),
             "processing_time": elapsed,
@@ -173,9 +301,158 @@ class EnhancedTranscriber:
 
         return segments, info_dict
 
+    def _vad_parameters(self) -> Dict[str, Any]:
+        """VAD options from config."""
+        return {
+            "min_speech_duration_ms": self.config.get('transcription', 'vad', 'min_speech_duration_ms'),
+            "min_silence_duration_ms": self.config.get('transcription', 'vad', 'min_silence_duration_ms'),
+            "speech_pad_ms": self.config.get('transcription', 'vad', 'speech_pad_ms'),
+        }
+
+    def find_silences(self, audio: Union[str, DecodedAudio]) -> List[Tuple[int, int]]:
+        """
+        Find non-speech spans using the configured VAD parameters.
+
+        Args:
+            audio: Path to audio file or already decoded audio
+
+        Returns:
+            Sorted list of (start, end) sample ranges without speech
+        """
+        decoded = ensure_decoded(audio, cache_dir=self.config.get_pcm_cache_dir())
+        vad_params = self._vad_parameters() if self.config.get('transcription', 'vad', 'enabled') else None
+        return self._find_split_silences(decoded, vad_params)
+
+    def _find_split_silences(self, decoded: DecodedAudio, vad_parameters: Optional[Dict]) -> List[Tuple[int, int]]:
+        """
+        Find non-speech spans to cut the audio at for parallel transcription.
+
+        Uses faster-whisper's Silero VAD, falling back to energy-based
+        silence detection if it is unavailable.
+
+        Args:
+            decoded: Decoded audio
+            vad_parameters: VAD options from config (or None for defaults)
+
+        Returns:
+            Sorted list of (start, end) sample ranges without speech
+        """
+        try:
+            from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+            speech = get_speech_timestamps(np.asarray(decoded.samples), VadOptions(**(vad_parameters or {})))
+            bounds = [0] + [t for ts in speech for t in (ts["start"], ts["end"])] + [len(decoded)]
+            return [(s, e) for s, e in zip(bounds[0::2], bounds[1::2]) if e > s]
+
+        except Exception as e:
+            logger.warning(f"VAD unavailable for split planning ({e}), using silence detection")
+            return detect_silence_blocks(
+                iter_audio_blocks(decoded, decoded.sample_rate),
+                decoded.sample_rate,
+                min_duration=0.3,
+                return_samples=True
+            )
+
+    def _transcribe_parallel(
+        self,
+        decoded: DecodedAudio,
+        decode_options: Dict[str, Any],
+        progress_callback: Optional[callable] = None,
+        silences: Optional[List[Tuple[int, int]]] = None
+    ) -> Tuple[List[Dict], str, float]:
+        """
+        Transcribe chunks cut at silences across a pool of worker processes.
+
+        Each worker loads its own WhisperModel with cpu_threads threads.
+        Chunks are padded with a small overlap, and the results are stitched
+        back by keeping each segment only in the chunk that owns its midpoint.
+        Timestamps are shifted to global time.
+
+        Workers map their chunk from the PCM cache file when the audio has
+        one; otherwise chunks are copied to them, with at most two per
+        worker in flight.
+
+        Args:
+            decoded: Decoded audio
+            decode_options: Keyword arguments for WhisperModel.transcribe
+            progress_callback: Optional callback for progress updates
+            silences: Precomputed non-speech spans (found with VAD if None)
+
+        Returns:
+            Tuple of (segments, language, language_probability)
+        """
+        import multiprocessing
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        sample_rate = decoded.sample_rate
+        chunk_duration = self.config.get('transcription', 'parallel', 'chunk_duration_sec', default=120.0)
+        search_window = self.config.get('transcription', 'parallel', 'search_window_sec', default=15.0)
+        overlap = self.config.get('transcription', 'parallel', 'overlap_sec', default=1.0)
+        cpu_threads = self.config.get('transcription', 'parallel', 'cpu_threads', default=4)
+        workers = self.config.get('transcription', 'parallel', 'workers', default=0)
+        if not workers:
+            workers = max(1, (os.cpu_count() or 1) // cpu_threads)
+
+        if silences is None:
+            silences = self._find_split_silences(decoded, decode_options.get("vad_parameters"))
+        plan = plan_segments(len(decoded), silences, sample_rate, chunk_duration, search_window)
+        workers = min(workers, len(plan))
+        overlap_size = int(overlap * sample_rate)
+
+        logger.info(f"Parallel transcription: {len(plan)} chunks, {workers} workers x {cpu_threads} threads")
+
+        results = [None] * len(plan)
+        done_samples = 0
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_parallel_worker,
+            initargs=(
+                self.config.get('transcription', 'model'),
+                self.config.get('transcription', 'device'),
+                self.config.get('transcription', 'compute_type'),
+                cpu_threads,
+            )
+        ) as pool:
+            pending = {}
+            next_chunk = 0
+            max_in_flight = 2 * workers
+
+            while next_chunk < len(plan) or pending:
+                # Keep every worker busy without queueing the whole recording
+                while next_chunk < len(plan) and len(pending) < max_in_flight:
+                    start, end = plan[next_chunk]
+                    s = max(0, start - overlap_size)
+                    e = min(len(decoded), end + overlap_size)
+                    if decoded.pcm_path is not None:
+                        chunk = (decoded.pcm_path, s, e)
+                    else:
+                        chunk = np.ascontiguousarray(decoded.samples[s:e])
+                    pending[pool.submit(_transcribe_chunk, chunk, s / sample_rate, decode_options)] = next_chunk
+                    next_chunk += 1
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    results[i] = future.result()
+                    done_samples += plan[i][1] - plan[i][0]
+
+                    if progress_callback:
+                        progress_callback(min(done_samples / max(len(decoded), 1) * 100, 100))
+
+        owned = [(start / sample_rate, end / sample_rate) for start, end in plan]
+        segments = _stitch_chunks([r[0] for r in results], owned)
+
+        voiced = [r for r in results if r[0]] or results
+        language = voiced[0][1]
+        language_probability = float(np.mean([r[2] for r in voiced]))
+
+        return segments, language, language_probability
+
     def transcribe_with_speakers(
         self,
-        audio_path: str,
+        audio: Union[str, DecodedAudio],
         num_speakers: Optional[int] = None,
         language: str = "id",
         progress_callback: Optional[callable] = None
@@ -187,7 +464,7 @@ class EnhancedTranscriber:
         output for downstream speaker diarization.
 
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file or already decoded audio
             num_speakers: Expected number of speakers (optional)
             language: Language code
             progress_callback: Optional progress callback
@@ -196,7 +473,7 @@ class EnhancedTranscriber:
             Tuple of (segments, info) for diarization
         """
         segments, info = self.transcribe(
-            audio_path,
+            audio,
             language=language,
             progress_callback=progress_callback
         )
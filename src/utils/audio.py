@@ -4,83 +4,636 @@ Audio processing utilities for transcription system.
 import numpy as np
 import tempfile
 import os
+import hashlib
+import subprocess
 from pathlib import Path
-from typing import Tuple, Optional
-from pydub import AudioSegment
-import soundfile as sf
+from typing import Iterable, Iterator, List, Tuple, Optional, Union
 
 
-def load_audio_as_wav(audio_path: str, sample_rate: int = 16000) -> np.ndarray:
+# Bump when the decoded PCM layout changes to invalidate old cache entries
+PCM_CACHE_VERSION = 1
+
+
+class DecodedAudio:
     """
-    Load any audio file and convert to mono WAV numpy array.
+    Decoded mono PCM audio shared across pipeline stages.
+
+    The samples are decoded once and passed by reference to transcription,
+    diarization and speaker identification, so no stage decodes the source
+    file again.
+    """
+
+    def __init__(
+        self,
+        samples: np.ndarray,
+        sample_rate: int = 16000,
+        path: Optional[str] = None,
+        pcm_path: Optional[str] = None
+    ):
+        """
+        Initialize decoded audio.
+
+        Args:
+            samples: Mono float32 samples in [-1, 1]
+            sample_rate: Sample rate of the samples
+            path: Source file path (if decoded from a file)
+            pcm_path: Raw float32 file the samples are mapped from (a PCM
+                      cache entry), so other processes can map it too
+        """
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.path = path
+        self.pcm_path = pcm_path
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return len(self.samples) / self.sample_rate
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __repr__(self) -> str:
+        return f"DecodedAudio(path={self.path!r}, sample_rate={self.sample_rate}, duration={self.duration:.2f}s)"
+
+
+def audio_cache_key(audio_path: str, sample_rate: int = 16000) -> str:
+    """
+    Compute the PCM cache key for an audio file.
+
+    The key covers the source file contents and the resample parameters,
+    so renamed or copied recordings still hit the same entry.
+
+    Args:
+        audio_path: Path to audio file
+        sample_rate: Target sample rate
+
+    Returns:
+        Hex digest identifying the decoded PCM
+    """
+    digest = hashlib.sha256()
+    with open(audio_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(f"f32le:mono:{sample_rate}:v{PCM_CACHE_VERSION}".encode())
+    return digest.hexdigest()
+
+
+def _pcm_cache_path(cache_dir: str, key: str) -> Path:
+    """Path of a cached raw float32 PCM file."""
+    return Path(cache_dir) / f"{key}.f32"
+
+
+def _open_pcm_cache(cache_path: Path) -> np.ndarray:
+    """Memory-map a cached PCM file read-only."""
+    if cache_path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(cache_path, dtype=np.float32, mode='r')
+
+
+def _ffmpeg_pcm_command(audio_path: str, sample_rate: int) -> list:
+    """ffmpeg command that writes mono float32 PCM to stdout."""
+    return [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", str(audio_path),
+        "-f", "f32le", "-acodec", "pcm_f32le",
+        "-ac", "1", "-ar", str(sample_rate),
+        "-",
+    ]
+
+
+def decode_audio(
+    audio_path: str,
+    sample_rate: int = 16000,
+    cache_dir: Optional[str] = None
+) -> DecodedAudio:
+    """
+    Decode any audio file to mono float32 PCM with a single ffmpeg pass.
+
+    ffmpeg resamples, downmixes and writes raw float32 samples to a pipe,
+    which is copied to disk in fixed-size blocks and memory-mapped, so
+    peak memory does not grow with the recording length. With a cache
+    directory the file is the PCM cache entry, and reruns skip decoding;
+    otherwise it is a temporary file removed once mapped.
 
     Args:
         audio_path: Path to audio file (mp3, m4a, wav, etc.)
         sample_rate: Target sample rate (default 16000 for Whisper)
+        cache_dir: Optional directory for the decoded PCM cache
 
     Returns:
-        Audio data as float32 numpy array
+        DecodedAudio with the samples, sample rate and source path
     """
-    audio = AudioSegment.from_file(audio_path)
-    audio = audio.set_frame_rate(sample_rate).set_channels(1).set_sample_width(2)
+    if not Path(audio_path).exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    cache_path = None
+    if cache_dir:
+        cache_path = _pcm_cache_path(cache_dir, audio_cache_key(audio_path, sample_rate))
+        if cache_path.exists():
+            return DecodedAudio(
+                _open_pcm_cache(cache_path), sample_rate=sample_rate, path=str(audio_path), pcm_path=str(cache_path)
+            )
+
+    if cache_path is not None:
+        _decode_to_file(audio_path, sample_rate, cache_path)
+        return DecodedAudio(
+            _open_pcm_cache(cache_path), sample_rate=sample_rate, path=str(audio_path), pcm_path=str(cache_path)
+        )
+
+    fd, tmp_name = tempfile.mkstemp(suffix='.f32')
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        _decode_to_file(audio_path, sample_rate, tmp_path)
+        samples = _open_pcm_cache(tmp_path)
+    finally:
+        # The mapping stays valid after unlink on POSIX; Windows keeps the
+        # file until the mapping is released
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+    return DecodedAudio(samples, sample_rate=sample_rate, path=str(audio_path))
+
+
+def _decode_to_file(audio_path: str, sample_rate: int, path: Path, block_duration: float = 60.0):
+    """Stream ffmpeg's PCM output into path, one block at a time."""
+    block_size = int(block_duration * sample_rate)
+    for _ in _iter_ffmpeg_blocks(audio_path, sample_rate, block_size, block_size, path):
+        pass
+
+
+def ensure_decoded(
+    audio: Union[str, DecodedAudio],
+    sample_rate: int = 16000,
+    cache_dir: Optional[str] = None
+) -> DecodedAudio:
+    """
+    Return decoded audio, decoding from path only if needed.
+
+    Args:
+        audio: Audio file path or already decoded audio
+        sample_rate: Target sample rate when decoding from path
+        cache_dir: Optional directory for the decoded PCM cache
+
+    Returns:
+        DecodedAudio instance
+    """
+    if isinstance(audio, DecodedAudio):
+        if audio.sample_rate != sample_rate:
+            raise ValueError(
+                f"Decoded audio has sample rate {audio.sample_rate}, expected {sample_rate}"
+            )
+        return audio
+    return decode_audio(audio, sample_rate=sample_rate, cache_dir=cache_dir)
+
+
+def _iter_array_blocks(
+    samples: np.ndarray,
+    block_size: int,
+    step: int
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield overlapping views of an in-memory (or memory-mapped) array."""
+    for start in range(0, len(samples), step):
+        yield start, samples[start:start + block_size]
+        if start + block_size >= len(samples):
+            break
 
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        audio.export(tmp.name, format="wav")
-        wav_data, sr = sf.read(tmp.name)
-        os.unlink(tmp.name)
 
-    return wav_data.astype(np.float32)
+def _iter_ffmpeg_blocks(
+    audio_path: str,
+    sample_rate: int,
+    block_size: int,
+    step: int,
+    cache_path: Optional[Path] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield overlapping blocks read from an ffmpeg pipe.
+
+    Only one block plus its overlap is held in memory. If cache_path is
+    given, the decoded samples are teed into the PCM cache and the entry is
+    committed once the stream has been fully consumed.
+    """
+    # stderr goes to a file: a pipe nobody reads could fill up and stall ffmpeg
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(
+            _ffmpeg_pcm_command(audio_path, sample_rate),
+            stdout=subprocess.PIPE,
+            stderr=stderr_file
+        )
+    except FileNotFoundError:
+        stderr_file.close()
+        raise RuntimeError("ffmpeg not found. Install it with: brew install ffmpeg / apt install ffmpeg")
+
+    tmp_path = None
+    cache_file = None
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        cache_file = open(tmp_path, 'wb')
+
+    completed = False
+    try:
+        buffer = np.zeros(0, dtype=np.float32)
+        start = 0
+
+        while True:
+            data = proc.stdout.read((block_size - len(buffer)) * 4)
+            data = data[:len(data) - len(data) % 4]
+            chunk = np.frombuffer(data, dtype=np.float32)
+
+            if cache_file is not None:
+                cache_file.write(data)
+
+            if len(chunk) == 0 and (start > 0 or len(buffer) == 0):
+                # Overlap tail was already part of the previous block
+                break
+
+            buffer = np.concatenate([buffer, chunk]) if len(buffer) else chunk
+            yield start, buffer
+
+            if len(buffer) < block_size:
+                break
+
+            buffer = buffer[step:]
+            start += step
+
+        if proc.wait() != 0:
+            stderr_file.seek(0)
+            message = stderr_file.read()[-2000:].decode(errors='ignore').strip()
+            raise RuntimeError(f"Failed to decode {audio_path}: {message or f'ffmpeg exit code {proc.returncode}'}")
+        completed = True
+
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        stderr_file.close()
+        if cache_file is not None:
+            cache_file.close()
+            if completed:
+                os.replace(tmp_path, cache_path)
+            elif tmp_path.exists():
+                tmp_path.unlink()
+
+
+def iter_audio_blocks(
+    audio: Union[str, DecodedAudio],
+    sample_rate: int = 16000,
+    block_duration: float = 60.0,
+    overlap: float = 0.0,
+    cache_dir: Optional[str] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Iterate over fixed-size float32 blocks of audio.
+
+    Peak memory is bounded by the block size regardless of recording length:
+    decoded audio and cached PCM yield views, files are streamed from an
+    ffmpeg pipe. Consecutive blocks share `overlap` seconds so sliding
+    windows that straddle a block boundary are seen whole in the next block.
+
+    Args:
+        audio: Audio file path or already decoded audio
+        sample_rate: Target sample rate when decoding from path
+        block_duration: Block length in seconds
+        overlap: Overlap between consecutive blocks in seconds
+        cache_dir: Optional PCM cache directory (hit is memory-mapped,
+                   miss is filled while streaming)
+
+    Yields:
+        Tuples of (start_sample, block) where start_sample is the global
+        index of the first sample in the block
+    """
+    block_size = int(block_duration * sample_rate)
+    overlap_size = int(overlap * sample_rate)
+    if block_size <= 0 or not 0 <= overlap_size < block_size:
+        raise ValueError(
+            f"Invalid block_duration={block_duration} / overlap={overlap}: "
+            f"overlap must be non-negative and shorter than the block"
+        )
+    step = block_size - overlap_size
+
+    if isinstance(audio, DecodedAudio):
+        yield from _iter_array_blocks(ensure_decoded(audio, sample_rate).samples, block_size, step)
+        return
+
+    if not Path(audio).exists():
+        raise FileNotFoundError(f"Audio file not found: {audio}")
+
+    cache_path = None
+    if cache_dir:
+        cache_path = _pcm_cache_path(cache_dir, audio_cache_key(audio, sample_rate))
+        if cache_path.exists():
+            yield from _iter_array_blocks(_open_pcm_cache(cache_path), block_size, step)
+            return
+
+    yield from _iter_ffmpeg_blocks(audio, sample_rate, block_size, step, cache_path)
 
 
-def get_audio_duration(audio_path: str) -> float:
+def load_audio_as_wav(
+    audio_path: str,
+    sample_rate: int = 16000,
+    cache_dir: Optional[str] = None
+) -> np.ndarray:
     """
-    Get audio file duration in seconds.
+    Load any audio file and convert to mono WAV numpy array.
 
     Args:
-        audio_path: Path to audio file
+        audio_path: Path to audio file (mp3, m4a, wav, etc.)
+        sample_rate: Target sample rate (default 16000 for Whisper)
+        cache_dir: Optional PCM cache directory; cached audio is memory-mapped
+
+    Returns:
+        Audio data as float32 numpy array (read-only memmap on cache hit)
+    """
+    return decode_audio(audio_path, sample_rate=sample_rate, cache_dir=cache_dir).samples
+
+
+def get_audio_duration(audio: Union[str, DecodedAudio]) -> float:
+    """
+    Get audio duration in seconds.
+
+    For files, the duration is read from the container with ffprobe
+    instead of decoding the whole stream.
+
+    Args:
+        audio: Path to audio file or decoded audio
 
     Returns:
         Duration in seconds
     """
-    audio = AudioSegment.from_file(audio_path)
-    return len(audio) / 1000.0
+    if isinstance(audio, DecodedAudio):
+        return audio.duration
+
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(audio),
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=True, text=True)
+        return float(result.stdout.strip())
+    except (FileNotFoundError, subprocess.CalledProcessError, ValueError):
+        # Container without duration metadata: fall back to a full decode
+        return decode_audio(audio).duration
+
+
+def amplitude_envelope(audio: np.ndarray, power: int = 1) -> np.ndarray:
+    """
+    Compute a cumulative amplitude envelope.
+
+    envelope[i] is the sum of |audio[:i]| ** power, so the mean amplitude
+    (power=1) or mean energy (power=2) of any span [s, e) is
+    (envelope[e] - envelope[s]) / (e - s). One envelope answers every
+    window and frame query in a single vectorised operation.
+
+    Args:
+        audio: Audio data as numpy array
+        power: 1 for absolute amplitude, 2 for energy
+
+    Returns:
+        float64 array of length len(audio) + 1
+    """
+    magnitude = np.abs(audio).astype(np.float64)
+    if power != 1:
+        magnitude **= power
+    envelope = np.empty(len(audio) + 1, dtype=np.float64)
+    envelope[0] = 0.0
+    np.cumsum(magnitude, out=envelope[1:])
+    return envelope
+
+
+def sliding_windows(
+    n_samples: int,
+    window_size: int,
+    hop_size: int,
+    first_start: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute start/end sample indices of every full sliding window.
+
+    Args:
+        n_samples: Number of samples available
+        window_size: Window length in samples
+        hop_size: Hop between window starts in samples
+        first_start: Start index of the first window
+
+    Returns:
+        Tuple of (starts, ends) int64 arrays
+    """
+    starts = np.arange(first_start, n_samples - window_size + 1, hop_size, dtype=np.int64)
+    return starts, starts + window_size
+
+
+def window_mean_amplitude(envelope: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Mean of the enveloped quantity over each [start, end) span.
+
+    Args:
+        envelope: Cumulative envelope from amplitude_envelope()
+        starts: Span start indices
+        ends: Span end indices
+
+    Returns:
+        Array of per-span means
+    """
+    lengths = np.maximum(ends - starts, 1)
+    return (envelope[ends] - envelope[starts]) / lengths
+
+
+def _frame_levels(audio: np.ndarray, frame_size: int, metric: str) -> np.ndarray:
+    """Per-frame mean energy ('rms') or mean amplitude ('mean') via a strided reshape."""
+    n_full = len(audio) // frame_size
+    magnitude = np.square(audio) if metric == 'rms' else np.abs(audio)
+    level = magnitude[:n_full * frame_size].reshape(n_full, frame_size).mean(axis=1, dtype=np.float64)
+    if n_full * frame_size < len(audio):
+        level = np.append(level, magnitude[n_full * frame_size:].mean(dtype=np.float64))
+    return level
+
+
+def _frame_silence_mask(
+    envelope: Optional[np.ndarray],
+    audio: np.ndarray,
+    frame_size: int,
+    threshold: float,
+    metric: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-frame silence mask and frame start indices."""
+    if metric not in ('rms', 'mean'):
+        raise ValueError(f"Unknown silence metric: {metric}")
+
+    starts = np.arange(0, len(audio), frame_size, dtype=np.int64)
+    if envelope is not None:
+        ends = np.minimum(starts + frame_size, len(audio))
+        level = window_mean_amplitude(envelope, starts, ends)
+    else:
+        level = _frame_levels(audio, frame_size, metric)
+
+    if metric == 'rms':
+        level = np.sqrt(level)
+    return level < threshold, starts
+
+
+def _silent_runs(is_silent: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run-length encode a boolean mask.
+
+    Returns:
+        Tuple of (run_starts, run_ends) frame indices, end exclusive
+    """
+    edges = np.diff(np.concatenate(([False], is_silent, [False])).astype(np.int8))
+    changes = np.flatnonzero(edges)
+    return changes[0::2], changes[1::2]
+
+
+def _format_silence(starts: np.ndarray, ends: np.ndarray, sample_rate: int, return_samples: bool) -> list:
+    """Convert sample index runs to the public (start, end) list."""
+    if return_samples:
+        return [(int(s), int(e)) for s, e in zip(starts, ends)]
+    return [(s / sample_rate, e / sample_rate) for s, e in zip(starts.tolist(), ends.tolist())]
 
 
 def detect_silence(
     audio: np.ndarray,
     sample_rate: int = 16000,
     threshold: float = 0.01,
-    min_duration: float = 0.5
+    min_duration: float = 0.5,
+    frame_duration: float = 0.01,
+    metric: str = 'rms',
+    return_samples: bool = False,
+    envelope: Optional[np.ndarray] = None
 ) -> list:
     """
     Detect silent segments in audio.
 
+    Frames are scored with a strided reshape (or a precomputed cumulative
+    envelope) and silent runs are found with run-length detection on the
+    boolean frame mask, so there is no per-sample Python loop.
+
     Args:
         audio: Audio data as numpy array
         sample_rate: Sample rate
-        threshold: Amplitude threshold for silence
+        threshold: Level threshold for silence
         min_duration: Minimum silence duration in seconds
+        frame_duration: Analysis frame length in seconds
+        metric: 'rms' (frame RMS) or 'mean' (frame mean absolute amplitude)
+        return_samples: Return sample indices instead of seconds
+        envelope: Optional precomputed envelope of audio; must be
+                  amplitude_envelope(audio, power=2) for 'rms' and
+                  amplitude_envelope(audio) for 'mean'
 
     Returns:
-        List of (start, end) tuples for silent segments
+        List of (start, end) tuples for silent segments. Silence running to
+        the end of the audio is not reported.
+    """
+    frame_size = max(1, int(frame_duration * sample_rate))
+    is_silent, frame_starts = _frame_silence_mask(envelope, audio, frame_size, threshold, metric)
+    run_starts, run_ends = _silent_runs(is_silent)
+
+    # A run that reaches the last frame has no closing edge
+    if len(run_ends) and run_ends[-1] == len(is_silent):
+        run_starts, run_ends = run_starts[:-1], run_ends[:-1]
+
+    starts = frame_starts[run_starts]
+    ends = frame_starts[run_ends]
+    keep = ends - starts >= min_duration * sample_rate
+
+    return _format_silence(starts[keep], ends[keep], sample_rate, return_samples)
+
+
+def detect_silence_blocks(
+    blocks: Iterable[Tuple[int, np.ndarray]],
+    sample_rate: int = 16000,
+    threshold: float = 0.01,
+    min_duration: float = 0.5,
+    frame_duration: float = 0.01,
+    metric: str = 'rms',
+    return_samples: bool = False
+) -> list:
     """
-    # Calculate amplitude envelope
-    amplitude = np.abs(audio)
-    is_silent = amplitude < threshold
+    Detect silent segments from a stream of non-overlapping audio blocks.
 
-    silent_segments = []
-    start = None
+    Silence runs are carried across block boundaries, so the result is the
+    same as detect_silence() on the concatenated audio while only one block
+    is in memory. Blocks must be contiguous (iter_audio_blocks with no
+    overlap), and every block but the last a whole number of frames long.
 
-    for i, silent in enumerate(is_silent):
-        if silent and start is None:
-            start = i / sample_rate
-        elif not silent and start is not None:
-            end = i / sample_rate
-            if end - start >= min_duration:
-                silent_segments.append((start, end))
-            start = None
+    Args:
+        blocks: Iterable of (start_sample, block), e.g. from iter_audio_blocks()
+        sample_rate: Sample rate
+        threshold: Level threshold for silence
+        min_duration: Minimum silence duration in seconds
+        frame_duration: Analysis frame length in seconds
+        metric: 'rms' (frame RMS) or 'mean' (frame mean absolute amplitude)
+        return_samples: Return sample indices instead of seconds
 
-    return silent_segments
+    Returns:
+        List of (start, end) tuples for silent segments
+
+    Raises:
+        ValueError: If blocks overlap, leave gaps, or a block before the
+                    last is not a whole number of frames
+    """
+    frame_size = max(1, int(frame_duration * sample_rate))
+    min_samples = min_duration * sample_rate
+
+    all_starts = []
+    all_ends = []
+    open_start = None  # global start of a run still open at the previous block end
+    expected_offset = None
+    previous_length = 0
+
+    for offset, block in blocks:
+        if expected_offset is not None:
+            if offset != expected_offset:
+                raise ValueError(
+                    f"Blocks must be contiguous and non-overlapping: "
+                    f"block at sample {offset}, expected {expected_offset}"
+                )
+            if previous_length % frame_size:
+                raise ValueError(
+                    f"Block of {previous_length} samples before sample {offset} is not a "
+                    f"multiple of the {frame_size}-sample frame"
+                )
+        expected_offset = offset + len(block)
+        previous_length = len(block)
+
+        is_silent, frame_starts = _frame_silence_mask(None, block, frame_size, threshold, metric)
+        run_starts, run_ends = _silent_runs(is_silent)
+
+        starts = offset + frame_starts[run_starts]
+        ends = offset + np.append(frame_starts, len(block))[run_ends]
+
+        if open_start is not None:
+            if len(run_starts) and run_starts[0] == 0:
+                # Run continues into this block
+                starts[0] = open_start
+            else:
+                # Run closed exactly at the block boundary
+                all_starts.append(np.array([open_start]))
+                all_ends.append(np.array([offset]))
+            open_start = None
+
+        if len(run_ends) and run_ends[-1] == len(is_silent):
+            open_start = int(starts[-1])
+            starts, ends = starts[:-1], ends[:-1]
+
+        all_starts.append(starts)
+        all_ends.append(ends)
+
+    if not all_starts:
+        return []
+
+    starts = np.concatenate(all_starts)
+    ends = np.concatenate(all_ends)
+    keep = ends - starts >= min_samples
+
+    return _format_silence(starts[keep], ends[keep], sample_rate, return_samples)
 
 
 def remove_silence(
@@ -101,6 +654,8 @@ def remove_silence(
     Returns:
         Path to processed audio file
     """
+    from pydub import AudioSegment
+
     audio = AudioSegment.from_file(audio_path)
 
     # Split audio on silence
@@ -122,45 +677,90 @@ def remove_silence(
     return output_path
 
 
+def plan_segments(
+    total_samples: int,
+    silences: list,
+    sample_rate: int = 16000,
+    segment_duration: float = 30.0,
+    search_window: float = 5.0
+) -> List[Tuple[int, int]]:
+    """
+    Plan contiguous segments whose boundaries fall inside silences.
+
+    Each cut is placed at the middle of the longest silence within
+    search_window seconds of the ideal cut point, falling back to the ideal
+    point when there is no silence nearby.
+
+    Args:
+        total_samples: Audio length in samples
+        silences: (start, end) sample index pairs of silent or non-speech spans
+        sample_rate: Sample rate
+        segment_duration: Target segment duration in seconds
+        search_window: How far (seconds) a cut may move to reach a silence
+
+    Returns:
+        List of (start, end) sample ranges covering the whole audio
+    """
+    target = int(segment_duration * sample_rate)
+    window = int(search_window * sample_rate)
+
+    if silences:
+        silence_arr = np.asarray(silences, dtype=np.int64)
+        mids = (silence_arr[:, 0] + silence_arr[:, 1]) // 2
+        lengths = silence_arr[:, 1] - silence_arr[:, 0]
+    else:
+        mids = lengths = np.zeros(0, dtype=np.int64)
+
+    cuts = [0]
+    while total_samples - cuts[-1] > target + window:
+        ideal = cuts[-1] + target
+        lo = np.searchsorted(mids, max(ideal - window, cuts[-1] + 1), side='left')
+        hi = np.searchsorted(mids, ideal + window, side='right')
+        if hi > lo:
+            cuts.append(int(mids[lo + np.argmax(lengths[lo:hi])]))
+        else:
+            cuts.append(ideal)
+    cuts.append(total_samples)
+
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
 def segment_audio(
-    audio_path: str,
+    audio: Union[str, DecodedAudio],
     segment_duration: float = 30.0,
-    overlap: float = 5.0
+    overlap: float = 5.0,
+    search_window: float = 5.0
 ) -> list:
     """
-    Segment audio into overlapping chunks.
+    Segment audio into overlapping chunks cut at silence boundaries.
 
     Args:
-        audio_path: Input audio path
-        segment_duration: Duration of each segment in seconds
-        overlap: Overlap between segments in seconds
+        audio: Input audio path or already decoded audio
+        segment_duration: Target duration of each segment in seconds
+        overlap: Overlap with the previous segment in seconds
+        search_window: How far (seconds) a cut may move to reach a silence
 
     Returns:
         List of (start, end, temp_path) tuples
     """
-    audio = AudioSegment.from_file(audio_path)
-    duration = len(audio) / 1000.0
-
-    segments = []
-    start = 0.0
+    import soundfile as sf
 
-    while start < duration:
-        end = min(start + segment_duration, duration)
+    decoded = ensure_decoded(audio)
+    sample_rate = decoded.sample_rate
+    silences = detect_silence_blocks(
+        iter_audio_blocks(decoded, sample_rate), sample_rate, min_duration=0.3, return_samples=True
+    )
+    plan = plan_segments(len(decoded), silences, sample_rate, segment_duration, search_window)
 
-        # Extract segment
-        segment = audio[int(start * 1000):int(end * 1000)]
+    segments = []
+    for start, end in plan:
+        start = max(0, start - int(overlap * sample_rate))
 
         # Save to temp file
         temp_path = tempfile.mktemp(suffix=".wav")
-        segment.export(temp_path, format="wav")
-
-        segments.append((start, end, temp_path))
+        sf.write(temp_path, decoded.samples[start:end], sample_rate)
 
-        start = end - overlap
-
-        # Break if we've covered the whole audio
-        if end >= duration:
-            break
+        segments.append((start / sample_rate, end / sample_rate, temp_path))
 
     return segments
 
@@ -176,6 +776,8 @@ def normalize_audio(audio_path: str, output_path: Optional[str] = None) -> str:
     Returns:
         Path to normalized audio file
     """
+    from pydub import AudioSegment
+
     audio = AudioSegment.from_file(audio_path)
 
     # Normalize to -20 dBFS
@@ -199,6 +801,8 @@ def convert_to_mono(audio_path: str, output_path: Optional[str] = None) -> str:
     Returns:
         Path to mono audio file
     """
+    from pydub import AudioSegment
+
     audio = AudioSegment.from_file(audio_path)
     mono = audio.set_channels(1)
 
@@ -225,6 +829,8 @@ def resample_audio(
     Returns:
         Path to resampled audio file
     """
+    from pydub import AudioSegment
+
     audio = AudioSegment.from_file(audio_path)
     resampled = audio.set_frame_rate(target_sample_rate)
 
@@ -258,6 +864,8 @@ def preprocess_audio(
     if output_path is None:
         output_path = tempfile.mktemp(suffix=".wav")
 
+    from pydub import AudioSegment
+
     audio = AudioSegment.from_file(audio_path)
 
     if to_mono:
@@ -2,6 +2,7 @@
 Configuration loader and manager for the transcription system.
 """
 import os
+import copy
 import yaml
 from pathlib import Path
 from typing import Any, Dict, Optional
@@ -15,6 +16,15 @@ DEFAULT_CONFIG = {
         'compute_type': 'auto',
         'language': 'id',
         'beam_size': 5,
+        'mode': 'sequential',
+        'batch_size': 16,
+        'parallel': {
+            'workers': 0,
+            'cpu_threads': 4,
+            'chunk_duration_sec': 120.0,
+            'search_window_sec': 15.0,
+            'overlap_sec': 1.0,
+        },
         'vad': {
             'enabled': True,
             'min_speech_duration_ms': 500,
@@ -22,23 +32,54 @@ DEFAULT_CONFIG = {
             'speech_pad_ms': 400,
         }
     },
+    'audio': {
+        'sample_rate': 16000,
+        'stream': {
+            'block_duration_sec': 60.0,
+        },
+        'cache': {
+            'enabled': True,
+            'directory': '.cache/pcm',
+        },
+    },
     'diarization': {
         'method': 'hybrid',
+        'resemblyzer': {
+            'chunk_duration_sec': 8.0,
+            'hop_duration_sec': 0.75,
+            'window_duration_sec': 1.5,
+            'amplitude_threshold': 0.005,
+            'batch_size': 64,
+        },
         'clustering': {
+            'algorithm': 'agglomerative',
             'distance_threshold': 0.55,
             'metric': 'cosine',
             'linkage': 'average',
             'min_speakers': 2,
             'max_speakers': 15,
+            'max_direct_samples': 5000,
+            'n_centroids': 500,
+            'silhouette_sample_size': 2000,
         }
     },
     'speaker_identification': {
         'enabled': True,
+        'backend': 'sqlite',
         'database_path': 'speakers/database.json',
+        'store_path': 'speakers/speakers.db',
         'threshold': 0.80,
         'enrollment_min_samples': 3,
         'enrollment_max_samples': 10,
+        'enrollment_workers': 4,
+        'max_profile_centroids': 10,
         'profiles_path': 'speakers/profiles',
+        'index': {
+            'type': 'brute',
+            'min_profiles': 1000,
+            'ivf': {'n_lists': None, 'n_probe': None},
+            'hnsw': {'m': 16, 'ef_construction': 200, 'ef_search': 64},
+        },
     },
     'summarization': {
         'enabled': True,
@@ -48,8 +89,30 @@ DEFAULT_CONFIG = {
             'api_key': None,
             'temperature': 0.3,
             'max_tokens': 2000,
+            'base_url': None,
+            'timeout': 120,
+            'requests_per_minute': 500,
+            'tokens_per_minute': 200000,
+        },
+        'client': {
+            'concurrency': 4,
+            'max_retries': 5,
+            'deadline_sec': 900,
+            'backoff_base_sec': 1.0,
+            'backoff_max_sec': 30.0,
         },
         'language': 'id',
+        'map_reduce': {
+            'context_tokens': 3000,
+            'chunk_tokens': 2500,
+            'concurrency': 2,
+        },
+        'cache': {
+            'enabled': True,
+            'path': '.cache/llm/responses.db',
+            'max_size_mb': 100,
+            'max_age_days': 30,
+        },
     },
     'output': {
         'directory': 'output',
@@ -59,6 +122,17 @@ DEFAULT_CONFIG = {
         'include_summary': True,
         'include_action_items': True,
     },
+    'models': {
+        'idle_timeout_sec': None,
+    },
+    'pipeline': {
+        'artifact_dir': '.cache/artifacts',
+    },
+    'service': {
+        'host': '127.0.0.1',
+        'port': 8765,
+        'workers': 1,
+    },
     'logging': {
         'level': 'INFO',
         'file': None,
@@ -76,14 +150,15 @@ class Config:
         Args:
             config_path: Path to config YAML file. If None, uses default config.
         """
-        self.config = DEFAULT_CONFIG.copy()
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
         self._load_env()
 
         if config_path and os.path.exists(config_path):
             self._load_yaml(config_path)
 
-        # Apply device auto-detection
-        self._apply_device_detection()
+        # Device auto-detection imports torch, so it is deferred until the
+        # transcription device is first read
+        self._device_resolved = False
 
     def _load_env(self):
         """Load environment variables from .env file."""
@@ -115,12 +190,14 @@ class Config:
         Note: faster-whisper doesn't support MPS (Apple Silicon) yet, so we use CPU.
         For MPS support, consider using the original OpenAI Whisper model.
         """
-        import torch
+        self._device_resolved = True
 
         device = self.config['transcription']['device']
         compute_type = self.config['transcription']['compute_type']
 
         if device == 'auto':
+            import torch
+
             if torch.cuda.is_available():
                 device = 'cuda'
                 compute_type = 'float16' if compute_type == 'auto' else compute_type
@@ -148,6 +225,10 @@ class Config:
             config.get('transcription', 'model')
             config.get('diarization', 'clustering', 'metric')
         """
+        if not self._device_resolved and keys and keys[0] == 'transcription' \
+                and (len(keys) == 1 or keys[1] in ['device', 'compute_type']):
+            self._apply_device_detection()
+
         value = self.config
         for key in keys:
             if isinstance(value, dict) and key in value:
@@ -174,6 +255,10 @@ class Config:
             config_ref = config_ref[key]
         config_ref[keys[-1]] = value
 
+        # Re-resolve 'auto' device or compute type on next read
+        if keys and keys[0] == 'transcription':
+            self._device_resolved = False
+
     def get_hf_token(self) -> Optional[str]:
         """Get HuggingFace token from config or environment."""
         token = self.get('diarization', 'pyannote', 'hf_token')
@@ -184,12 +269,19 @@ class Config:
         key = self.get('summarization', 'openai', 'api_key')
         return key or self.env.get('OPENAI_API_KEY')
 
+    def get_pcm_cache_dir(self) -> Optional[str]:
+        """Get decoded PCM cache directory, or None if caching is disabled."""
+        if not self.get('audio', 'cache', 'enabled', default=False):
+            return None
+        return self.get('audio', 'cache', 'directory')
+
     def ensure_directories(self):
         """Create necessary directories if they don't exist."""
         directories = [
             self.get('output', 'directory'),
             self.get('speaker_identification', 'profiles_path'),
             os.path.dirname(self.get('speaker_identification', 'database_path')),
+            self.get_pcm_cache_dir(),
         ]
 
         for directory in directories:
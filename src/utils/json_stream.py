@@ -0,0 +1,113 @@
+"""
+Incremental parsing of a JSON object arriving in pieces.
+
+Used while an LLM streams a JSON summary: each top-level field is decoded
+as soon as its value is complete, long before the closing brace arrives.
+"""
+import json
+from typing import Any, Dict, List, Tuple
+
+
+class IncrementalJSONParser:
+    """
+    Emit the top-level fields of a streamed JSON object as they complete.
+
+    Text before the first '{' (e.g. a ```json fence) is ignored, as is
+    anything after the closing '}'. Fields whose value does not decode are
+    skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = 'key'
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Consume more text.
+
+        Args:
+            text: Next piece of the response
+
+        Returns:
+            List of (key, value) fields completed by this piece
+        """
+        self.buffer += text
+        completed = []
+
+        while self._pos < len(self.buffer) and not self.done:
+            i = self._pos
+            char = self.buffer[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == 'key' and self._key_start is not None:
+                        self._key = self._decode(self._key_start, i + 1)
+                        self._key_start = None
+                        self._state = 'colon'
+                continue
+
+            if self._depth == 0:
+                if char == '{':
+                    self._depth = 1
+                    self._state = 'key'
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == 'key':
+                    self._key_start = i
+            elif char == ':' and self._depth == 1 and self._state == 'colon':
+                self._state = 'value'
+                self._value_start = i + 1
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]' and self._depth > 1:
+                self._depth -= 1
+            elif (char == ',' or char == '}') and self._depth == 1:
+                if self._state == 'value':
+                    field = self._complete(i)
+                    if field is not None:
+                        completed.append(field)
+                self._state = 'key'
+                if char == '}':
+                    self._depth = 0
+                    self.done = True
+
+        return completed
+
+    def _decode(self, start: int, end: int) -> Any:
+        try:
+            return json.loads(self.buffer[start:end])
+        except ValueError:
+            return None
+
+    def _complete(self, end: int):
+        """Decode the value that just ended at end."""
+        text = self.buffer[self._value_start:end].strip()
+        self._value_start = None
+        if self._key is None or not text:
+            return None
+
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return None
+
+        self.fields[self._key] = value
+        return self._key, value
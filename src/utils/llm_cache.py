@@ -0,0 +1,206 @@
+"""
+Content-addressed cache of LLM responses.
+
+Responses are keyed by a hash of everything that determines them: provider,
+model, temperature, prompt template version and the prompt input (e.g. one
+transcript chunk). Summarizing an unchanged transcript again costs no API
+calls, and after editing one part of a long transcript only the chunks
+whose text changed are sent to the model.
+
+Entries live in one SQLite file. Entries unused for max_age_days are
+dropped, and the least recently used entries are evicted once the stored
+responses exceed max_size_mb.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(**parts: Any) -> str:
+    """
+    Hash the inputs that determine an LLM response.
+
+    Args:
+        **parts: JSON-serialisable key parts (provider, model, prompt input, ...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed LLM response cache with age and size eviction.
+
+    Safe to share between threads (each operation opens its own connection)
+    and between processes (SQLite locking).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size_mb: Optional[float] = 100,
+        max_age_days: Optional[float] = 30
+    ):
+        """
+        Open or create the cache.
+
+        Args:
+            path: SQLite file path (parent directory created if missing)
+            max_size_mb: Evict least recently used entries above this size
+                         (None = unbounded)
+            max_age_days: Drop entries not used for this many days
+                          (None = never)
+        """
+        self.path = str(path)
+        self.max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.max_age_sec = max_age_days * 86400 if max_age_days else None
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+        self.evict()
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response.
+
+        Args:
+            key: Key from cache_key()
+
+        Returns:
+            Cached response text, or None
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, accessed_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.max_age_sec is not None and now - row[1] > self.max_age_sec:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute(
+                    "UPDATE responses SET accessed_at = ?, hits = hits + 1 WHERE key = ?",
+                    (now, key)
+                )
+
+        self._count(row is not None)
+        return row[0] if row is not None else None
+
+    def put(self, key: str, response: str):
+        """
+        Store a response, evicting old entries if the cache is over size.
+
+        Args:
+            key: Key from cache_key()
+            response: Response text
+        """
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now)
+            )
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then least recently used ones until under size.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._connect() as conn:
+            if self.max_age_sec is not None:
+                removed += conn.execute(
+                    "DELETE FROM responses WHERE accessed_at < ?",
+                    (time.time() - self.max_age_sec,)
+                ).rowcount
+
+            if self.max_bytes is not None:
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    excess = total - self.max_bytes
+                    stale = []
+                    for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                        stale.append((key,))
+                        excess -= size
+                        if excess <= 0:
+                            break
+                    conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+                    removed += len(stale)
+
+        if removed:
+            logger.info(f"LLM cache: evicted {removed} entries")
+        return removed
+
+    def clear(self):
+        """Remove all entries."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics.
+
+        Returns:
+            Dict with entries, size_mb, hits and misses in this process, and
+            stored_hits (hits recorded on the current entries)
+        """
+        with self._connect() as conn:
+            entries, size, stored_hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM responses"
+            ).fetchone()
+        return {
+            'path': self.path,
+            'entries': entries,
+            'size_mb': round(size / (1024 * 1024), 3),
+            'hits': self.hits,
+            'misses': self.misses,
+            'stored_hits': stored_hits,
+        }
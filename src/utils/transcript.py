@@ -0,0 +1,130 @@
+"""
+Reading and writing speaker-labelled transcript files.
+
+Format:
+    --- SPEAKER_00 ---
+      [00:00 - 00:05] Text...
+"""
+import re
+from pathlib import Path
+from typing import Dict, List
+
+
+def output_base(transcript_path: str) -> str:
+    """
+    Get the output base a transcript file was written for.
+
+    meeting_speakers.txt and meeting_speakers_refined.txt both map to
+    meeting, so meeting_embeddings.npz and meeting_summary.json sit next
+    to them.
+
+    Args:
+        transcript_path: Transcript file path
+
+    Returns:
+        Path without the transcript suffix and extension
+    """
+    path = Path(transcript_path)
+    base = path.stem
+    for suffix in ['_speakers_refined', '_speakers_rediarized', '_speakers']:
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+            break
+    return str(path.with_name(base))
+
+
+def format_time(seconds: float) -> str:
+    """
+    Format seconds as MM:SS, or HH:MM:SS for an hour or more.
+
+    Args:
+        seconds: Time in seconds
+
+    Returns:
+        Formatted timestamp
+    """
+    h = int(seconds // 3600)
+    m = int((seconds % 3600) // 60)
+    s = int(seconds % 60)
+    if h > 0:
+        return f"{h:02d}:{m:02d}:{s:02d}"
+    return f"{m:02d}:{s:02d}"
+
+
+def parse_time(timestamp: str) -> int:
+    """
+    Parse a MM:SS or HH:MM:SS timestamp.
+
+    Args:
+        timestamp: Timestamp string
+
+    Returns:
+        Time in seconds
+    """
+    parts = timestamp.split(":")
+    if len(parts) == 3:
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def parse_transcript(filepath: str) -> List[Dict]:
+    """
+    Parse transcript file into segments.
+
+    Args:
+        filepath: Path to transcript file
+
+    Returns:
+        List of segments with start, end, text and speaker
+    """
+    segments = []
+    current_speaker = None
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            speaker_match = re.match(r'^--- (.+?) ---$', line)
+            if speaker_match:
+                current_speaker = speaker_match.group(1)
+                continue
+
+            seg_match = re.match(r'\s*\[(\d+:\d+(?::\d+)?) - (\d+:\d+(?::\d+)?)\]\s*(.*)', line)
+            if seg_match and current_speaker:
+                start_str, end_str, text = seg_match.groups()
+                segments.append({
+                    'start': parse_time(start_str),
+                    'end': parse_time(end_str),
+                    'text': text.strip(),
+                    'speaker': current_speaker
+                })
+
+    return segments
+
+
+def write_transcript_with_speakers(segments: List[Dict], output_file: str):
+    """
+    Write transcript with speaker labels to file.
+
+    Args:
+        segments: Segments with start, end, text and speaker
+        output_file: Output file path
+    """
+    lines = []
+    prev_speaker = None
+
+    for seg in segments:
+        speaker = seg['speaker']
+        timestamp = f"[{format_time(seg['start'])} - {format_time(seg['end'])}]"
+
+        if speaker != prev_speaker:
+            lines.append("")
+            lines.append(f"--- {speaker} ---")
+            prev_speaker = speaker
+
+        lines.append(f"  {timestamp} {seg['text']}")
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines).strip())
@@ -3,7 +3,7 @@ import json
 import os
 import platform
 import numpy as np
-from faster_whisper import WhisperModel
+from faster_whisper import WhisperModel, BatchedInferencePipeline
 from resemblyzer import VoiceEncoder, preprocess_wav
 from sklearn.cluster import AgglomerativeClustering
 from pydub import AudioSegment
@@ -46,7 +46,7 @@ def load_audio_as_wav(audio_path):
     return wav_data.astype(np.float32)
 
 
-def transcribe_with_speakers(audio_path, model_size="large-v3-turbo", num_speakers=None):
+def transcribe_with_speakers(audio_path, model_size="large-v3-turbo", num_speakers=None, batch_size=None, embeddings_file=None):
     # Step 1: Auto-detect device
     device, compute_type = get_device()
     print(f"[Device Detection]")
@@ -65,8 +65,17 @@ def transcribe_with_speakers(audio_path, model_size="large-v3-turbo", num_speake
     print(f"  Language: Indonesian (enforced)")
     print(f"  Beam size: 5 (optimized for accuracy)")
 
+    # Batched mode decodes many VAD segments per forward pass
+    if batch_size:
+        print(f"  Batched inference: batch size {batch_size}")
+        transcribe_fn = BatchedInferencePipeline(model=model).transcribe
+        batch_kwargs = {"batch_size": batch_size}
+    else:
+        transcribe_fn = model.transcribe
+        batch_kwargs = {}
+
     # Enhanced transcription parameters
-    raw_segments, info = model.transcribe(
+    raw_segments, info = transcribe_fn(
         audio_path,
         beam_size=5,
         language="id",
@@ -76,7 +85,8 @@ def transcribe_with_speakers(audio_path, model_size="large-v3-turbo", num_speake
             "min_silence_duration_ms": 1000,
             "speech_pad_ms": 400
         },
-        word_timestamps=True  # Get word-level timestamps for better diarization
+        word_timestamps=True,  # Get word-level timestamps for better diarization
+        **batch_kwargs
     )
     print(f"  Detected language: '{info.language}' (prob: {info.language_probability:.2f})")
 
@@ -131,15 +141,16 @@ def transcribe_with_speakers(audio_path, model_size="large-v3-turbo", num_speake
     print(f"  Grouped into {len(chunks)} chunks for embedding")
 
     # Get speaker embeddings for each chunk
+    # Chunk bounds as arrays so short chunks are dropped in one pass
+    start_samples = (np.array([c["start"] for c in chunks]) * 16000).astype(np.int64)
+    end_samples = np.minimum((np.array([c["end"] for c in chunks]) * 16000).astype(np.int64), len(wav))
+    keep = np.flatnonzero(end_samples - start_samples >= 1600)  # Skip chunks < 0.1s
+
     embeddings = []
     valid_chunks = []
-    for i, chunk in enumerate(chunks):
-        start_sample = int(chunk["start"] * 16000)
-        end_sample = int(chunk["end"] * 16000)
-        segment_wav = wav[start_sample:min(end_sample, len(wav))]
-
-        if len(segment_wav) < 1600:  # Skip chunks < 0.1s
-            continue
+    for i in keep:
+        chunk = chunks[i]
+        segment_wav = wav[start_samples[i]:end_samples[i]]
 
         try:
             embedding = encoder.embed_utterance(segment_wav)
@@ -150,6 +161,18 @@ def transcribe_with_speakers(audio_path, model_size="large-v3-turbo", num_speake
 
     print(f"  Computed {len(embeddings)} embeddings")
 
+    # Save chunk embeddings so speakers can be re-clustered without audio
+    # (python scripts/cli.py rediarize / rediarize_aggressive.py)
+    if embeddings_file and embeddings:
+        from src.diarization import save_embeddings
+        save_embeddings(
+            embeddings_file,
+            np.array(embeddings),
+            [c["start"] for c in valid_chunks],
+            [c["end"] for c in valid_chunks]
+        )
+        print(f"  Saved embeddings: {embeddings_file}")
+
     # Step 3: Cluster speakers
     print(f"[4/4] Clustering speakers...")
     embeddings_array = np.array(embeddings)
@@ -203,13 +226,27 @@ def transcribe_with_speakers(audio_path, model_size="large-v3-turbo", num_speake
 if __name__ == "__main__":
     import time
 
+    # Optional flags: --batched / --batch-size N (batched inference pipeline)
+    batch_size = None
+    argv = []
+    args_iter = iter(sys.argv)
+    for arg in args_iter:
+        if arg == "--batched":
+            batch_size = batch_size or 16
+        elif arg == "--batch-size":
+            batch_size = int(next(args_iter))
+        else:
+            argv.append(arg)
+    sys.argv = argv
+
     if len(sys.argv) < 2:
-        print("Usage: python transcribe.py <audio_file> [num_speakers] [output_basename]")
+        print("Usage: python transcribe.py <audio_file> [num_speakers] [output_basename] [--batched] [--batch-size N]")
         print("\nExamples:")
         print("  python transcribe.py meeting.m4a")
         print("  python transcribe.py meeting.m4a 5  # Specify 5 speakers")
         print("  python transcribe.py meeting.m4a 5 meeting  # Output to meeting_speakers.txt")
         print("  python transcribe.py meeting.m4a meeting  # Auto-detect speakers, output to meeting_speakers.txt")
+        print("  python transcribe.py meeting.m4a meeting --batch-size 16  # Batched inference (faster)")
         sys.exit(1)
 
     file_path = sys.argv[1]
@@ -236,7 +273,12 @@ if __name__ == "__main__":
 
     try:
         start_time = time.time()
-        result, n_speakers = transcribe_with_speakers(file_path, num_speakers=num_speakers)
+        result, n_speakers = transcribe_with_speakers(
+            file_path,
+            num_speakers=num_speakers,
+            batch_size=batch_size,
+            embeddings_file=f"{output_base}_embeddings.npz"
+        )
         elapsed_time = time.time() - start_time
 
         output_file = f"{output_base}_speakers.txt"